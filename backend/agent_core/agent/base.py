@@ -4,6 +4,8 @@ from typing import Any, Dict, List, Optional, Protocol, Sequence, cast
 import os
 from loguru import logger
 
+from backend.devtools.cassette import get_cassette
+
 class Agent(Protocol):
     """Kleines, neutrales Agent-Interface für V3."""
     role: str
@@ -26,6 +28,14 @@ def _llm_chat(messages: Sequence[dict], model: Optional[str] = None) -> Optional
     - Kein Retry/Budget – bewusst simpel (V3-Policy macht das später)
     """
     mdl = model or os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    cassette = get_cassette()
+    if cassette is not None:
+        return cassette.call_sync("llm", "llm_chat", {"model": mdl, "messages": list(messages)},
+                                  lambda: _llm_chat_live(messages, mdl))
+    return _llm_chat_live(messages, mdl)
+
+def _llm_chat_live(messages: Sequence[dict], mdl: str) -> Optional[str]:
+    """Eigentlicher OpenAI-Call von _llm_chat (ohne Kassette)."""
     base = os.getenv("OPENAI_BASE_URL")
     key  = os.getenv("OPENAI_API_KEY", "")
 
@@ -3,12 +3,50 @@ from __future__ import annotations
 import os
 from typing import Any, Callable, List, Tuple
 
-from ..ag2.autogen.agentchat import ConversableAgent
 from .demo_adapter import DemoAdapter
 from .llm_adapter import LLMAdapter
 from .hma.hma_config import HMAConfig, DEFAULT_HMA_CONFIG
 
 
+def _llm_config(model: str) -> dict[str, Any]:
+    """
+    AG2-llm_config für ein Modell. OPENAI_BASE_URL / OPENAI_API_KEY werden explizit übernommen,
+    damit Demos und Ich-Agent z. B. auf den lokalen Fake-LLM (backend/devtools/fake_llm.py)
+    zeigen können; GATEWAY_LLM_STREAM=1 schaltet Streaming-Antworten ein.
+    """
+    cfg: dict[str, Any] = {"model": model}
+    base_url = os.getenv("OPENAI_BASE_URL")
+    if base_url:
+        cfg["base_url"] = base_url
+        api_key = os.getenv("OPENAI_API_KEY")
+        if api_key:
+            cfg["api_key"] = api_key
+    if os.getenv("GATEWAY_LLM_STREAM", "0").strip().lower() in ("1", "true", "yes"):
+        cfg["stream"] = True
+    return cfg
+
+
+def _agent_factory(name: str, system_message: str, llm_config: dict[str, Any]) -> Callable[[], Any]:
+    """
+    Factory für einen AG2-ConversableAgent. Der (schwere) AG2-/OpenAI-Import passiert erst beim
+    ersten Aufruf, nicht beim Import von backend.main.
+    """
+    def _build() -> Any:
+        from ..ag2.autogen.agentchat import ConversableAgent
+
+        return ConversableAgent(
+            name=name,
+            system_message=system_message,
+            llm_config=llm_config,
+            human_input_mode="NEVER",
+        )
+    return _build
+
+
+def _lazy_agents_enabled() -> bool:
+    return os.getenv("GATEWAY_LAZY_AGENTS", "1") == "1"
+
+
 def build_agents(
     *,
     model_name: str,
@@ -46,44 +84,17 @@ def build_agents(
     # ------------------------------------------------------------------
     # Demos (AG2)
     # ------------------------------------------------------------------
-    llm_cfg: dict[str, Any] = {"model": model_name}
-
-    raw_demos: List[ConversableAgent] = [
-        ConversableAgent(
-            name="PersonalAgent",
-            system_message=demo_msgs["PersonalAgent"],
-            llm_config=llm_cfg,
-            human_input_mode="NEVER",
-        ),
-        ConversableAgent(
-            name="DemoTherapist",
-            system_message=demo_msgs["DemoTherapist"],
-            llm_config=llm_cfg,
-            human_input_mode="NEVER",
-        ),
-        ConversableAgent(
-            name="DemoProgrammer",
-            system_message=demo_msgs["DemoProgrammer"],
-            llm_config=llm_cfg,
-            human_input_mode="NEVER",
-        ),
-        ConversableAgent(
-            name="DemoStrategist",
-            system_message=demo_msgs["DemoStrategist"],
-            llm_config=llm_cfg,
-            human_input_mode="NEVER",
-        ),
-        ConversableAgent(
-            name="DemoCritic",
-            system_message=demo_msgs["DemoCritic"],
-            llm_config=llm_cfg,
-            human_input_mode="NEVER",
-        ),
-    ]
+    llm_cfg: dict[str, Any] = _llm_config(model_name)
 
+    # Agenten werden erst bei der ersten Auswahl durch select_demos gebaut
+    # (GATEWAY_LAZY_AGENTS=0 → sofort, z. B. um Konfigurationsfehler beim Start zu sehen)
     demo_registry: List[DemoAdapter] = [
-        DemoAdapter(agent, call_tool=call_tool)
-        for agent in raw_demos
+        DemoAdapter(
+            call_tool=call_tool,
+            factory=_agent_factory(name, demo_msgs[name], llm_cfg),
+            name=name,
+        )
+        for name in required_demos
     ]
 
     # ------------------------------------------------------------------
@@ -96,15 +107,12 @@ def build_agents(
         )
 
     ich_model_name = os.getenv("ICH_MODEL", model_name)
-    ich_llm_cfg: dict[str, Any] = {"model": ich_model_name}
+    ich_llm_cfg: dict[str, Any] = _llm_config(ich_model_name)
 
-    ich_agent = ConversableAgent(
-        name="IchAgent",
-        system_message=ich_prompt,
-        llm_config=ich_llm_cfg,
-        human_input_mode="NEVER",
-    )
+    ich_llm = LLMAdapter(factory=_agent_factory("IchAgent", ich_prompt, ich_llm_cfg))
 
-    ich_llm = LLMAdapter(agent=ich_agent)
+    if not _lazy_agents_enabled():
+        for adapter in (*demo_registry, ich_llm):
+            _ = adapter.agent
 
     return demo_registry, ich_llm
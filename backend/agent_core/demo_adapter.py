@@ -2,9 +2,13 @@
 
 import json
 import inspect
+import threading
+import time
 from typing import Any, Awaitable, Callable, Optional
 import asyncio
 
+from backend.devtools.cassette import get_cassette
+
 class DemoAdapter:
     """
     Adapter für ConversableAgents, die als Demos innerhalb des HMA laufen.
@@ -19,16 +23,43 @@ class DemoAdapter:
             b) {"tool": "...", "args": {...}} → Tool wird ausgeführt
         3) Tool-Resultat wird an denselben Demo zurückgegeben
         4) Demo fasst Ergebnis für den HMA zusammen
+
+    Statt eines fertigen Agenten kann eine factory übergeben werden: der ConversableAgent
+    (und damit der AG2-Import) entsteht dann erst beim ersten LLM-Call dieses Demos,
+    also wenn select_demos ihn zum ersten Mal auswählt.
     """
 
     def __init__(
         self,
-        agent: Any,
+        agent: Any = None,
         call_tool: Optional[Callable[..., Awaitable[Any]]] = None,
+        *,
+        factory: Optional[Callable[[], Any]] = None,
+        name: Optional[str] = None,
     ) -> None:
-        self.agent = agent
+        if agent is None and factory is None:
+            raise ValueError("DemoAdapter needs an agent or a factory")
+        self._agent = agent
+        self._factory = factory
+        self._build_lock = threading.Lock()
+        self.build_ms: Optional[float] = None
         self.call_tool = call_tool
-        self.name = getattr(agent, "name", agent.__class__.__name__)
+        self.name = name or getattr(agent, "name", agent.__class__.__name__)
+
+    @property
+    def agent(self) -> Any:
+        """Der ConversableAgent; beim ersten Zugriff per factory gebaut (thread-safe, _generate läuft im Thread)."""
+        if self._agent is None:
+            with self._build_lock:
+                if self._agent is None:
+                    started = time.perf_counter()
+                    self._agent = self._factory()
+                    self.build_ms = round((time.perf_counter() - started) * 1000.0, 1)
+        return self._agent
+
+    @property
+    def is_built(self) -> bool:
+        return self._agent is not None
 
     async def run(self, *, user_text: str, context: str) -> str:
         """
@@ -48,14 +79,11 @@ class DemoAdapter:
         )
 
         # ---- Runde 1 ----
-        first_out = await asyncio.to_thread(
-            self.agent.generate_reply,
-            messages=[{"role": "user", "content": base_prompt}],
-            sender=None,
+        first_text = await asyncio.to_thread(
+            self._generate,
+            [{"role": "user", "content": base_prompt}],
         )
 
-        first_text = self._normalize_output(first_out)
-
         # Prüfen: Ist das JSON? Enthält es ein Tool?
         tool_spec = self._try_parse_tool(first_text)
 
@@ -85,23 +113,30 @@ class DemoAdapter:
             "Bitte formuliere jetzt eine knappe, klare Antwort für den HMA."
         )
 
-        second_out = await asyncio.to_thread(
-            self.agent.generate_reply,
-            messages=[
+        second_text = await asyncio.to_thread(
+            self._generate,
+            [
                 {"role": "user", "content": base_prompt},
                 {"role": "assistant", "content": first_text},
                 {"role": "user", "content": followup_prompt},
             ],
-            sender=None,
         )
-
-        second_text = self._normalize_output(second_out)
         return second_text
 
     # ----------------------------------------------
     # Hilfsfunktionen
     # ----------------------------------------------
 
+    def _generate(self, messages: list[dict]) -> str:
+        """Ein LLM-Call des Demos (läuft in asyncio.to_thread); bei aktiver Kassette aufgezeichnet/abgespielt."""
+        def _live() -> str:
+            return self._normalize_output(self.agent.generate_reply(messages=messages, sender=None))
+
+        cassette = get_cassette()
+        if cassette is None:
+            return _live()
+        return cassette.call_sync("llm", "demo.generate_reply", {"agent": self.name, "messages": messages}, _live)
+
     def _normalize_output(self, out: Any) -> str:
         """AG2-kompatible Normalisierung: tuple oder plain, alles zu string."""
         if isinstance(out, tuple) and len(out) == 2 and isinstance(out[0], (bool, type(None))):
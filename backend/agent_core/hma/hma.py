@@ -5,8 +5,12 @@ import asyncio
 import inspect
 import json
 import re
+import time
 
 from autogen_core.memory import MemoryContent, MemoryMimeType
+from loguru import logger
+
+from backend.metrics import metrics
 
 Target = Literal["user", "task", "lib", "trn"]
 
@@ -195,6 +199,12 @@ class HMA:
         self._llm = llm
         self._ctx = ctx_provider
         self._rt = runtime
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Laufende Turns dieser Instanz (nach einem Runtime-Rebuild laufen sie hier zu Ende)."""
+        return self._in_flight
 
     # -------------------------------------------------------------------------
     # kleine Utility: ggf. awaiten
@@ -229,11 +239,24 @@ class HMA:
         return context or ctx_block
 
     async def run(self, *, user_text: str, context: str = "", corr_id: str | None = None) -> Dict[str, Any]:
+        self._in_flight += 1
+        try:
+            return await self._run(user_text=user_text, context=context, corr_id=corr_id)
+        finally:
+            self._in_flight -= 1
+
+    async def _run(self, *, user_text: str, context: str, corr_id: str | None) -> Dict[str, Any]:
+        # Stufen-Latenzen (hma.stage_ms{stage=context|demos|som|deliver}) für /status/metrics und Benchmarks
+        t0 = time.perf_counter()
         merged_context = await self._build_context(context)
+        t1 = time.perf_counter()
+        metrics.observe("hma.stage_ms", (t1 - t0) * 1000.0, stage="context")
         # Demos sehen denselben Kontext wie das SOM-LLM
         chosen = select_demos(user_text, merged_context, self._demos)
         pairs = await self._parallel_demo(chosen, user_text, merged_context)
         inner_material = build_inner_material(pairs)
+        t2 = time.perf_counter()
+        metrics.observe("hma.stage_ms", (t2 - t1) * 1000.0, stage="demos")
 
         # Prompt-Bau komplett über die Config-Templates
         final_prompt = self._tpl.som_plan_template.format(
@@ -246,12 +269,18 @@ class HMA:
         ich_text_raw = await self._maybe_await(llm_out)
         ich_text = str(ich_text_raw or "")
         route = parse_deliver_to(ich_text)
-        return await self._deliver(
+        t3 = time.perf_counter()
+        metrics.observe("hma.stage_ms", (t3 - t2) * 1000.0, stage="som")
+        result = await self._deliver(
             ich_text=ich_text,
             inner_material=inner_material,
             route=route,
             speaker_name="SOM",
             corr_id=corr_id,)
+        t4 = time.perf_counter()
+        metrics.observe("hma.stage_ms", (t4 - t3) * 1000.0, stage="deliver")
+        metrics.observe("hma.turn_ms", (t4 - t0) * 1000.0)
+        return result
 
     # ---- interne Helfer ----------------------------------------------------
     async def _add_memory(
@@ -282,7 +311,9 @@ class HMA:
                     content=content,
                     mime_type=MemoryMimeType.TEXT,
                     metadata=meta,))
-        except Exception:pass
+        except Exception as e:
+            # nicht mehr still schlucken: Rate-Limits/Ausfälle sind so im Log sichtbar
+            logger.warning(f"⚠️ [HMA] memory write to {thread} ({mem_attr}) failed: {e!r}")
 
     async def _deliver(
         self,
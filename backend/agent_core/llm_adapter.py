@@ -1,7 +1,11 @@
 # backend/agent_core/llm_adapter.py
 from __future__ import annotations
 
-from typing import Any
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from backend.devtools.cassette import get_cassette
 
 
 class LLMAdapter:
@@ -19,11 +23,31 @@ class LLMAdapter:
     - Er gibt sonst nichts zusätzlich aus.
     """
 
-    def __init__(self, agent: Any) -> None:
+    def __init__(self, agent: Any = None, *, factory: Optional[Callable[[], Any]] = None) -> None:
         """
         agent: z. B. ein AG2-ConversableAgent mit passender system_message.
+        factory: alternativ – baut den Agenten erst beim ersten completion()-Aufruf.
         """
-        self.agent = agent
+        if agent is None and factory is None:
+            raise ValueError("LLMAdapter needs an agent or a factory")
+        self._agent = agent
+        self._factory = factory
+        self._build_lock = threading.Lock()
+        self.build_ms: Optional[float] = None
+
+    @property
+    def agent(self) -> Any:
+        if self._agent is None:
+            with self._build_lock:
+                if self._agent is None:
+                    started = time.perf_counter()
+                    self._agent = self._factory()
+                    self.build_ms = round((time.perf_counter() - started) * 1000.0, 1)
+        return self._agent
+
+    @property
+    def is_built(self) -> bool:
+        return self._agent is not None
 
     def completion(self, *, system: str, prompt: str) -> str:
         """
@@ -40,6 +64,14 @@ class LLMAdapter:
             {"role": "user", "content": prompt},
         ]
 
+        cassette = get_cassette()
+        if cassette is not None:
+            # Aufnahme/Wiedergabe (GATEWAY_CASSETTE): normalisierter Text als Antwort
+            return cassette.call_sync("llm", "som.completion", {"system": system, "prompt": prompt},
+                                      lambda: self._generate(messages))
+        return self._generate(messages)
+
+    def _generate(self, messages: list[dict[str, str]]) -> str:
         out = self.agent.generate_reply(messages=messages, sender=None)
 
         # AG2 gibt manchmal (ok, text) oder direkt text zurück
@@ -93,6 +93,7 @@ class UserProxy:
         - ruft HMA.run(user_text=...) auf
         - gibt das HMA-Ergebnis unverändert zurück
         """
+        started = time.perf_counter()
         # Safety: nur T1 für direkten User-Dialog (später erweiterbar)
         thread = envelope.thread or "T1"
         msg = envelope.message
@@ -111,5 +112,14 @@ class UserProxy:
         # 2) HMA kümmert sich um alles Weitere (Kontext, Speaker, Routing)
         from backend.bootstrap import corr_id_var
         cid = corr_id_var.get()
-        result = await self._hma.run(user_text=msg.text, context="", corr_id=cid)
+        from backend.devtools.cassette import get_cassette
+        cassette = get_cassette()
+        try:
+            result = await self._hma.run(user_text=msg.text, context="", corr_id=cid)
+            # 3) Kassette (GATEWAY_CASSETTE): Turn-Metadaten für den Replay-Treiber
+            if cassette is not None:
+                cassette.note("turn", {"thread": thread, "prompt": msg.text, "ms": (time.perf_counter() - started) * 1000.0, "result": result})
+        finally:
+            if cassette is not None:
+                cassette.end_turn(cid)
         return result
\ No newline at end of file
@@ -23,6 +23,7 @@ from ..memory.memory_tools import (
     create_get_node_edges_tool,
     create_delete_edge_tool,
     create_delete_episode_tool,
+    create_find_by_tag_tool,
 )
 
 
@@ -31,13 +32,15 @@ async def setup_tools(
     zep: AsyncZep,
     base_user: str | None,
     graph_id: str | None = None,
+    read_cache: Any | None = None,
+    create_graph: bool = True,
 ) -> SimpleNamespace:
     """
     Zentrales Tool-Setup für den Gateway-Hauptgraphen.
 
     Responsibilities:
-    - Graph anlegen (falls nötig)
-    - GraphAPIProvider + get_api erzeugen
+    - Graph anlegen (falls nötig; create_graph=False überspringt den Call, z. B. bei bekanntem Bootstrap-State)
+    - GraphAPIProvider + get_api erzeugen (optional mit persistentem Read-Cache)
     - Alle FunctionTools registrieren
     - call_tool(name, **kwargs) bereitstellen
 
@@ -47,6 +50,7 @@ async def setup_tools(
         tools
         tool_registry
         call_tool
+        graph_ready   (Graph angelegt oder existiert bereits laut Zep)
     """
     graph_id = graph_id or os.getenv("ZEP_GRAPH_ID", "gateway_main")
     if not base_user:
@@ -56,18 +60,22 @@ async def setup_tools(
     # --- Graph-Admin: einmaliger Graph-Create-Call --------------------------
     admin = ZepGraphAdmin(client=zep, user_id=base_user, graph_id=graph_id)
 
-    try:
-        await admin.create_graph(
-            graph_id=graph_id,
-            name="Gateway Main",
-            description="GatewayIDE globaler Hauptgraph",
-        )
-    except Exception as e:
-        # Soft-Fail: Wenn der Graph schon existiert, bekommen wir meist 4xx → nur Hinweis loggen.
-        print(f"[tool_reg] Hinweis: create_graph('{graph_id}') fehlgeschlagen: {e!r}")
+    graph_ready = not create_graph
+    if create_graph:
+        try:
+            await admin.create_graph(
+                graph_id=graph_id,
+                name="Gateway Main",
+                description="GatewayIDE globaler Hauptgraph",
+            )
+            graph_ready = True
+        except Exception as e:
+            # Soft-Fail: Wenn der Graph schon existiert, bekommen wir meist 4xx → nur Hinweis loggen.
+            graph_ready = getattr(e, "status_code", None) in (400, 409)
+            print(f"[tool_reg] Hinweis: create_graph('{graph_id}') fehlgeschlagen: {e!r}")
 
     # --- Provider + Tools ----------------------------------------------------
-    provider = GraphAPIProvider(client=zep, graph_id=graph_id, user_id=base_user)
+    provider = GraphAPIProvider(client=zep, graph_id=graph_id, user_id=base_user, read_cache=read_cache)
     get_api = provider.get_api
 
     tools: List[FunctionTool] = [
@@ -82,6 +90,7 @@ async def setup_tools(
         create_get_node_edges_tool(get_api),
         create_delete_edge_tool(get_api),
         create_delete_episode_tool(get_api),
+        create_find_by_tag_tool(get_api),
     ]
     tool_registry: Dict[str, FunctionTool] = {t.name: t for t in tools}
 
@@ -113,4 +122,5 @@ async def setup_tools(
         tools=tools,
         tool_registry=tool_registry,
         call_tool=call_tool,
+        graph_ready=graph_ready,
     )
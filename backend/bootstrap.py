@@ -1,9 +1,13 @@
 # backend/bootstrap.py
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import importlib
 import os
+import time
 from types import SimpleNamespace
-from typing import Any, Awaitable, Optional, cast
+from typing import Any, Optional
 
 from dotenv import load_dotenv, find_dotenv
 from contextvars import ContextVar
@@ -15,49 +19,148 @@ from .agent_core.agents import build_agents
 from .agent_core.hma.hma_config import DEFAULT_HMA_CONFIG
 from .agent_core.hma.hma import HMA
 from .agent_core.tool_reg import setup_tools
+from .coordination import Coordinator
+from .devtools.cassette import Cassette, CassetteZep, install_cassette
+from .devtools.fake_zep import FakeZep, fake_zep_enabled
 from .memory.manager import MemoryManager
-from .memory.memory import ZepMemory
+from .memory.memory import ZepGraphAdmin, ZepMemory, _zep_call, build_outbox_handlers
+from .memory.outbox import Outbox, OutboxReplayer
+from .memory.profile_view import ProfileFactsView
+from .memory.read_cache import ReadCache
+from .memory.thread_gc import ThreadCollector
+from .metrics import metrics
+from .state import BootstrapState, ThreadRegistry, state_path
+from .zep_client import ZepHttpSettings, build_zep_from_env
+from .zep_pool import ZepClientPool, note_thread_owner
 from .reset_utils import delete_thread_if_exists, generate_new_id
+from .sessions import SessionPool
+from .turns import TurnSequencer
 
 # --- Globaler Correlation-Id-Context ----------------------------------------
 corr_id_var: ContextVar[str] = ContextVar("corr_id", default="no-corr")
 
-# Runtime-Singleton
+# Runtime-Singleton (Aufbau per Lock serialisiert: parallele Aufrufer warten auf dieselbe Runtime)
 _runtime_singleton: SimpleNamespace | None = None
+_runtime_lock = asyncio.Lock()
+# Rebuilds (HMA/Demos/LLM-Adapter) laufen nacheinander
+_rebuild_lock = asyncio.Lock()
 
 
-# ---- Bootstrap-Helfer: Thread + ZepMemory anlegen --------------------------
-async def _ensure_thread(
+class _StartupTimer:
+    """Misst die Bootstrap-Phasen (ms) für Log, /status/metrics (bootstrap.phase_ms) und runtime.startup_phases."""
+
+    def __init__(self) -> None:
+        self._t0 = self._last = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.tasks: dict[str, float] = {}
+
+    def track(self, name: str, task: "asyncio.Future[Any]") -> None:
+        """Eigene Dauer eines überlappend laufenden Tasks (z. B. Tool-Setup) festhalten."""
+        started = time.perf_counter()
+
+        def _done(_: "asyncio.Future[Any]") -> None:
+            ms = round((time.perf_counter() - started) * 1000.0, 1)
+            self.tasks[name] = ms
+            metrics.set_gauge("bootstrap.task_ms", ms, task=name)
+        task.add_done_callback(_done)
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        ms = round((now - self._last) * 1000.0, 1)
+        self._last = now
+        self.phases[phase] = ms
+        metrics.set_gauge("bootstrap.phase_ms", ms, phase=phase)
+
+    def total_ms(self) -> float:
+        total = round((time.perf_counter() - self._t0) * 1000.0, 1)
+        metrics.set_gauge("bootstrap.total_ms", total)
+        return total
+
+
+def _exists_error(e: Exception) -> bool:
+    """Zep meldet „existiert bereits“ als 400/409."""
+    return getattr(e, "status_code", None) in (400, 409)
+
+
+# ---- Bootstrap-Helfer: User einmalig anlegen -------------------------------
+async def _add_user(
     zep: AsyncZep,
     *,
+    user_id: str,
+    first_name: str,
+    last_name: str,
+    state: Optional[BootstrapState] = None,
+) -> None:
+    try:
+        await _zep_call(
+            "user.add", zep.user.add,
+            user_id=user_id,
+            email=f"{user_id}@example.local",
+            first_name=first_name,
+            last_name=last_name,
+        )
+        logger.debug(f"👤 [Bootstrap] User erzeugt/aktualisiert: {user_id}")
+    except Exception as e:
+        if not _exists_error(e):
+            raise
+        logger.debug(f"👤 [Bootstrap] User existiert bereits: {user_id}")
+    if state is not None:
+        state.record_user(user_id)
+
+
+async def _ensure_user(
+    zep: AsyncZep,
+    users: dict[str, "asyncio.Future[None]"],
+    *,
+    user_id: str,
+    first_name: str,
+    last_name: str,
+    state: Optional[BootstrapState] = None,
+) -> None:
+    """user.add genau einmal pro user_id – parallele Thread-Scopes desselben Users warten auf denselben Call."""
+    if state is not None and state.has_user(user_id):
+        return  # laut Bootstrap-State bereits angelegt
+    fut = users.get(user_id)
+    if fut is None:
+        fut = users[user_id] = asyncio.ensure_future(
+            _add_user(zep, user_id=user_id, first_name=first_name, last_name=last_name, state=state))
+    try:
+        await asyncio.shield(fut)
+    except Exception:
+        if users.get(user_id) is fut:
+            users.pop(user_id, None)  # nächster Versuch ruft user.add erneut
+        raise
+
+
+# ---- Bootstrap-Helfer: Thread + ZepMemory anlegen --------------------------
+def _thread_scope(
     label: str,
+    *,
     user_id_env: Optional[str],
     thread_id_env: Optional[str],
-) -> tuple[str, ZepMemory]:
-    """
-    Stellt sicher, dass für das gegebene Label ein User + Thread existieren
-    und liefert (thread_id, ZepMemory)-Tuple zurück.
-    """
-
-    logger.debug(f"🔧 [Bootstrap] Initialisiere Thread-Scope '{label}'…")
-
+    state: Optional[BootstrapState] = None,
+) -> SimpleNamespace:
+    """Bestimmt User-/Thread-ID und Profil eines Thread-Scopes (ohne I/O)."""
     # 1) User-ID bestimmen
     user_id = user_id_env or os.getenv("ZEP_USER_ID") or f"user_{label}"
     tid = thread_id_env
 
-    # 2) Hard Reset aktiv?
-    hard_reset = os.getenv("GATEWAY_THREAD_RESET", "0") == "1"
-    if hard_reset and tid:
-        logger.info(f"🧹 [Bootstrap] Hard-Reset aktiv – lösche bestehenden Thread: {tid}")
-        await delete_thread_if_exists(zep, tid)
-        tid = None
+    # 1b) Warmstart: Thread-ID aus dem Bootstrap-State übernehmen (ENV hat Vorrang)
+    known = state.thread(label) if state is not None and not tid else None
+    if known and known.get("user_id") == user_id:
+        tid = known.get("thread_id")
+
+    # 2) Hard Reset aktiv? (alter Thread wird beim Anlegen gelöscht)
+    stale_tid: Optional[str] = None
+    if os.getenv("GATEWAY_THREAD_RESET", "0") == "1" and tid:
+        stale_tid, tid = tid, None
 
     # 3) Falls keine Thread-ID → neu generieren
     if not tid:
         tid = f"thread_{label}_{generate_new_id()}"
         logger.info(f"🆕 [Bootstrap] Neue Thread-ID erzeugt: {tid}")
-
-    thread_id = tid
+        if state is not None:
+            state.record_thread(label, tid, user_id, created=False)
 
     # 4) User-„Profil“ für Debug / UI
     if label.startswith("t1"):
@@ -66,48 +169,351 @@ async def _ensure_thread(
     else:
         first_name = label.upper()
         last_name = "Agent"
+    return SimpleNamespace(label=label, user_id=user_id, thread_id=tid, stale_thread_id=stale_tid,
+                           first_name=first_name, last_name=last_name)
+
 
-    # 5) User erzeugen (idempotent)
+async def _create_thread(
+    zep: AsyncZep,
+    scope: SimpleNamespace,
+    users: dict[str, "asyncio.Future[None]"],
+    state: Optional[BootstrapState] = None,
+    *,
+    verify: bool = False,
+) -> None:
+    """
+    User + Thread eines Scopes idempotent bei Zep anlegen (inkl. Hard-Reset des alten Threads).
+    Laut Bootstrap-State bereits angelegte Threads werden übersprungen (verify=True erzwingt den Call).
+    „Existiert bereits“ (400/409) gilt als Erfolg, alle anderen Fehler werden weitergereicht.
+    """
+    if state is not None and not verify and state.has_thread(scope.label, scope.thread_id) \
+            and state.has_user(scope.user_id):
+        logger.debug(f"🧵 [Bootstrap] Thread laut State bekannt: {scope.thread_id}")
+        return
+    if scope.stale_thread_id:
+        logger.info(f"🧹 [Bootstrap] Hard-Reset aktiv – lösche bestehenden Thread: {scope.stale_thread_id}")
+        await delete_thread_if_exists(zep, scope.stale_thread_id)
+
+    # User erzeugen (idempotent, pro user_id nur einmal je Bootstrap)
+    await _ensure_user(zep, users, user_id=scope.user_id, first_name=scope.first_name, last_name=scope.last_name,
+                       state=None if verify else state)
+
+    # Thread erzeugen (idempotent)
     try:
-        await cast(
-            Awaitable[object],
-            zep.user.add(
-                user_id=user_id,
-                email=f"{user_id}@example.local",
-                first_name=first_name,
-                last_name=last_name,
-            ),
-        )
-        logger.debug(f"👤 [Bootstrap] User erzeugt/aktualisiert: {user_id}")
-    except Exception:
-        logger.debug(f"👤 [Bootstrap] User existiert bereits: {user_id}")
+        await _zep_call("thread.create", zep.thread.create, thread_id=scope.thread_id, user_id=scope.user_id)
+        logger.debug(f"🧵 [Bootstrap] Thread erzeugt: {scope.thread_id}")
+        if verify:
+            logger.warning(f"🧵 [Bootstrap] Thread aus dem State fehlte bei Zep und wurde neu angelegt: {scope.thread_id}")
+    except Exception as e:
+        if not _exists_error(e):
+            raise
+        logger.debug(f"🧵 [Bootstrap] Thread existiert bereits: {scope.thread_id}")
+    if state is not None:
+        state.record_thread(scope.label, scope.thread_id, scope.user_id)
+
+
+async def _ensure_thread(
+    zep: AsyncZep,
+    scope: SimpleNamespace,
+    *,
+    users: Optional[dict[str, "asyncio.Future[None]"]] = None,
+    state: Optional[BootstrapState] = None,
+) -> tuple[str, ZepMemory]:
+    """
+    Stellt sicher, dass für den Scope (aus _thread_scope) ein User + Thread existieren
+    und liefert (thread_id, ZepMemory)-Tuple zurück.
+    """
 
-    # 6) Thread erzeugen (idempotent)
+    label = scope.label
+    logger.debug(f"🔧 [Bootstrap] Initialisiere Thread-Scope '{label}'…")
     try:
-        await cast(
-            Awaitable[object],
-            zep.thread.create(
-                thread_id=thread_id,
-                user_id=user_id,
-            ),
-        )
-        logger.debug(f"🧵 [Bootstrap] Thread erzeugt: {thread_id}")
-    except Exception:
-        logger.debug(f"🧵 [Bootstrap] Thread existiert bereits: {thread_id}")
+        await _create_thread(zep, scope, users if users is not None else {}, state)
+    except Exception as e:
+        # Start nicht blockieren: ZepThreadMemory.ensure_thread legt einen fehlenden Thread bei Bedarf an
+        logger.warning(f"⚠️ [Bootstrap] Thread-Scope '{label}' konnte nicht angelegt werden: {e!r}")
 
-    # 7) ZepMemory-Wrapper instanziieren
+    # ZepMemory-Wrapper instanziieren
     mem = ZepMemory(
         client=zep,
-        user_id=user_id,
-        thread_id=thread_id,
+        user_id=scope.user_id,
+        thread_id=scope.thread_id,
     )
-    logger.debug(f"📦 [Bootstrap] Memory-Wrapper aktiv: {label} -> {thread_id}")
+    logger.debug(f"📦 [Bootstrap] Memory-Wrapper aktiv: {label} -> {scope.thread_id}")
 
-    return thread_id, mem
+    return scope.thread_id, mem
 
 
+class _LazyThreadMemory:
+    """
+    ZepMemory-Handle, dessen User + Thread erst beim ersten Schreiben (add) angelegt werden.
+
+    Die Thread-ID steht schon beim Start fest (ENV oder generiert); Lesezugriffe vor dem ersten
+    Write liefern leere Ergebnisse statt eines thread.get auf einen noch nicht existierenden Thread.
+    probe=True (deterministische IDs, z. B. Session-Threads): der erste Lesezugriff prüft einmal per
+    thread.get, ob der Thread schon existiert, und liest dann ohne vorherigen Write.
+    Alle übrigen Attribute (set_api, set_outbox, thread_id, …) gehen direkt an den ZepMemory.
+    """
+
+    def __init__(
+        self,
+        zep: AsyncZep,
+        scope: SimpleNamespace,
+        users: dict[str, "asyncio.Future[None]"],
+        state: Optional[BootstrapState] = None,
+        *,
+        probe: bool = False,
+    ) -> None:
+        self._zep = zep
+        self._scope = scope
+        self._users = users
+        self._state = state
+        self._mem = ZepMemory(client=zep, user_id=scope.user_id, thread_id=scope.thread_id)
+        self._ready: Optional[asyncio.Future[None]] = None
+        self._probe_enabled = probe
+        self._probe: Optional[asyncio.Future[None]] = None
+        if state is not None and state.has_thread(scope.label, scope.thread_id) and state.has_user(scope.user_id):
+            # Warmstart: Thread existiert laut Bootstrap-State bereits
+            self._ready = asyncio.get_running_loop().create_future()
+            self._ready.set_result(None)
+
+    @property
+    def materialized(self) -> bool:
+        return self._ready is not None and self._ready.done() and not self._ready.cancelled() \
+            and self._ready.exception() is None
+
+    async def materialize(self) -> ZepMemory:
+        """User + Thread einmalig anlegen; parallele Writes warten auf denselben Call."""
+        if self._ready is None:
+            self._ready = asyncio.ensure_future(self._create())
+        try:
+            await asyncio.shield(self._ready)
+        except Exception:
+            self._ready = None  # nächster Write versucht es erneut
+            raise
+        return self._mem
+
+    async def _create(self) -> None:
+        started = time.perf_counter()
+        await _create_thread(self._zep, self._scope, self._users, self._state)
+        metrics.inc("bootstrap.threads_materialized", scope=self._scope.label)
+        logger.info(
+            f"🧵 [Bootstrap] Thread-Scope '{self._scope.label}' beim ersten Write angelegt: "
+            f"{self._scope.thread_id} ({(time.perf_counter() - started) * 1000.0:.0f} ms)"
+        )
+
+    async def _readable(self) -> bool:
+        """Materialisiert – oder (probe=True) laut einmaligem thread.get bereits bei Zep vorhanden."""
+        if self.materialized:
+            return True
+        if not self._probe_enabled:
+            return False
+        if self._probe is None:
+            self._probe = asyncio.ensure_future(self._check_exists())
+        try:
+            await asyncio.shield(self._probe)
+        except Exception as e:
+            self._probe = None  # transienter Fehler → beim nächsten Lesen erneut prüfen
+            logger.debug(f"🧵 [Bootstrap] thread.get-Probe für {self._scope.thread_id} fehlgeschlagen: {e!r}")
+            return False
+        return self.materialized
+
+    async def _check_exists(self) -> None:
+        try:
+            await _zep_call("thread.get", self._zep.thread.get, thread_id=self._scope.thread_id, lastn=1)
+        except Exception as e:
+            if getattr(e, "status_code", None) == 404:
+                return  # noch nicht angelegt → leer bis zum ersten Write
+            raise
+        if self._ready is None:
+            self._ready = asyncio.get_running_loop().create_future()
+            self._ready.set_result(None)
+            logger.debug(f"🧵 [Bootstrap] Thread existiert bereits, lesbar ohne Write: {self._scope.thread_id}")
+
+    async def add(self, *args: Any, **kwargs: Any) -> None:
+        mem = await self.materialize()
+        await mem.add(*args, **kwargs)
+
+    async def ensure_thread(self) -> str:
+        mem = await self.materialize()
+        return await mem.ensure_thread()
+
+    async def list_recent_messages(self, limit: int = 10) -> list[dict[str, Any]]:
+        if not await self._readable():
+            return []
+        return await self._mem._thread.list_recent_messages(limit=limit)
+
+    async def get_context(self, *args: Any, **kwargs: Any) -> str:
+        if not await self._readable():
+            return ""
+        return await self._mem.get_context(*args, **kwargs)
+
+    def invalidate_cache(self, *args: Any, **kwargs: Any) -> None:
+        if not self.materialized and self._probe is not None and self._probe.done():
+            self._probe = None  # z. B. anderer Worker hat den Thread inzwischen angelegt → erneut prüfen
+        self._mem.invalidate_cache(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._mem, name)
+
+
+def _lazy_threads_enabled() -> bool:
+    return os.getenv("GATEWAY_LAZY_THREADS", "1") == "1"
+
+
+
+async def _reverify(
+    zep: AsyncZep,
+    state: BootstrapState,
+    scopes: list[SimpleNamespace],
+    *,
+    graph_id: Optional[str],
+) -> None:
+    """Beim Start übersprungene Creates im Hintergrund wiederholen (idempotent) und den State auffrischen."""
+    started = time.perf_counter()
+    try:
+        if graph_id:
+            try:
+                await ZepGraphAdmin(client=zep, graph_id=graph_id).create_graph(
+                    graph_id, name="Gateway Main", description="GatewayIDE globaler Hauptgraph")
+                logger.warning(f"🧬 [Bootstrap] Graph aus dem State fehlte bei Zep und wurde neu angelegt: {graph_id}")
+                state.record_graph(graph_id)
+            except Exception as e:
+                if _exists_error(e):
+                    state.record_graph(graph_id)
+        users: dict[str, asyncio.Future[None]] = {}
+        await asyncio.gather(*(_create_thread(zep, sc, users, state, verify=True) for sc in scopes))
+        logger.info(
+            f"📌 [Bootstrap] Bootstrap-State im Hintergrund bestätigt ({len(scopes)} Threads, "
+            f"{(time.perf_counter() - started) * 1000.0:.0f} ms)."
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ [Bootstrap] Hintergrund-Prüfung des Bootstrap-State fehlgeschlagen: {e!r}")
+
+
+def _load_hma_config(reload: bool) -> Any:
+    """DEFAULT_HMA_CONFIG – optional hma_config.py neu laden (geänderte Prompts/Demo-Texte)."""
+    from .agent_core.hma import hma_config
+
+    if reload:
+        hma_config = importlib.reload(hma_config)
+    return hma_config.DEFAULT_HMA_CONFIG
+
+
+async def rebuild_agents(
+    runtime: SimpleNamespace,
+    *,
+    model_name: Optional[str] = None,
+    reload_config: bool = True,
+) -> dict[str, Any]:
+    """
+    Baut HMA, Demo-Registry und LLM-Adapter im Hintergrund neu (aktuelle HMAConfig, Modellnamen)
+    und tauscht sie atomar in der Runtime aus. Zep-Client, Threads/Memories, Tools, Caches und
+    Outbox werden weiterverwendet. Laufende Turns halten ihre HMA-Referenz und laufen auf der
+    alten Instanz zu Ende; Fehler beim Neubau lassen die alte Instanz aktiv.
+    """
+    async with _rebuild_lock:
+        started = time.perf_counter()
+        model = model_name or os.getenv("LLM_MODEL", "gpt-4o")
+        logger.info(f"🔁 [Bootstrap] Runtime-Rebuild gestartet (model={model}, reload_config={reload_config})…")
+
+        config = await asyncio.to_thread(_load_hma_config, reload_config)
+        demo_registry, llm_client = await asyncio.to_thread(
+            build_agents, model_name=model, call_tool=runtime.call_tool, config=config)
+        # Agenten vor dem Swap bauen → der erste Turn danach zahlt keinen Agentenbau
+        await asyncio.to_thread(lambda: [a.agent for a in (*demo_registry, llm_client)])
+        hma = HMA(
+            som_system_prompt=config.som_system_prompt,
+            templates=config,
+            demos=demo_registry,
+            messaging=runtime.messaging,
+            llm=llm_client,
+            ctx_provider=runtime.ctx_provider,
+            runtime=runtime,
+        )
+
+        # Atomarer Swap: kein await zwischen den Zuweisungen
+        old_hma = runtime.hma
+        runtime.demo_registry = demo_registry
+        runtime.llm_client = llm_client
+        runtime.hma = hma
+        runtime.hma_config = config
+        runtime.model_name = model
+        runtime.generation = getattr(runtime, "generation", 1) + 1
+
+        build_ms = round((time.perf_counter() - started) * 1000.0, 1)
+        draining = getattr(old_hma, "in_flight", 0)
+        metrics.inc("runtime.rebuilds")
+        metrics.set_gauge("runtime.generation", runtime.generation)
+        logger.info(
+            f"🔁 [Bootstrap] Runtime-Rebuild fertig: Generation {runtime.generation} aktiv nach {build_ms} ms "
+            f"({draining} Turns laufen auf der alten Instanz zu Ende)."
+        )
+        return {"generation": runtime.generation, "model": model, "build_ms": build_ms, "draining_turns": draining}
+
+
+def startup_report(runtime: SimpleNamespace) -> dict[str, Any]:
+    """Startzeit-Aufschlüsselung für /status/startup: Bootstrap-Phasen, Tool-Setup, Agenten- und Thread-Zustand."""
+    agents = [*getattr(runtime, "demo_registry", []), getattr(runtime, "llm_client", None)]
+    threads = {}
+    for n in range(1, 7):
+        mem = getattr(runtime, f"t{n}_memory", None)
+        threads[f"T{n}"] = {
+            "thread_id": getattr(runtime, f"t{n}_thread_id", None),
+            "materialized": bool(getattr(mem, "materialized", True)),
+        }
+    return {
+        "bootstrap_ms": dict(getattr(runtime, "startup_phases", {}) or {}),
+        "tasks_ms": dict(getattr(runtime, "startup_tasks", {}) or {}),
+        "agents": {
+            getattr(a, "name", "IchAgent"): {"built": bool(getattr(a, "is_built", True)), "build_ms": getattr(a, "build_ms", None)}
+            for a in agents if a is not None
+        },
+        "threads": threads,
+    }
+
+
+def record_thread_change(runtime: SimpleNamespace, label: str, memory: Any) -> None:
+    """Neue Thread-ID eines Scopes (z. B. nach /reset) im Bootstrap-State vermerken, damit Restarts sie übernehmen."""
+    state: Optional[BootstrapState] = getattr(runtime, "bootstrap_state", None)
+    thread_id = getattr(memory, "thread_id", None)
+    user_id = getattr(memory, "user_id", None)
+    note_thread_owner(getattr(runtime, "zep_client", None), thread_id, user_id)
+    if state is not None and thread_id and user_id:
+        state.record_thread(label, str(thread_id), str(user_id), created=False)
+    registry: Optional[ThreadRegistry] = getattr(runtime, "thread_registry", None)
+    if registry is not None and thread_id and user_id:
+        registry.activate(label, str(thread_id), str(user_id))
+    coordinator: Optional[Coordinator] = getattr(runtime, "coordinator", None)
+    if coordinator is not None and thread_id and user_id:
+        coordinator.publish_thread(label, str(thread_id), str(user_id))
+
+
+def _start_leader_jobs(runtime: SimpleNamespace) -> None:
+    """Hintergrund-Jobs, die pro Knoten genau einmal laufen sollen (Leader-Worker bzw. Einzelprozess)."""
+    if runtime.outbox is not None:
+        runtime.outbox.start()
+    if runtime.thread_gc is not None:
+        runtime.thread_gc.start()
+
+
+async def _stop_leader_jobs(runtime: SimpleNamespace) -> None:
+    """Leader-Rolle verloren: Jobs anhalten (offene Outbox-Einträge stellt der neue Leader zu)."""
+    if runtime.outbox is not None:
+        await runtime.outbox.stop(drain_timeout_s=0)
+    if runtime.thread_gc is not None:
+        await runtime.thread_gc.stop()
+
+
+def _active_thread_ids(runtime: SimpleNamespace) -> set[str]:
+    """Thread-IDs, die die Runtime gerade nutzt (für den Thread-GC tabu)."""
+    ids = set()
+    for i in range(1, 7):
+        tid = getattr(getattr(runtime, f"t{i}_memory", None), "thread_id", None)
+        if tid:
+            ids.add(str(tid))
+    return ids
+
 
-# ---- Runtime: Zep, Threads, Tools, HMA -------------------------------------
 # ---- Runtime: Zep, Threads, Tools, HMA -------------------------------------
 async def ensure_runtime() -> SimpleNamespace:
     """
@@ -119,8 +525,18 @@ async def ensure_runtime() -> SimpleNamespace:
     if _runtime_singleton is not None:
         logger.debug("♻️ [Bootstrap] Runtime-Singleton bereits initialisiert – reusing instance.")
         return _runtime_singleton
+    async with _runtime_lock:
+        if _runtime_singleton is None:
+            _runtime_singleton = await _build_runtime()
+        else:
+            logger.debug("♻️ [Bootstrap] Runtime wurde parallel initialisiert – reusing instance.")
+    return _runtime_singleton
+
 
+async def _build_runtime() -> SimpleNamespace:
+    """Baut die Runtime einmalig auf (nur unter _runtime_lock aufrufen)."""
     logger.info("🚀 [Bootstrap] Initialisiere Gateway-Runtime…")
+    timer = _StartupTimer()
 
     # --- ENV / Zep-Client ----------------------------------------------------
     load_dotenv(find_dotenv(usecwd=True))
@@ -129,85 +545,177 @@ async def ensure_runtime() -> SimpleNamespace:
     zep_api_key = os.getenv("ZEP_API_KEY")
     zep_base = os.getenv("ZEP_BASE_URL")
 
-    if not zep_api_key:
+    # Aufnahme/Wiedergabe von Zep- und LLM-Verkehr pro corr_id (GATEWAY_CASSETTE=record|replay)
+    cassette = Cassette.from_env(corr_id=corr_id_var.get)
+    install_cassette(cassette)
+    if cassette is not None:
+        metrics.register_collector("cassette", cassette.stats)
+        logger.warning(f"📼 [Bootstrap] Kassette im Modus '{cassette.mode}' aktiv ({cassette.dir}, latency_scale={cassette.latency_scale}).")
+    replaying = cassette is not None and cassette.mode == "replay"
+
+    if not zep_api_key and not os.getenv("ZEP_API_KEYS") and not fake_zep_enabled() and not replaying:
         logger.error("❌ [Bootstrap] ZEP_API_KEY fehlt – Backend kann nicht starten.")
         raise RuntimeError("ZEP_API_KEY fehlt")
 
-    if zep_base:
-        zep = AsyncZep(api_key=cast(str, zep_api_key), base_url=zep_base)
-        logger.info(f"🔌 [Bootstrap] Zep-Client bereit (base_url={zep_base}, model={model_name})")
+    # Geteilter, explizit konfigurierter HTTP-Pool (Limits/Keep-Alive/HTTP2/Timeouts per ENV);
+    # mehrere ZEP_API_KEYS / ZEP_BASE_URLS → ZepClientPool (Consistent Hashing + Failover)
+    http_settings = ZepHttpSettings.from_env()
+    zep, zep_http = build_zep_from_env(http_settings)
+    pool_info = f"pool={http_settings.max_connections}/{http_settings.max_keepalive}, http2={http_settings.http2}"
+    inner = zep.inner if isinstance(zep, CassetteZep) else zep
+    if inner is None:
+        logger.warning("📼 [Bootstrap] Zep-Antworten kommen aus der Kassette (kein Netz).")
+    elif isinstance(inner, FakeZep):
+        lat = inner.latency
+        logger.warning(f"🧪 [Bootstrap] GATEWAY_ZEP_FAKE aktiv – Offline-Zep im Speicher (latency={lat.base_ms}ms/{lat.jitter}, error_rate={lat.error_rate}).")
+    elif isinstance(inner, ZepClientPool):
+        members = ", ".join(f"{m.name}@{m.base_url or 'default'}" for m in inner.members)
+        logger.info(f"🔌 [Bootstrap] Zep-Client-Pool bereit ({len(inner.members)} Mitglieder: {members}; model={model_name}, {pool_info})")
+    elif zep_base:
+        logger.info(f"🔌 [Bootstrap] Zep-Client bereit (base_url={zep_base}, model={model_name}, {pool_info})")
     else:
-        zep = AsyncZep(api_key=cast(str, zep_api_key))
-        logger.info(f"🔌 [Bootstrap] Zep-Client bereit (default base_url, model={model_name})")
-
-    # --- Threads & Memories T1..T6 ------------------------------------------
-    t1_thread_id, t1_memory = await _ensure_thread(
-        zep,
-        label="t1_root",
-        user_id_env=os.getenv("T1_USER_ID") or os.getenv("ZEP_USER_ID"),
-        thread_id_env=os.getenv("T1_THREAD_ID"),
-    )
+        logger.info(f"🔌 [Bootstrap] Zep-Client bereit (default base_url, model={model_name}, {pool_info})")
+
+    # --- Persistenter Read-Cache (Speicher + SQLite/WAL) ---------------------
+    read_cache = ReadCache.from_env(state_path("read_cache.sqlite3"))
+    metrics.register_collector("read_cache", read_cache.stats)
+    disk = read_cache.disk
+    if disk is not None:
+        st = disk.stats()
+        logger.info(f"💾 [Bootstrap] Read-Cache aktiv ({st['entries']} Einträge, {st['bytes'] // 1024} KiB, {st['path']})")
+    else:
+        logger.info("💾 [Bootstrap] Read-Cache nur im Speicher (Disk-Stufe deaktiviert).")
+
+    # --- Persistierter Bootstrap-State (Warmstart: bekannte IDs, keine erneuten Creates) ---
+    # FakeZep/Kassetten-Replay haben keinen dauerhaften Remote-Zustand → kein State
+    bootstrap_state = None if fake_zep_enabled() or replaying else BootstrapState.from_env()
+    if bootstrap_state is not None:
+        snap = bootstrap_state.snapshot()
+        logger.info(
+            f"📌 [Bootstrap] Bootstrap-State: {len(snap['threads'])} Threads, {len(snap['users'])} User, "
+            f"{len(snap['graphs'])} Graphen bekannt."
+        )
+
+    # Register aller angelegten Thread-IDs (Grundlage für den Thread-GC)
+    thread_registry = None if fake_zep_enabled() or replaying else ThreadRegistry.from_env()
+
+    # Multi-Worker: gemeinsamer Koordinations-Speicher (GATEWAY_MULTI_WORKER=1 bzw. GATEWAY_WORKERS>1)
+    coordinator = Coordinator.from_env()
+    if coordinator is not None:
+        await coordinator.start()
+        logger.info(
+            f"👥 [Bootstrap] Multi-Worker-Modus: Worker {coordinator.worker_id} "
+            f"({'Leader' if coordinator.is_leader else 'Follower'})."
+        )
+
+    timer.mark("zep_client_cache")
 
+    # --- Threads & Memories T1..T6 (parallel, user.add einmal pro User) -----
     base_user = os.getenv("T1_USER_ID") or os.getenv("ZEP_USER_ID") or f"user_t1_root"
+    graph_id = os.getenv("ZEP_GRAPH_ID", "gateway_main")
 
-    t2_thread_id, t2_memory = await _ensure_thread(
-        zep,
-        label="t2_user_visible",
-        user_id_env=base_user,
-        thread_id_env=os.getenv("T2_THREAD_ID"),
-    )
-    t3_thread_id, t3_memory = await _ensure_thread(
-        zep,
-        label="t3_meta_proto",
-        user_id_env=base_user,
-        thread_id_env=os.getenv("T3_THREAD_ID"),
-    )
-    t4_thread_id, t4_memory = await _ensure_thread(
-        zep,
-        label="t4_lib_internal",
-        user_id_env=base_user,
-        thread_id_env=os.getenv("T4_THREAD_ID"),
-    )
-    t5_thread_id, t5_memory = await _ensure_thread(
-        zep,
-        label="t5_task_internal",
-        user_id_env=base_user,
-        thread_id_env=os.getenv("T5_THREAD_ID"),
-    )
-    t6_thread_id, t6_memory = await _ensure_thread(
-        zep,
-        label="t6_trn_internal",
-        user_id_env=base_user,
-        thread_id_env=os.getenv("T6_THREAD_ID"),
-    )
+    # Tool-Setup (graph.create + GraphAPI) hängt nicht von den Threads ab → läuft überlappend
+    logger.info(f"🧬 [Bootstrap] Initialisiere Tools & Graph-API (graph_id={graph_id})…")
+    graph_known = bootstrap_state is not None and bootstrap_state.has_graph(graph_id)
+    tools_task = asyncio.ensure_future(setup_tools(
+        zep=zep,
+        base_user=base_user,
+        graph_id=graph_id,
+        read_cache=read_cache,
+        create_graph=not graph_known,
+    ))
+    timer.track("tool_setup", tools_task)
+
+    users: dict[str, asyncio.Future[None]] = {}
+    scopes = [
+        ("t1_root", os.getenv("T1_USER_ID") or os.getenv("ZEP_USER_ID"), os.getenv("T1_THREAD_ID")),
+        ("t2_user_visible", base_user, os.getenv("T2_THREAD_ID")),
+        ("t3_meta_proto", base_user, os.getenv("T3_THREAD_ID")),
+        ("t4_lib_internal", base_user, os.getenv("T4_THREAD_ID")),
+        ("t5_task_internal", base_user, os.getenv("T5_THREAD_ID")),
+        ("t6_trn_internal", base_user, os.getenv("T6_THREAD_ID")),
+    ]
+    # T1/T2 werden in jedem Turn gelesen/geschrieben → sofort anlegen.
+    # T3..T6 (Routing-Ziele task/lib/trn) erst beim ersten Write (GATEWAY_LAZY_THREADS=0 → alle sofort).
+    n_eager = 2 if _lazy_threads_enabled() else len(scopes)
+    # Mehrere Worker: Thread-Anlage serialisieren – wer später kommt, übernimmt die IDs aus dem State
+    async with coordinator.exclusive("bootstrap") if coordinator is not None else contextlib.nullcontext():
+        if coordinator is not None and bootstrap_state is not None:
+            bootstrap_state.reload()
+        if thread_registry is not None and bootstrap_state is not None:
+            # Threads aus früheren Läufen (vor dem Register) übernehmen, damit sie beim ID-Wechsel als verwaist gelten
+            for label, _, _ in scopes:
+                known = bootstrap_state.thread(label)
+                if known and known.get("thread_id") not in thread_registry:
+                    thread_registry.activate(label, known["thread_id"], known.get("user_id", ""))
+        resolved = [
+            _thread_scope(label, user_id_env=user_env, thread_id_env=thread_env, state=bootstrap_state)
+            for label, user_env, thread_env in scopes
+        ]
+        for sc in resolved:
+            # gepinnte bzw. aus dem State übernommene Threads: Routing im Zep-Pool auf das Projekt des Besitzers
+            note_thread_owner(zep, sc.thread_id, sc.user_id)
+            if thread_registry is not None:
+                thread_registry.activate(sc.label, sc.thread_id, sc.user_id)
+        # laut State schon angelegt → Creates werden übersprungen (und ggf. im Hintergrund nachgeprüft)
+        known_scopes = [
+            sc for sc in resolved
+            if bootstrap_state is not None and bootstrap_state.has_thread(sc.label, sc.thread_id)
+        ]
+        try:
+            eager = await asyncio.gather(*(
+                _ensure_thread(zep, sc, users=users, state=bootstrap_state) for sc in resolved[:n_eager]
+            ))
+        except BaseException:
+            tools_task.cancel()
+            raise
+        if coordinator is not None:
+            for sc in resolved:
+                coordinator.publish_thread(sc.label, sc.thread_id, sc.user_id)
+    lazy = []
+    for sc in resolved[n_eager:]:
+        mem = _LazyThreadMemory(zep, sc, users, bootstrap_state)
+        lazy.append((mem.thread_id, mem))
+    (
+        (t1_thread_id, t1_memory),
+        (t2_thread_id, t2_memory),
+        (t3_thread_id, t3_memory),
+        (t4_thread_id, t4_memory),
+        (t5_thread_id, t5_memory),
+        (t6_thread_id, t6_memory),
+    ) = [*eager, *lazy]
 
     logger.info(
-        "✅ [Bootstrap] Threads bereit | T1={} T2={} T3={} T4={} T5={} T6={}",
+        "✅ [Bootstrap] Threads bereit | T1={} T2={} T3={} T4={} T5={} T6={}{}",
         t1_thread_id,
         t2_thread_id,
         t3_thread_id,
         t4_thread_id,
         t5_thread_id,
         t6_thread_id,
+        f" (lazy: {', '.join(sc.label for sc in resolved[n_eager:])})" if lazy else "",
     )
+    timer.mark("threads")
 
     # --- Tool-Setup über zentrale Registry (tool_reg) ------------------------
-    graph_id = os.getenv("ZEP_GRAPH_ID", "gateway_main")
-    logger.info(f"🧬 [Bootstrap] Initialisiere Tools & Graph-API (graph_id={graph_id})…")
-
-    tool_ctx = await setup_tools(
-        zep=zep,
-        base_user=base_user,
-        graph_id=graph_id,
-    )
+    tool_ctx = await tools_task
+    if bootstrap_state is not None and not graph_known and tool_ctx.graph_ready:
+        bootstrap_state.record_graph(graph_id)
     logger.info("🛠️ [Bootstrap] Tools & Graph-API bereit.")
+    timer.mark("tools")
 
     # --- Runtime-Container (Namespace) --------------------------------------
     runtime_ns = SimpleNamespace(
         # Zep / Graph
         zep_client=zep,
+        zep_http=zep_http,
         graph_api_provider=tool_ctx.graph_api_provider,
         get_api=tool_ctx.get_api,
+        read_cache=read_cache,
+        cassette=cassette,
+        bootstrap_state=bootstrap_state,
+        thread_registry=thread_registry,
+        coordinator=coordinator,
         # Threads / Memories
         t1_thread_id=t1_thread_id,
         t1_memory=t1_memory,
@@ -234,13 +742,70 @@ async def ensure_runtime() -> SimpleNamespace:
     runtime_ns.ctx_provider = runtime_ns.memory
     logger.info("🧠 [Bootstrap] MemoryManager als ctx_provider registriert.")
 
+    # Materialisierte Profil-Fakten (statt api.search("*") pro Turn)
+    profile_view = ProfileFactsView(
+        tool_ctx.get_api,
+        limit=int(os.getenv("GATEWAY_PROFILE_FACTS_LIMIT", "5")),
+        refresh_interval_s=float(os.getenv("GATEWAY_PROFILE_REFRESH_S", "60")),
+    )
+    tool_ctx.get_api().add_write_listener(profile_view.apply_write)
+    if coordinator is not None:
+        # gecachte Graph-Suchen der anderen Worker für dieses Ziel verwerfen (Coordinator.sync)
+        tool_ctx.get_api().add_write_listener(lambda key, _ep: coordinator.bump_soon(f"graph:{key}"))
+    runtime_ns.profile_view = profile_view
+
+    # --- Durable Outbox für Memory-Writes (SQLite/WAL, Zustellung im Hintergrund) ---
+    outbox = Outbox.from_env(state_path("outbox.sqlite3"))
+    replayer: OutboxReplayer | None = None
+    if outbox is not None:
+        replayer = OutboxReplayer.from_env(outbox, build_outbox_handlers(zep, tool_ctx.get_api))
+        metrics.register_collector("outbox", replayer.stats)
+        counts = outbox.counts()
+        if counts["pending"] or counts["dead"]:
+            logger.info(f"📮 [Bootstrap] Outbox: {counts['pending']} offene Writes aus vorherigem Lauf werden zugestellt ({counts['dead']} Dead-Letter).")
+        logger.info(f"📮 [Bootstrap] Outbox aktiv ({outbox.path})")
+    else:
+        logger.info("📮 [Bootstrap] Outbox deaktiviert – Memory-Writes laufen synchron.")
+    runtime_ns.outbox = replayer
+
     # GraphAPI in alle ZepMemory-Instanzen injizieren
     for mem in (t1_memory, t2_memory, t3_memory, t4_memory, t5_memory, t6_memory):
         try:
             mem.set_api(tool_ctx.get_api)
+            mem.set_profile_view(profile_view)
+            mem.set_read_cache(read_cache)
+            if replayer is not None:
+                mem.set_outbox(replayer)
+            if thread_registry is not None:
+                mem.set_thread_registry(thread_registry)
+            if coordinator is not None:
+                mem.add_write_listener(lambda tid: coordinator.bump_soon(f"thread:{tid}"))
         except Exception:
             logger.debug("ℹ️ [Bootstrap] ZepMemory-Instanz unterstützt set_api nicht (legacy-Version?).")
 
+    profile_view.start()
+    logger.info("📇 [Bootstrap] Profil-Fakten-View aktiv (Hintergrund-Refresh).")
+    if thread_registry is not None:
+        thread_registry.start()  # last_used aus touch() periodisch im Hintergrund-Thread persistieren
+
+    # --- Thread-GC: verwaiste Threads nach der Retention löschen (GATEWAY_THREAD_GC=1) ---
+    runtime_ns.thread_gc = None
+    if thread_registry is not None and os.getenv("GATEWAY_THREAD_GC", "1") == "1":
+        thread_gc = ThreadCollector.from_env(zep, thread_registry, protect=lambda: _active_thread_ids(runtime_ns),
+                                             outbox=replayer)
+        metrics.register_collector("thread_gc", thread_gc.stats)
+        runtime_ns.thread_gc = thread_gc
+        st = thread_registry.stats()
+        logger.info(f"🧹 [Bootstrap] Thread-GC aktiv ({st['threads']} Threads im Register, {st['abandoned']} verwaist).")
+
+    # Hintergrund-Jobs (Outbox-Zustellung, Thread-GC) laufen nur im Leader-Worker
+    if coordinator is None or coordinator.is_leader:
+        _start_leader_jobs(runtime_ns)
+    if coordinator is not None:
+        metrics.register_collector("coordination", coordinator.stats)
+        coordinator.add_listener(lambda leader: _start_leader_jobs(runtime_ns) if leader else _stop_leader_jobs(runtime_ns))
+    timer.mark("memory_wiring")
+
     # --- Demo-Agenten + HMA in einem Block bauen ----------------------------
     logger.debug("🤖 [Bootstrap] Baue Demo-Agenten & LLM-Client…")
     demo_registry, llm_client = build_agents(
@@ -249,6 +814,9 @@ async def ensure_runtime() -> SimpleNamespace:
     )
     runtime_ns.demo_registry = demo_registry
     runtime_ns.llm_client = llm_client
+    runtime_ns.model_name = model_name
+    runtime_ns.hma_config = DEFAULT_HMA_CONFIG
+    runtime_ns.generation = 1
 
     logger.debug("🧩 [Bootstrap] Initialisiere HMA…")
     runtime_ns.hma = HMA(
@@ -263,9 +831,38 @@ async def ensure_runtime() -> SimpleNamespace:
 
     logger.info("🤖 [Bootstrap] Agenten & HMA bereit.")
 
-    # --- Singleton setzen und zurückgeben -----------------------------------
-    _runtime_singleton = runtime_ns
-    globals()["_runtime_singleton"] = _runtime_singleton
+    # --- Turn-Reihenfolge pro Gesprächs-Thread (optional mit Coalescing) ---
+    runtime_ns.turns = TurnSequencer.from_env()
+    metrics.register_collector("turns", runtime_ns.turns.stats)
+
+    # --- Session-Runtimes (/chat mit X-Session-Id): eigene T1..T6 über derselben Runtime ---
+    runtime_ns.sessions = None
+    if not replaying:  # Kassetten enthalten keine Session-Threads
+        sessions = SessionPool.from_env(runtime_ns)
+        if sessions is not None:
+            sessions.start()
+            metrics.register_collector("sessions", sessions.stats)
+            runtime_ns.sessions = sessions
+            logger.info("👤 [Bootstrap] Session-Runtimes aktiv (LRU-Pool, Idle-Eviction).")
+
+    timer.mark("agents_hma")
+
+    # Optional: übersprungene Remote-Creates im Hintergrund nachprüfen (GATEWAY_BOOTSTRAP_VERIFY=1)
+    runtime_ns.bootstrap_verify = None
+    if bootstrap_state is not None and os.getenv("GATEWAY_BOOTSTRAP_VERIFY", "1") == "1" \
+            and (known_scopes or graph_known) and (coordinator is None or coordinator.is_leader):
+        runtime_ns.bootstrap_verify = asyncio.create_task(
+            _reverify(zep, bootstrap_state, known_scopes, graph_id=graph_id if graph_known else None),
+            name="bootstrap-verify",
+        )
 
+    total_ms = timer.total_ms()
+    runtime_ns.startup_phases = dict(timer.phases, total=total_ms)
+    runtime_ns.startup_tasks = timer.tasks
+    logger.info(
+        "⏱️ [Bootstrap] Startzeit {} ms | {}",
+        total_ms,
+        " ".join(f"{k}={v}" for k, v in timer.phases.items()),
+    )
     logger.info("🏁 [Bootstrap] Gateway-Runtime vollständig initialisiert.")
-    return _runtime_singleton
+    return runtime_ns
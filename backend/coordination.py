@@ -0,0 +1,298 @@
+# backend/coordination.py
+"""
+Koordination mehrerer Uvicorn-Worker auf einem Knoten (GATEWAY_MULTI_WORKER=1 bzw. GATEWAY_WORKERS>1).
+
+Gemeinsamer Speicher ist eine SQLite-Datei (WAL) im State-Verzeichnis plus Datei-Locks:
+- exclusive(name): prozessübergreifender Lock (fcntl.flock); der Bootstrap serialisiert damit die
+  Thread-Anlage – der erste Worker legt T1..T6 an, die übrigen übernehmen die IDs aus dem
+  (neu eingelesenen) Bootstrap-State,
+- Leader-Lease: genau ein Worker führt die Hintergrund-Jobs aus (Outbox-Zustellung, Thread-GC,
+  Bootstrap-Nachprüfung); endet er, übernimmt nach Ablauf der Lease (GATEWAY_LEADER_TTL_S) ein anderer,
+- Thread-Zuordnung und Write-Versionen: Thread-Wechsel (/reset) und Thread-Writes werden
+  veröffentlicht; sync(runtime) übernimmt vor dem Request neue Thread-IDs und verwirft lokal
+  gecachte Thread-Historien, die ein anderer Worker inzwischen beschrieben hat.
+"""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from .metrics import metrics
+from .state import state_path
+
+try:  # POSIX
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+__all__ = ["Coordinator", "multi_worker_enabled"]
+
+logger = logging.getLogger(__name__)
+
+_LEADER = "leader"
+
+
+def multi_worker_enabled() -> bool:
+    if os.getenv("GATEWAY_MULTI_WORKER", "").strip().lower() in ("1", "true", "yes"):
+        return True
+    try:
+        return int(os.getenv("GATEWAY_WORKERS", "1")) > 1
+    except ValueError:
+        return False
+
+
+class Coordinator:
+    """Gemeinsamer Koordinations-Speicher aller Worker eines Knotens (siehe Moduldoku)."""
+
+    def __init__(self, path: str | Path, *, worker_id: Optional[str] = None, lease_ttl_s: float = 15.0) -> None:
+        self._path = Path(path)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._ttl = max(1.0, float(lease_ttl_s))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self._path), check_same_thread=False, isolation_level=None, timeout=10.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS lease (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS threads (label TEXT PRIMARY KEY, thread_id TEXT NOT NULL,"
+                " user_id TEXT NOT NULL, version INTEGER NOT NULL)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS versions (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._leader = False
+        self._listeners: List[Callable[[bool], Any]] = []
+        self._task: Optional[asyncio.Task[None]] = None
+        self._threads_seen = 0
+        self._seen: Dict[str, int] = {}
+        self._pending: set[asyncio.Task[None]] = set()
+        self._stats: Dict[str, int] = {"elections": 0, "thread_switches": 0, "cache_invalidations": 0, "bump_failures": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["Coordinator"]:
+        if not multi_worker_enabled():
+            return None
+        if fcntl is None:
+            logger.warning("multi-worker mode needs fcntl file locks (POSIX) – running uncoordinated")
+            return None
+        path = os.getenv("GATEWAY_COORDINATION_PATH") or state_path("coordination.sqlite3")
+        return cls(path, lease_ttl_s=float(os.getenv("GATEWAY_LEADER_TTL_S", "15")))
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader
+
+    # ---- Datei-Lock --------------------------------------------------------------
+    @asynccontextmanager
+    async def exclusive(self, name: str) -> AsyncIterator[None]:
+        """Prozessübergreifender Lock <name>.lock neben der Koordinations-DB (Warten im Thread)."""
+        assert fcntl is not None
+        fh = open(self._path.with_name(f"{name}.lock"), "a+")
+        try:
+            started = time.perf_counter()
+            await asyncio.to_thread(fcntl.flock, fh.fileno(), fcntl.LOCK_EX)
+            waited = (time.perf_counter() - started) * 1000.0
+            if waited > 50:
+                logger.info(f"worker {self.worker_id} waited {waited:.0f} ms for lock '{name}'")
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+        finally:
+            fh.close()
+
+    # ---- Leader-Lease ------------------------------------------------------------
+    def _tx(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def _try_lead(self) -> bool:
+        def _acquire(conn: sqlite3.Connection) -> bool:
+            now = time.time()
+            row = conn.execute("SELECT owner, expires_at FROM lease WHERE name = ?", (_LEADER,)).fetchone()
+            if row is not None and row[0] != self.worker_id and row[1] >= now:
+                return False
+            conn.execute("INSERT OR REPLACE INTO lease (name, owner, expires_at) VALUES (?, ?, ?)",
+                         (_LEADER, self.worker_id, now + self._ttl))
+            return True
+        return bool(self._tx(_acquire))
+
+    def _resign(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM lease WHERE name = ? AND owner = ?", (_LEADER, self.worker_id))
+
+    def leader(self) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT owner, expires_at FROM lease WHERE name = ?", (_LEADER,)).fetchone()
+        return row[0] if row is not None and row[1] >= time.time() else None
+
+    def add_listener(self, fn: Callable[[bool], Any]) -> None:
+        """fn(is_leader) bei jedem Wechsel der Leader-Rolle dieses Workers (sync oder async)."""
+        self._listeners.append(fn)
+
+    async def _set_leader(self, leader: bool) -> None:
+        self._leader = leader
+        metrics.set_gauge("coordination.leader", 1.0 if leader else 0.0)
+        if leader:
+            self._stats["elections"] += 1
+        logger.info(f"worker {self.worker_id} {'is now' if leader else 'is no longer'} leader")
+        for fn in list(self._listeners):
+            try:
+                result = fn(leader)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"leadership listener failed: {e!r}")
+
+    async def start(self) -> None:
+        """Sofort einmal um die Lease bewerben (Rolle steht danach fest), dann periodisch erneuern."""
+        if self._task is not None:
+            return
+        self.prime()
+        await self._set_leader(await asyncio.to_thread(self._try_lead))
+        self._task = asyncio.create_task(self._run(), name="coordination-lease")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._ttl / 3.0)
+            try:
+                leader = await asyncio.to_thread(self._try_lead)
+            except Exception as e:
+                logger.warning(f"leader lease renewal failed: {e!r}")
+                leader = False
+            if leader != self._leader:
+                await self._set_leader(leader)
+
+    async def stop(self) -> None:
+        """Lease-Loop beenden und die Leader-Rolle sofort abgeben (ein anderer Worker übernimmt)."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        if self._leader:
+            self._leader = False
+            self._resign()
+        with self._lock:
+            self._conn.close()
+
+    # ---- Thread-Zuordnung / Write-Versionen ----------------------------------------
+    def publish_thread(self, label: str, thread_id: str, user_id: str) -> None:
+        """Aktuelle Thread-ID eines Scopes für alle Worker veröffentlichen (no-op bei gleichem Stand)."""
+        def _publish(conn: sqlite3.Connection) -> None:
+            row = conn.execute("SELECT thread_id, user_id FROM threads WHERE label = ?", (label,)).fetchone()
+            if row is not None and tuple(row) == (thread_id, user_id):
+                return
+            version = conn.execute("SELECT COALESCE(MAX(version), 0) FROM threads").fetchone()[0] + 1
+            conn.execute("INSERT OR REPLACE INTO threads (label, thread_id, user_id, version) VALUES (?, ?, ?, ?)",
+                         (label, thread_id, user_id, version))
+        self._tx(_publish)
+
+    def thread_changes(self) -> List[Tuple[str, str, str]]:
+        """Seit dem letzten Aufruf veröffentlichte Thread-Zuordnungen (label, thread_id, user_id)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT label, thread_id, user_id, version FROM threads WHERE version > ? ORDER BY version",
+                (self._threads_seen,)).fetchall()
+        if rows:
+            self._threads_seen = max(r[3] for r in rows)
+        return [(r[0], r[1], r[2]) for r in rows]
+
+    def bump(self, key: str) -> None:
+        """Version eines Schlüssels erhöhen; eigene Writes gelten danach als gesehen."""
+        def _bump(conn: sqlite3.Connection) -> Tuple[int, int]:
+            row = conn.execute("SELECT value FROM versions WHERE key = ?", (key,)).fetchone()
+            prev = int(row[0]) if row is not None else 0
+            conn.execute("INSERT OR REPLACE INTO versions (key, value) VALUES (?, ?)", (key, prev + 1))
+            return prev, prev + 1
+        prev, new = self._tx(_bump)
+        if self._seen.get(key, 0) == prev:
+            self._seen[key] = new  # kein fremder Write dazwischen
+
+    def bump_soon(self, key: str) -> None:
+        """bump() im Hintergrund-Thread (für Write-Listener): blockiert den Event-Loop nicht bei Lock-Contention."""
+        task = asyncio.get_running_loop().create_task(asyncio.to_thread(self.bump, key))
+        self._pending.add(task)
+        task.add_done_callback(self._bump_done)
+
+    def _bump_done(self, task: "asyncio.Task[None]") -> None:
+        self._pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._stats["bump_failures"] += 1
+            logger.warning(f"coordination bump failed: {task.exception()!r}")
+
+    def changed_keys(self) -> List[str]:
+        """Schlüssel, die ein anderer Worker seit dem letzten Aufruf verändert hat."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value FROM versions").fetchall()
+        changed = []
+        for key, value in rows:
+            if self._seen.get(key, 0) != value:
+                self._seen[key] = value
+                changed.append(key)
+        return changed
+
+    def prime(self) -> None:
+        """Aktuellen Stand als gesehen markieren (beim Start: lokale Caches sind ohnehin leer)."""
+        self.changed_keys()
+        with self._lock:
+            row = self._conn.execute("SELECT COALESCE(MAX(version), 0) FROM threads").fetchone()
+        self._threads_seen = int(row[0])
+
+    def sync(self, runtime: SimpleNamespace) -> None:
+        """
+        Vor einem Request: von anderen Workern veröffentlichte Thread-Wechsel übernehmen und lokal
+        gecachte Historien bzw. Graph-Suchen verwerfen, die ein anderer Worker beschrieben hat (die
+        geteilte Disk-Stufe des Read-Caches hat dessen Stand bereits).
+        """
+        memories = [getattr(runtime, f"t{i}_memory", None) for i in range(1, 7)]
+        for label, thread_id, user_id in self.thread_changes():
+            attr = label.split("_", 1)[0]  # "t1_root" → "t1"
+            mem = getattr(runtime, f"{attr}_memory", None)
+            if mem is None or getattr(mem, "thread_id", None) == thread_id:
+                continue
+            mem.set_thread(thread_id)
+            setattr(runtime, f"{attr}_thread_id", thread_id)
+            self._stats["thread_switches"] += 1
+            logger.info(f"worker {self.worker_id}: {label} switched to {thread_id} by another worker")
+        keys = self.changed_keys()
+        changed = [key[len("thread:"):] for key in keys if key.startswith("thread:")]
+        cache = getattr(runtime, "read_cache", None)
+        graphs = [key[len("graph:"):] for key in keys if key.startswith("graph:")]
+        if graphs and cache is not None:
+            from .memory.graph_api import _SEARCH_NS
+
+            for target in graphs:  # gecachte Graph-Suchen eines Ziels, in das ein anderer Worker geschrieben hat
+                cache.invalidate_prefix(_SEARCH_NS, target + "|", local_only=True)
+                self._stats["cache_invalidations"] += 1
+        sessions = getattr(runtime, "sessions", None)
+        if changed and sessions is not None:
+            memories.extend(sessions.memories())  # Session-Threads (X-Session-Id) anderer Worker
+        for thread_id in changed:
+            for mem in memories:
+                if mem is not None and getattr(mem, "thread_id", None) == thread_id:
+                    mem.invalidate_cache(local_only=True)
+                    self._stats["cache_invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"worker_id": self.worker_id, "leader": self._leader, "lease_ttl_s": self._ttl, **self._stats}
@@ -0,0 +1,442 @@
+# backend/devtools/cassette.py
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from zep_cloud.core.api_error import ApiError
+
+from ..metrics import metrics
+from ..state import state_path
+
+__all__ = [
+    "CASSETTE_FORMAT_VERSION", "Cassette", "CassetteMiss", "CassetteZep", "ReplayedError",
+    "cassette_mode", "get_cassette", "install_cassette", "load_cassette",
+]
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_FORMAT_VERSION = 1
+
+_MODES = ("off", "record", "replay")
+_SAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def cassette_mode() -> str:
+    """GATEWAY_CASSETTE=record|replay|off (Default off)."""
+    mode = os.getenv("GATEWAY_CASSETTE", "off").strip().lower()
+    return mode if mode in _MODES else "off"
+
+
+def _latency_scale(raw: str) -> float:
+    """"original" → 1.0, "none" → 0.0 (ohne Wartezeit), sonst Faktor (z. B. "0.5")."""
+    raw = (raw or "original").strip().lower()
+    if raw in ("original", "orig", ""):
+        return 1.0
+    if raw in ("none", "off"):
+        return 0.0
+    return max(0.0, float(raw))
+
+
+class CassetteMiss(LookupError):
+    """Replay: für (kind, op) liegt in der Kassette dieses corr_id keine (weitere) Aufnahme vor."""
+
+
+class ReplayedError(RuntimeError):
+    """Replay einer aufgezeichneten Nicht-API-Exception (Originaltyp steht in .original_type)."""
+
+    def __init__(self, original_type: str, message: str) -> None:
+        super().__init__(f"{original_type}: {message}")
+        self.original_type = original_type
+
+
+def _jsonable(obj: Any) -> Any:
+    """SDK-Modelle (pydantic), Dataclasses, SimpleNamespace, Enums, datetime → JSON-Strukturen."""
+    if obj is None or isinstance(obj, (bool, int, float, str)):
+        return obj
+    if isinstance(obj, dict):
+        return {str(k): _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, set)):
+        return [_jsonable(v) for v in obj]
+    if isinstance(obj, Enum):
+        return _jsonable(obj.value)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, bytes):
+        return obj.decode("utf-8", "replace")
+    dump = getattr(obj, "model_dump", None) or getattr(obj, "dict", None)
+    if callable(dump):
+        try:
+            return _jsonable(dump())
+        except Exception:
+            pass
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return _jsonable(asdict(obj))
+    if isinstance(obj, SimpleNamespace) or hasattr(obj, "__dict__"):
+        return {k: _jsonable(v) for k, v in vars(obj).items() if not k.startswith("_")}
+    return str(obj)
+
+
+class _Replayed(dict):
+    """Antwort aus der Kassette: Dict mit Attributzugriff (wie SDK-Modelle) und model_dump()."""
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def model_dump(self, **_: Any) -> Dict[str, Any]:
+        return _jsonable(dict(self))
+
+    dict = model_dump  # type: ignore[assignment]
+
+
+def _revive(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return _Replayed({k: _revive(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return [_revive(v) for v in obj]
+    return obj
+
+
+def _request_key(req: Any) -> str:
+    raw = json.dumps(req, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _encode_error(exc: BaseException) -> Dict[str, Any]:
+    if isinstance(exc, ApiError):
+        return {"type": "ApiError", "status": exc.status_code, "body": _jsonable(exc.body),
+                "headers": _jsonable(dict(exc.headers or {}))}
+    return {"type": type(exc).__name__, "message": str(exc)}
+
+
+def _decode_error(err: Dict[str, Any]) -> BaseException:
+    if err.get("type") == "ApiError":
+        return ApiError(status_code=err.get("status"), headers=err.get("headers") or {}, body=err.get("body"))
+    return ReplayedError(str(err.get("type")), str(err.get("message", "")))
+
+
+class _Reel:
+    """Aufnahmen eines corr_id fürs Replay: exakter Request-Key zuerst, sonst nächste Aufnahme derselben Op."""
+
+    def __init__(self, events: List[Dict[str, Any]]) -> None:
+        self.events = events
+        self._used: set[int] = set()
+        self._by_key: Dict[Tuple[str, str, str], Deque[int]] = {}
+        self._by_op: Dict[Tuple[str, str], Deque[int]] = {}
+        for i, ev in enumerate(events):
+            if ev.get("kind") == "note":
+                continue
+            self._by_key.setdefault((ev["kind"], ev["op"], ev.get("key", "")), deque()).append(i)
+            self._by_op.setdefault((ev["kind"], ev["op"]), deque()).append(i)
+
+    @staticmethod
+    def _pop(q: Optional[Deque[int]], used: set[int]) -> Optional[int]:
+        while q:
+            i = q.popleft()
+            if i not in used:
+                return i
+        return None
+
+    def take(self, kind: str, op: str, key: str) -> Optional[Dict[str, Any]]:
+        i = self._pop(self._by_key.get((kind, op, key)), self._used)
+        if i is None:
+            i = self._pop(self._by_op.get((kind, op)), self._used)
+        if i is None:
+            return None
+        self._used.add(i)
+        return self.events[i]
+
+    @property
+    def remaining(self) -> int:
+        return sum(1 for ev in self.events if ev.get("kind") != "note") - len(self._used)
+
+
+def load_cassette(path: str | Path) -> List[Dict[str, Any]]:
+    """Liest eine Kassette (gzip-JSONL, auch mehrere angehängte gzip-Member)."""
+    events: List[Dict[str, Any]] = []
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                events.append(json.loads(line))
+    return events
+
+
+class Cassette:
+    """
+    Aufnahme/Wiedergabe des externen Verkehrs (Zep + LLM) pro corr_id.
+
+    - record: jeder Call an einer Grenze (CassetteZep, LLMAdapter, DemoAdapter, _llm_chat)
+      wird als eine JSON-Zeile {kind, op, key, req, resp|err, ms, t} gepuffert und
+      am Turn-Ende (end_turn) bzw. ab flush_every Einträgen an <dir>/<corr_id>.jsonl.gz angehängt,
+    - replay: dieselben Grenzen antworten aus der Kassette des aktuellen corr_id –
+      Zuordnung über den Request-Hash, bei Abweichung (z. B. Zeitstempel im Prompt)
+      die nächste Aufnahme derselben Operation; Latenz original oder skaliert (latency_scale),
+    - Calls ohne Request-Kontext laufen unter dem corr_id "no-corr" (Hintergrund-Writes, Refresh).
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        mode: str,
+        corr_id: Callable[[], str],
+        latency_scale: float = 1.0,
+        flush_every: int = 256,
+    ) -> None:
+        if mode not in ("record", "replay"):
+            raise ValueError(f"unknown cassette mode: {mode}")
+        self.dir = Path(directory)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self.latency_scale = float(latency_scale)
+        self._corr_id = corr_id
+        self._flush_every = max(1, int(flush_every))
+        self._lock = threading.Lock()
+        self._buffers: Dict[str, List[str]] = {}
+        self._t0: Dict[str, float] = {}
+        self._seq: Dict[str, int] = {}
+        self._reels: Dict[str, _Reel] = {}
+        self._recorded = 0
+        self._replayed = 0
+        self._misses = 0
+
+    # ------------------------------------------------------------------ Pfade / Kontext
+    def path_for(self, corr_id: str) -> Path:
+        return self.dir / f"{_SAFE.sub('_', corr_id) or 'no-corr'}.jsonl.gz"
+
+    def current(self) -> str:
+        try:
+            return self._corr_id() or "no-corr"
+        except Exception:
+            return "no-corr"
+
+    # ------------------------------------------------------------------ Aufnahme
+    def _append(self, corr: str, event: Dict[str, Any]) -> None:
+        with self._lock:
+            t0 = self._t0.setdefault(corr, time.perf_counter())
+            seq = self._seq.get(corr, 0)
+            self._seq[corr] = seq + 1
+            event = {"v": CASSETTE_FORMAT_VERSION, "seq": seq, "t": round((time.perf_counter() - t0) * 1000.0, 3), **event}
+            buf = self._buffers.setdefault(corr, [])
+            buf.append(json.dumps(event, ensure_ascii=False, separators=(",", ":")))
+            self._recorded += 1
+            full = len(buf) >= self._flush_every
+        metrics.inc("cassette.recorded", kind=event["kind"])
+        if full:
+            self.flush(corr)
+
+    def _record(self, kind: str, op: str, req: Any, started: float, *, resp: Any = None, err: Optional[BaseException] = None) -> None:
+        ms = round((time.perf_counter() - started) * 1000.0, 3)
+        event: Dict[str, Any] = {"kind": kind, "op": op, "key": _request_key(req), "req": req, "ms": ms}
+        if err is not None:
+            event["err"] = _encode_error(err)
+        else:
+            event["resp"] = _jsonable(resp)
+        self._append(self.current(), event)
+
+    def note(self, op: str, data: Dict[str, Any]) -> None:
+        """Metadaten zum Turn (z. B. User-Text + Gesamtdauer) – Grundlage für den Replay-Treiber."""
+        if self.mode == "record":
+            self._append(self.current(), {"kind": "note", "op": op, "data": _jsonable(data)})
+
+    def flush(self, corr_id: str) -> None:
+        with self._lock:
+            lines = self._buffers.pop(corr_id, None)
+        if not lines:
+            return
+        try:
+            with gzip.open(self.path_for(corr_id), "at", encoding="utf-8") as fh:
+                fh.write("\n".join(lines) + "\n")
+        except Exception as e:
+            logger.warning("cassette flush for %s failed: %s", corr_id, e)
+
+    def end_turn(self, corr_id: Optional[str] = None) -> None:
+        """Turn-Ende: Aufnahme schreiben bzw. Replay-Zustand des corr_id verwerfen (erneut abspielbar)."""
+        corr = corr_id or self.current()
+        if self.mode == "record":
+            self.flush(corr)
+            with self._lock:
+                self._t0.pop(corr, None)
+                self._seq.pop(corr, None)
+        else:
+            with self._lock:
+                self._reels.pop(corr, None)
+
+    def close(self) -> None:
+        with self._lock:
+            pending = list(self._buffers)
+        for corr in pending:
+            self.flush(corr)
+
+    # ------------------------------------------------------------------ Wiedergabe
+    def _reel(self, corr: str) -> _Reel:
+        with self._lock:
+            reel = self._reels.get(corr)
+        if reel is not None:
+            return reel
+        path = self.path_for(corr)
+        events = load_cassette(path) if path.exists() else []
+        with self._lock:
+            return self._reels.setdefault(corr, _Reel(events))
+
+    def _take(self, kind: str, op: str, req: Any) -> Dict[str, Any]:
+        corr = self.current()
+        reel = self._reel(corr)
+        with self._lock:
+            ev = reel.take(kind, op, _request_key(req))
+            if ev is None:
+                self._misses += 1
+            else:
+                self._replayed += 1
+        if ev is None:
+            metrics.inc("cassette.misses", kind=kind, op=op)
+            raise CassetteMiss(f"no recording for {kind}:{op} in cassette {corr!r}")
+        metrics.inc("cassette.replayed", kind=kind)
+        return ev
+
+    def _result(self, ev: Dict[str, Any]) -> Any:
+        if "err" in ev:
+            raise _decode_error(ev["err"])
+        return _revive(ev.get("resp"))
+
+    # ------------------------------------------------------------------ Grenzen
+    async def call_async(self, kind: str, op: str, req: Any, fn: Callable[[], Awaitable[Any]]) -> Any:
+        req = _jsonable(req)
+        if self.mode == "replay":
+            ev = self._take(kind, op, req)
+            delay = float(ev.get("ms", 0.0)) * self.latency_scale / 1000.0
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return self._result(ev)
+        started = time.perf_counter()
+        try:
+            resp = await fn()
+        except Exception as e:
+            self._record(kind, op, req, started, err=e)
+            raise
+        self._record(kind, op, req, started, resp=resp)
+        return resp
+
+    def call_sync(self, kind: str, op: str, req: Any, fn: Callable[[], Any]) -> Any:
+        """Wie call_async für blockierende LLM-Calls (laufen ggf. in asyncio.to_thread)."""
+        req = _jsonable(req)
+        if self.mode == "replay":
+            ev = self._take(kind, op, req)
+            delay = float(ev.get("ms", 0.0)) * self.latency_scale / 1000.0
+            if delay > 0:
+                time.sleep(delay)
+            return self._result(ev)
+        started = time.perf_counter()
+        try:
+            resp = fn()
+        except Exception as e:
+            self._record(kind, op, req, started, err=e)
+            raise
+        self._record(kind, op, req, started, resp=resp)
+        return resp
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "dir": str(self.dir),
+                "latency_scale": self.latency_scale,
+                "recorded": self._recorded,
+                "replayed": self._replayed,
+                "misses": self._misses,
+                "buffered_turns": len(self._buffers),
+                "open_reels": len(self._reels),
+            }
+
+    @classmethod
+    def from_env(cls, *, corr_id: Callable[[], str]) -> Optional["Cassette"]:
+        """
+        GATEWAY_CASSETTE=record|replay (sonst None), GATEWAY_CASSETTE_DIR (Default .gateway_state/cassettes),
+        GATEWAY_CASSETTE_LATENCY=original|none|<Faktor> fürs Replay.
+        """
+        mode = cassette_mode()
+        if mode == "off":
+            return None
+        directory = os.getenv("GATEWAY_CASSETTE_DIR") or str(state_path("cassettes"))
+        return cls(
+            directory,
+            mode=mode,
+            corr_id=corr_id,
+            latency_scale=_latency_scale(os.getenv("GATEWAY_CASSETTE_LATENCY", "original")),
+            flush_every=int(os.getenv("GATEWAY_CASSETTE_FLUSH_EVERY", "256")),
+        )
+
+
+class _CassetteNamespace:
+    """Fassade für client.<ns>: jeder Methodenaufruf läuft über die Kassette."""
+
+    def __init__(self, owner: "CassetteZep", ns: str) -> None:
+        self._owner = owner
+        self._ns = ns
+
+    def __getattr__(self, method: str) -> Callable[..., Any]:
+        op = f"{self._ns}.{method}"
+
+        async def _call(*args: Any, **kwargs: Any) -> Any:
+            inner = self._owner.inner
+            if inner is None and self._owner.cassette.mode != "replay":
+                raise RuntimeError("CassetteZep without inner client can only replay")
+
+            async def _live() -> Any:
+                return await getattr(getattr(inner, self._ns), method)(*args, **kwargs)
+
+            return await self._owner.cassette.call_async("zep", op, {"args": list(args), "kwargs": kwargs}, _live)
+
+        _call.__name__ = method
+        return _call
+
+
+class CassetteZep:
+    """
+    AsyncZep-kompatible Hülle um AsyncZep / ZepClientPool / FakeZep (record) bzw. ohne
+    inneren Client (replay). Alles außer thread/graph/user wird an den inneren Client durchgereicht.
+    """
+
+    def __init__(self, inner: Any, cassette: Cassette) -> None:
+        self.inner = inner
+        self.cassette = cassette
+        self.thread = _CassetteNamespace(self, "thread")
+        self.graph = _CassetteNamespace(self, "graph")
+        self.user = _CassetteNamespace(self, "user")
+
+    def __getattr__(self, name: str) -> Any:
+        if self.inner is None:
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+
+_cassette: Cassette | None = None
+
+
+def install_cassette(cassette: Optional[Cassette]) -> None:
+    """Prozessweite Kassette setzen (bootstrap); None schaltet Aufnahme/Wiedergabe ab."""
+    global _cassette
+    _cassette = cassette
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Aktive Kassette oder None (Normalbetrieb) – Abfrage an den Adapter-Grenzen."""
+    return _cassette
@@ -0,0 +1,259 @@
+# backend/devtools/fake_llm.py
+"""
+Deterministischer, OpenAI-kompatibler LLM-Stand-in für Lasttests (/v1/chat/completions inkl. Streaming).
+
+    python -m backend.devtools.fake_llm --port 8099
+    OPENAI_BASE_URL=http://localhost:8099/v1 OPENAI_API_KEY=fake uvicorn backend.main:app
+
+Antworten hängen nur vom Request ab (gleiche Messages → gleicher Text):
+- SOM / Ich-Agent (Prompt enthält <<<ROUTE>>>): "Ich …"-Antwort plus genau ein ROUTE-Marker,
+- Demos, Runde 1 (Tool-Hinweis im Prompt): eine Zeile Tool-JSON (search_graph) bzw. Text,
+- Demos, Runde 2 ([Tool-Result]) und alle übrigen Calls (_llm_chat): knapper Fließtext.
+Latenz (Time-to-first-Token + Zeit pro Token) und Antwortlänge sind per ENV einstellbar.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+__all__ = ["FakeLLMProfile", "FakeLLM", "create_app"]
+
+_ROUTES = ("user", "task", "lib", "trn")
+_TASK = re.compile(r"\[Aufgabe\]\s*(.+?)(?:\n\n|\Z)", re.DOTALL)
+_WORDS = (
+    "ich", "habe", "den", "kontext", "geprüft", "und", "die", "wichtigsten", "punkte", "zusammengefasst",
+    "das", "projekt", "nutzt", "zep", "als", "gedächtnis", "nächster", "schritt", "ist", "eine", "kurze",
+    "prüfung", "der", "ergebnisse", "mit", "dem", "team", "danach", "folgt", "umsetzung",
+)
+
+
+@dataclass
+class FakeLLMProfile:
+    """
+    Latenz- und Längenverteilung des Fake-LLM.
+
+    - ttft_ms: Median Time-to-first-Token (lognormal mit jitter_sigma),
+    - tpot_ms: Zeit pro Output-Token (nach dem ersten Token; beim Streaming zwischen den Chunks),
+    - tokens: Median der Antwortlänge in Tokens (lognormal mit tokens_sigma, deterministisch pro Request),
+    - tool_rate: Anteil der Demo-Erstantworten mit Tool-JSON (deterministisch pro Request),
+    - route: fester ROUTE-Wert (user/task/lib/trn) oder "hash" (aus dem Prompt abgeleitet).
+    """
+    ttft_ms: float = 300.0
+    tpot_ms: float = 15.0
+    jitter_sigma: float = 0.25
+    tokens: int = 60
+    tokens_sigma: float = 0.3
+    tool_rate: float = 1.0
+    route: str = "user"
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    def sample_ttft_ms(self) -> float:
+        if self.ttft_ms <= 0:
+            return 0.0
+        with self._lock:
+            return self.ttft_ms * (self._rng.lognormvariate(0.0, self.jitter_sigma) if self.jitter_sigma > 0 else 1.0)
+
+    @classmethod
+    def from_env(cls) -> "FakeLLMProfile":
+        seed = os.getenv("GATEWAY_FAKE_LLM_SEED")
+        return cls(
+            ttft_ms=float(os.getenv("GATEWAY_FAKE_LLM_TTFT_MS", "300")),
+            tpot_ms=float(os.getenv("GATEWAY_FAKE_LLM_TPOT_MS", "15")),
+            jitter_sigma=float(os.getenv("GATEWAY_FAKE_LLM_JITTER_SIGMA", "0.25")),
+            tokens=int(os.getenv("GATEWAY_FAKE_LLM_TOKENS", "60")),
+            tokens_sigma=float(os.getenv("GATEWAY_FAKE_LLM_TOKENS_SIGMA", "0.3")),
+            tool_rate=float(os.getenv("GATEWAY_FAKE_LLM_TOOL_RATE", "1.0")),
+            route=os.getenv("GATEWAY_FAKE_LLM_ROUTE", "user").strip().lower(),
+            seed=int(seed) if seed else None,
+        )
+
+
+def _text(content: Any) -> str:
+    # content als String oder Liste von Parts ({"type": "text", "text": ...})
+    if isinstance(content, list):
+        return " ".join(str(p.get("text", "")) for p in content if isinstance(p, dict))
+    return str(content or "")
+
+
+def _approx_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeLLM:
+    """Antwortlogik (ohne HTTP): klassifiziert den Request und baut einen deterministischen Text."""
+
+    def __init__(self, profile: FakeLLMProfile | None = None) -> None:
+        self.profile = profile or FakeLLMProfile()
+        self._lock = threading.Lock()
+        self._requests: Dict[str, int] = {}
+        self._completion_tokens = 0
+        self._prompt_tokens = 0
+        self._streams = 0
+
+    @staticmethod
+    def _digest(model: str, messages: List[Dict[str, Any]]) -> bytes:
+        raw = json.dumps([model, [(m.get("role"), _text(m.get("content"))) for m in messages]], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).digest()
+
+    def _filler(self, rng: random.Random, n: int) -> str:
+        return " ".join(_WORDS[rng.randrange(len(_WORDS))] for _ in range(max(0, n)))
+
+    def _length(self, rng: random.Random) -> int:
+        p = self.profile
+        if p.tokens <= 0:
+            return 0
+        return max(1, int(round(p.tokens * (rng.lognormvariate(0.0, p.tokens_sigma) if p.tokens_sigma > 0 else 1.0))))
+
+    def classify(self, messages: List[Dict[str, Any]]) -> str:
+        everything = "\n".join(_text(m.get("content")) for m in messages)
+        last_user = next((_text(m.get("content")) for m in reversed(messages) if m.get("role") == "user"), "")
+        if "[Tool-Result]" in last_user:
+            return "demo_summary"
+        if "<<<ROUTE>>>" in everything:
+            return "som"
+        if '{"tool"' in last_user:
+            return "demo"
+        return "chat"
+
+    def respond(self, model: str, messages: List[Dict[str, Any]]) -> Tuple[str, str]:
+        """(kind, text) – gleiche Messages liefern immer denselben Text."""
+        digest = self._digest(model, messages)
+        rng = random.Random(int.from_bytes(digest[:8], "big"))
+        kind = self.classify(messages)
+        n = self._length(rng)
+        last_user = next((_text(m.get("content")) for m in reversed(messages) if m.get("role") == "user"), "")
+        if kind == "som":
+            route = self.profile.route
+            if route not in _ROUTES:
+                route = _ROUTES[digest[8] % len(_ROUTES)]
+            body = self._filler(rng, max(0, n - 12))
+            text = f"Ich {body}.\n<<<ROUTE>>> {{\"deliver_to\":\"{route}\",\"args\":{{}}}} <<<END>>>"
+        elif kind == "demo" and rng.random() < self.profile.tool_rate:
+            m = _TASK.search(last_user)
+            query = " ".join((m.group(1) if m else last_user).split()[:8]) or "kontext"
+            text = json.dumps({"tool": "search_graph", "args": {"query": query, "limit": 5}}, ensure_ascii=False)
+        else:
+            text = f"Zusammenfassung: {self._filler(rng, n)}."
+        with self._lock:
+            self._requests[kind] = self._requests.get(kind, 0) + 1
+        return kind, text
+
+    def account(self, prompt_tokens: int, completion_tokens: int, *, stream: bool) -> None:
+        with self._lock:
+            self._prompt_tokens += prompt_tokens
+            self._completion_tokens += completion_tokens
+            self._streams += int(stream)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": dict(self._requests),
+                "streams": self._streams,
+                "prompt_tokens": self._prompt_tokens,
+                "completion_tokens": self._completion_tokens,
+                "profile": {k: v for k, v in vars(self.profile).items() if not k.startswith("_")},
+            }
+
+
+def _tokens_of(text: str) -> List[str]:
+    # Stream-Chunks: Wörter inkl. folgendem Whitespace (Konkatenation ergibt exakt den Text)
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def create_app(llm: FakeLLM | None = None) -> Any:
+    """FastAPI-App mit /v1/chat/completions (JSON + SSE-Streaming), /v1/models und /stats."""
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, StreamingResponse
+
+    llm = llm or FakeLLM(FakeLLMProfile.from_env())
+    app = FastAPI(title="Gateway Fake LLM", version="1.0")
+
+    async def completions(request: Request) -> Any:
+        body = await request.json()
+        model = str(body.get("model") or "fake-model")
+        messages = list(body.get("messages") or [])
+        stream = bool(body.get("stream"))
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+        kind, text = llm.respond(model, messages)
+        prompt_tokens = sum(_approx_tokens(_text(m.get("content"))) for m in messages)
+        pieces = _tokens_of(text)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(pieces),
+                 "total_tokens": prompt_tokens + len(pieces)}
+        llm.account(prompt_tokens, len(pieces), stream=stream)
+        cid = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        ttft = llm.profile.sample_ttft_ms() / 1000.0
+        tpot = llm.profile.tpot_ms / 1000.0
+
+        if not stream:
+            await asyncio.sleep(ttft + tpot * max(0, len(pieces) - 1))
+            return JSONResponse({
+                "id": cid, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage, "system_fingerprint": f"fake-{kind}",
+            })
+
+        def _chunk(delta: Dict[str, Any], finish: Optional[str] = None) -> str:
+            return "data: " + json.dumps({
+                "id": cid, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }, ensure_ascii=False) + "\n\n"
+
+        async def _events() -> AsyncIterator[str]:
+            await asyncio.sleep(ttft)
+            yield _chunk({"role": "assistant", "content": ""})
+            for i, piece in enumerate(pieces):
+                if i and tpot > 0:
+                    await asyncio.sleep(tpot)
+                yield _chunk({"content": piece})
+            yield _chunk({}, "stop")
+            if include_usage:
+                yield "data: " + json.dumps({"id": cid, "object": "chat.completion.chunk", "created": created,
+                                             "model": model, "choices": [], "usage": usage}) + "\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(_events(), media_type="text/event-stream")
+
+    # base_url mit oder ohne /v1
+    app.add_api_route("/v1/chat/completions", completions, methods=["POST"])
+    app.add_api_route("/chat/completions", completions, methods=["POST"])
+
+    @app.get("/v1/models")
+    async def models() -> Dict[str, Any]:
+        return {"object": "list", "data": [{"id": "fake-model", "object": "model", "owned_by": "gateway"}]}
+
+    @app.get("/stats")
+    async def stats() -> Dict[str, Any]:
+        return llm.stats()
+
+    return app
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default=os.getenv("GATEWAY_FAKE_LLM_HOST", "127.0.0.1"))
+    ap.add_argument("--port", type=int, default=int(os.getenv("GATEWAY_FAKE_LLM_PORT", "8099")))
+    args = ap.parse_args(argv)
+
+    import uvicorn
+
+    uvicorn.run(create_app(), host=args.host, port=args.port, log_level="warning", access_log=False)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
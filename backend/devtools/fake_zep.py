@@ -0,0 +1,406 @@
+# backend/devtools/fake_zep.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import re
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from zep_cloud.core.api_error import ApiError
+
+__all__ = ["FakeLatency", "FakeZep", "fake_zep_enabled"]
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def fake_zep_enabled() -> bool:
+    """GATEWAY_ZEP_FAKE=1 → bootstrap baut FakeZep statt AsyncZep (kein Netz, kein API-Key nötig)."""
+    return os.getenv("GATEWAY_ZEP_FAKE", "0").strip().lower() in ("1", "true", "yes")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _tokens(text: str) -> set[str]:
+    return {t.lower() for t in _TOKEN.findall(text or "")}
+
+
+def _per_op(raw: str, cast: type = float) -> tuple[Any, Dict[str, Any]]:
+    """"20,thread.get=40,graph.search=120" → (20, {"thread.get": 40, "graph.search": 120})."""
+    default: Any = None
+    overrides: Dict[str, Any] = {}
+    for part in (raw or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "=" in part:
+            k, v = part.split("=", 1)
+            overrides[k.strip()] = cast(v.strip())
+        else:
+            default = cast(part)
+    return default, overrides
+
+
+@dataclass
+class FakeLatency:
+    """
+    Latenz- und Fehlerverteilung pro Operation (z. B. "thread.get", "graph.search").
+
+    - base_ms: Median der Latenz; jitter "lognormal" (sigma), "uniform" (±sigma·base) oder "none",
+    - error_rate: Anteil transienter Fehler (ApiError mit error_status, Default 503),
+    - rate_limit_rate: Anteil 429-Antworten (mit Retry-After-Header).
+    """
+    base_ms: float = 0.0
+    jitter: str = "lognormal"
+    sigma: float = 0.4
+    error_rate: float = 0.0
+    error_status: int = 503
+    rate_limit_rate: float = 0.0
+    retry_after_s: float = 0.2
+    op_base_ms: Dict[str, float] = field(default_factory=dict)
+    op_error_rate: Dict[str, float] = field(default_factory=dict)
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+
+    def sample_ms(self, op: str) -> float:
+        base = self.op_base_ms.get(op, self.base_ms)
+        if base <= 0:
+            return 0.0
+        if self.jitter == "lognormal":
+            return base * self._rng.lognormvariate(0.0, self.sigma)
+        if self.jitter == "uniform":
+            return max(0.0, base * (1.0 + self._rng.uniform(-self.sigma, self.sigma)))
+        return base
+
+    def sample_error(self, op: str) -> Optional[ApiError]:
+        if self.rate_limit_rate and self._rng.random() < self.rate_limit_rate:
+            return ApiError(status_code=429, headers={"retry-after": str(self.retry_after_s)}, body={"message": "rate limited (fake)"})
+        rate = self.op_error_rate.get(op, self.error_rate)
+        if rate and self._rng.random() < rate:
+            return ApiError(status_code=self.error_status, headers={}, body={"message": f"injected failure in {op} (fake)"})
+        return None
+
+    @classmethod
+    def from_env(cls) -> "FakeLatency":
+        base, op_base = _per_op(os.getenv("GATEWAY_FAKE_ZEP_LATENCY_MS", "0"))
+        err, op_err = _per_op(os.getenv("GATEWAY_FAKE_ZEP_ERROR_RATE", "0"))
+        seed = os.getenv("GATEWAY_FAKE_ZEP_SEED")
+        return cls(
+            base_ms=float(base or 0.0),
+            jitter=os.getenv("GATEWAY_FAKE_ZEP_JITTER", "lognormal"),
+            sigma=float(os.getenv("GATEWAY_FAKE_ZEP_SIGMA", "0.4")),
+            error_rate=float(err or 0.0),
+            error_status=int(os.getenv("GATEWAY_FAKE_ZEP_ERROR_STATUS", "503")),
+            rate_limit_rate=float(os.getenv("GATEWAY_FAKE_ZEP_429_RATE", "0")),
+            op_base_ms=op_base,
+            op_error_rate=op_err,
+            seed=int(seed) if seed else None,
+        )
+
+
+class _Store:
+    """In-Memory-Zustand: User, Threads, Graphen (Episoden/Knoten/Kanten pro Ziel)."""
+
+    def __init__(self) -> None:
+        self.users: Dict[str, SimpleNamespace] = {}
+        self.threads: Dict[str, SimpleNamespace] = {}
+        self.graphs: Dict[str, SimpleNamespace] = {}
+        self.episodes: Dict[str, List[SimpleNamespace]] = {}
+        self.nodes: Dict[str, Dict[str, SimpleNamespace]] = {}
+        self.edges: Dict[str, Dict[str, SimpleNamespace]] = {}
+
+    def target(self, graph_id: Optional[str] = None, user_id: Optional[str] = None) -> str:
+        if graph_id:
+            return f"graph:{graph_id}"
+        if user_id:
+            return f"user:{user_id}"
+        raise ApiError(status_code=400, headers={}, body={"message": "graph_id or user_id required"})
+
+
+class _Namespace:
+    def __init__(self, zep: "FakeZep") -> None:
+        self._zep = zep
+        self._s = zep.store
+
+    async def _io(self, op: str) -> None:
+        await self._zep._simulate(op)
+
+
+class _ThreadNS(_Namespace):
+    async def create(self, *, thread_id: Optional[str] = None, user_id: str, **_: Any) -> SimpleNamespace:
+        await self._io("thread.create")
+        tid = thread_id or f"thread_{uuid.uuid4().hex[:12]}"
+        if tid in self._s.threads:
+            raise ApiError(status_code=400, headers={}, body={"message": f"thread {tid} already exists"})
+        t = SimpleNamespace(thread_id=tid, uuid=tid, user_id=user_id, created_at=_now(), messages=[])
+        self._s.threads[tid] = t
+        return t
+
+    def _get(self, thread_id: str) -> SimpleNamespace:
+        t = self._s.threads.get(thread_id)
+        if t is None:
+            raise ApiError(status_code=404, headers={}, body={"message": f"thread {thread_id} not found"})
+        return t
+
+    async def get(self, *, thread_id: str, lastn: Optional[int] = None, limit: Optional[int] = None, **_: Any) -> SimpleNamespace:
+        await self._io("thread.get")
+        t = self._get(thread_id)
+        n = lastn or limit
+        msgs = t.messages[-n:] if n else list(t.messages)
+        return SimpleNamespace(thread_id=thread_id, messages=list(msgs))
+
+    async def add_messages(self, *, thread_id: str, messages: List[Any], ignore_roles: Optional[List[str]] = None, **_: Any) -> SimpleNamespace:
+        await self._io("thread.add_messages")
+        t = self._get(thread_id)
+        ignore = set(ignore_roles or [])
+        ts = _now()
+        added: List[str] = []
+        for m in messages or []:
+            role = m.get("role") if isinstance(m, dict) else getattr(m, "role", None)
+            content = m.get("content") if isinstance(m, dict) else getattr(m, "content", None)
+            name = m.get("name") if isinstance(m, dict) else getattr(m, "name", None)
+            msg = SimpleNamespace(uuid=uuid.uuid4().hex, role=role, name=name, content=content, created_at=ts)
+            t.messages.append(msg)
+            added.append(msg.uuid)
+            if role not in ignore:
+                # Zep übernimmt Thread-Nachrichten als Episoden in den User-Graph
+                self._zep._add_episode(f"user:{t.user_id}", content or "", role=role, source="thread", thread_id=thread_id)
+        return SimpleNamespace(message_uuids=added)
+
+    async def get_user_context(self, *, thread_id: str, mode: Optional[str] = None, **_: Any) -> SimpleNamespace:
+        await self._io("thread.get_user_context")
+        t = self._get(thread_id)
+        edges = list(self._s.edges.get(f"user:{t.user_id}", {}).values())[-5:]
+        facts = "\n".join(f"- {e.fact}" for e in edges if e.fact)
+        return SimpleNamespace(context=f"FACTS and ENTITIES (fake, mode={mode or 'basic'}):\n{facts}" if facts else "")
+
+    async def delete(self, *, thread_id: str, **_: Any) -> SimpleNamespace:
+        await self._io("thread.delete")
+        self._get(thread_id)
+        self._s.threads.pop(thread_id, None)
+        return SimpleNamespace(message="deleted")
+
+
+class _UserNS(_Namespace):
+    async def add(self, *, user_id: str, **fields: Any) -> SimpleNamespace:
+        await self._io("user.add")
+        if user_id in self._s.users:
+            raise ApiError(status_code=400, headers={}, body={"message": f"user {user_id} already exists"})
+        u = SimpleNamespace(user_id=user_id, created_at=_now(), **fields)
+        self._s.users[user_id] = u
+        return u
+
+    async def get(self, user_id: str, **_: Any) -> SimpleNamespace:
+        await self._io("user.get")
+        u = self._s.users.get(user_id)
+        if u is None:
+            raise ApiError(status_code=404, headers={}, body={"message": f"user {user_id} not found"})
+        return u
+
+
+class _GraphNS(_Namespace):
+    async def create(self, *, graph_id: str, name: Optional[str] = None, description: Optional[str] = None, **_: Any) -> SimpleNamespace:
+        await self._io("graph.create")
+        if graph_id in self._s.graphs:
+            raise ApiError(status_code=400, headers={}, body={"message": f"graph {graph_id} already exists"})
+        g = SimpleNamespace(graph_id=graph_id, name=name, description=description, created_at=_now())
+        self._s.graphs[graph_id] = g
+        return g
+
+    async def list(self, **_: Any) -> SimpleNamespace:
+        await self._io("graph.list")
+        return SimpleNamespace(graphs=list(self._s.graphs.values()))
+
+    async def update(self, *, graph_id: str, **fields: Any) -> SimpleNamespace:
+        await self._io("graph.update")
+        g = self._s.graphs.setdefault(graph_id, SimpleNamespace(graph_id=graph_id, created_at=_now()))
+        for k, v in fields.items():
+            setattr(g, k, v)
+        return g
+
+    async def clone(self, **kwargs: Any) -> SimpleNamespace:
+        await self._io("graph.clone")
+        if kwargs.get("source_user_id"):
+            src, dst = f"user:{kwargs['source_user_id']}", f"user:{kwargs.get('target_user_id') or uuid.uuid4().hex[:8]}"
+        else:
+            gid = kwargs.get("source_graph_id") or kwargs.get("graph_id")
+            dst_id = kwargs.get("target_graph_id") or f"{gid}_{kwargs.get('new_label') or 'copy'}"
+            src, dst = f"graph:{gid}", f"graph:{dst_id}"
+        self._s.episodes[dst] = list(self._s.episodes.get(src, []))
+        self._s.nodes[dst] = dict(self._s.nodes.get(src, {}))
+        self._s.edges[dst] = dict(self._s.edges.get(src, {}))
+        return SimpleNamespace(graph_id=dst.split(":", 1)[1] if dst.startswith("graph:") else None,
+                               user_id=dst.split(":", 1)[1] if dst.startswith("user:") else None)
+
+    async def set_ontology(self, *, graph_id: Optional[str] = None, schema: Any = None, **_: Any) -> SimpleNamespace:
+        await self._io("graph.set_ontology")
+        return SimpleNamespace(message="ok")
+
+    async def add(self, *, data: str, type: str = "text", graph_id: Optional[str] = None, user_id: Optional[str] = None,
+                  role: Optional[str] = None, source: Optional[str] = None, **_: Any) -> SimpleNamespace:
+        await self._io("graph.add")
+        key = self._s.target(graph_id, user_id)
+        return self._zep._add_episode(key, data, role=role, source=source or type)
+
+    async def add_node(self, *, name: str, summary: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None,
+                       graph_id: Optional[str] = None, user_id: Optional[str] = None, **_: Any) -> SimpleNamespace:
+        await self._io("graph.add_node")
+        key = self._s.target(graph_id, user_id)
+        node = SimpleNamespace(uuid=uuid.uuid4().hex, name=name, summary=summary or "", attributes=attributes or {},
+                               labels=["Entity"], created_at=_now(), score=None)
+        self._s.nodes.setdefault(key, {})[node.uuid] = node
+        return node
+
+    async def add_edge(self, *, source_node_uuid: str, target_node_uuid: str, name: str, fact: Optional[str] = None,
+                       graph_id: Optional[str] = None, user_id: Optional[str] = None, **fields: Any) -> SimpleNamespace:
+        await self._io("graph.add_edge")
+        key = self._s.target(graph_id, user_id)
+        edge = SimpleNamespace(uuid=uuid.uuid4().hex, name=name, fact=fact or name, source_node_uuid=source_node_uuid,
+                               target_node_uuid=target_node_uuid, attributes=fields.get("attributes") or {},
+                               rating=fields.get("rating"), valid_at=fields.get("valid_at"), invalid_at=fields.get("invalid_at"),
+                               expired_at=fields.get("expired_at"), created_at=_now(), score=None)
+        self._s.edges.setdefault(key, {})[edge.uuid] = edge
+        return edge
+
+    async def get_node(self, *, node_uuid: str, graph_id: Optional[str] = None, user_id: Optional[str] = None, **_: Any) -> SimpleNamespace:
+        await self._io("graph.get_node")
+        node = self._s.nodes.get(self._s.target(graph_id, user_id), {}).get(node_uuid)
+        if node is None:
+            raise ApiError(status_code=404, headers={}, body={"message": f"node {node_uuid} not found"})
+        return node
+
+    async def get_edge(self, *, edge_uuid: str, graph_id: Optional[str] = None, user_id: Optional[str] = None, **_: Any) -> SimpleNamespace:
+        await self._io("graph.get_edge")
+        edge = self._s.edges.get(self._s.target(graph_id, user_id), {}).get(edge_uuid)
+        if edge is None:
+            raise ApiError(status_code=404, headers={}, body={"message": f"edge {edge_uuid} not found"})
+        return edge
+
+    async def get_node_edges(self, *, node_uuid: str, graph_id: Optional[str] = None, user_id: Optional[str] = None,
+                             direction: Optional[str] = None, **_: Any) -> List[SimpleNamespace]:
+        await self._io("graph.get_node_edges")
+        out = []
+        for e in self._s.edges.get(self._s.target(graph_id, user_id), {}).values():
+            if direction in (None, "out", "outgoing", "both") and e.source_node_uuid == node_uuid:
+                out.append(e)
+            elif direction in (None, "in", "incoming", "both") and e.target_node_uuid == node_uuid:
+                out.append(e)
+        return out
+
+    async def delete_edge(self, *, edge_uuid: str, graph_id: Optional[str] = None, user_id: Optional[str] = None, **_: Any) -> SimpleNamespace:
+        await self._io("graph.delete_edge")
+        self._s.edges.get(self._s.target(graph_id, user_id), {}).pop(edge_uuid, None)
+        return SimpleNamespace(message="deleted")
+
+    async def delete_episode(self, *, episode_uuid: str, graph_id: Optional[str] = None, user_id: Optional[str] = None, **_: Any) -> SimpleNamespace:
+        await self._io("graph.delete_episode")
+        key = self._s.target(graph_id, user_id)
+        self._s.episodes[key] = [e for e in self._s.episodes.get(key, []) if e.uuid != episode_uuid]
+        return SimpleNamespace(message="deleted")
+
+    async def search(self, *, query: str, graph_id: Optional[str] = None, user_id: Optional[str] = None,
+                     limit: int = 10, scope: Optional[str] = None, **_: Any) -> SimpleNamespace:
+        await self._io("graph.search")
+        key = self._s.target(graph_id, user_id)
+        scope = scope or "edges"
+        q = _tokens(query)
+
+        def _rank(items: List[SimpleNamespace], text_of: Any) -> List[SimpleNamespace]:
+            scored = []
+            for it in items:
+                toks = _tokens(text_of(it))
+                score = 0.5 if query.strip() in ("", "*") else (len(q & toks) / max(1, len(q)))
+                if score > 0:
+                    scored.append(SimpleNamespace(**{**vars(it), "score": round(score, 4)}))
+            scored.sort(key=lambda x: x.score, reverse=True)
+            return scored[: int(limit)]
+
+        res = SimpleNamespace(edges=[], nodes=[], episodes=[])
+        if scope == "edges":
+            res.edges = _rank(list(self._s.edges.get(key, {}).values()), lambda e: f"{e.name} {e.fact}")
+        elif scope == "nodes":
+            res.nodes = _rank(list(self._s.nodes.get(key, {}).values()), lambda n: f"{n.name} {n.summary}")
+        elif scope == "episodes":
+            res.episodes = _rank(self._s.episodes.get(key, []), lambda e: e.content)
+        return res
+
+
+class FakeZep:
+    """
+    Offline-Ersatz für AsyncZep (thread / user / graph) mit In-Memory-Zustand.
+
+    - gleiche Keyword-Signaturen wie die Call-Sites in memory.py / bootstrap.py,
+      Rückgaben als Objekte mit denselben Attributen (thread_id, messages, context, edges …),
+    - injizierte Latenz und Fehler pro Operation (FakeLatency); Fehler sind echte ApiError,
+      damit Resilienz-Schicht, Rate-Governor und Outbox realistisch reagieren,
+    - graph.add / thread.add_messages legen Episoden plus je eine Fakt-Kante an
+      (synchrone Nachbildung der Zep-Extraktion), sodass Suche und User-Context Inhalte liefern,
+    - stats(): Calls, injizierte Latenz und Fehler pro Operation (für Benchmarks).
+    """
+
+    def __init__(self, latency: FakeLatency | None = None) -> None:
+        self.latency = latency or FakeLatency()
+        self.store = _Store()
+        self.calls: Dict[str, int] = {}
+        self.injected_ms: Dict[str, float] = {}
+        self.errors: Dict[str, int] = {}
+        self.thread = _ThreadNS(self)
+        self.user = _UserNS(self)
+        self.graph = _GraphNS(self)
+
+    async def _simulate(self, op: str) -> None:
+        self.calls[op] = self.calls.get(op, 0) + 1
+        delay_ms = self.latency.sample_ms(op)
+        if delay_ms > 0:
+            self.injected_ms[op] = self.injected_ms.get(op, 0.0) + delay_ms
+            await asyncio.sleep(delay_ms / 1000.0)
+        err = self.latency.sample_error(op)
+        if err is not None:
+            self.errors[op] = self.errors.get(op, 0) + 1
+            raise err
+
+    def _add_episode(self, key: str, content: str, *, role: Optional[str], source: Optional[str],
+                     thread_id: Optional[str] = None) -> SimpleNamespace:
+        ep = SimpleNamespace(uuid=uuid.uuid4().hex, content=content, role=role, source=source,
+                             thread_id=thread_id, created_at=_now(), score=None)
+        self.store.episodes.setdefault(key, []).append(ep)
+        fact = (content or "").strip().split("\n", 1)[0][:200]
+        if fact:
+            edge = SimpleNamespace(uuid=uuid.uuid4().hex, name="MENTIONS", fact=fact, source_node_uuid=None,
+                                   target_node_uuid=None, attributes={}, rating=None, valid_at=None,
+                                   invalid_at=None, expired_at=None, created_at=ep.created_at, score=None)
+            self.store.edges.setdefault(key, {})[edge.uuid] = edge
+        return ep
+
+    # ---- Statistik -------------------------------------------------------------
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": dict(self.calls),
+            "total_calls": sum(self.calls.values()),
+            "injected_ms": {k: round(v, 3) for k, v in self.injected_ms.items()},
+            "errors": dict(self.errors),
+            "threads": len(self.store.threads),
+            "users": len(self.store.users),
+        }
+
+    def reset_stats(self) -> None:
+        self.calls.clear()
+        self.injected_ms.clear()
+        self.errors.clear()
+
+    @classmethod
+    def from_env(cls) -> "FakeZep":
+        lat = FakeLatency.from_env()
+        logger.info(f"fake zep active (latency={lat.base_ms}ms {lat.jitter}, error_rate={lat.error_rate}, 429_rate={lat.rate_limit_rate})")
+        return cls(lat)
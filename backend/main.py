@@ -2,8 +2,10 @@
 from __future__ import annotations
 
 from contextlib import asynccontextmanager
+from typing import Any
 from uuid import uuid4
 from time import perf_counter
+import asyncio
 import os
 import sys
 
@@ -15,29 +17,24 @@ LOG_LEVEL = os.getenv("GATEWAY_LOG_LEVEL", "INFO")
 logger.remove()
 logger.add(sys.stderr, level=LOG_LEVEL)
 
-# Projekt-Imports
+# Projekt-Imports (Dauer landet im Startup-Report unter /status/startup)
+_import_started = perf_counter()
 from backend import bootstrap
 from backend.routes.websocket import start_watcher
 from backend.routes.chat_api import router as chat_router
 from backend.routes.agent_hq import router as agent_hq_router
 from backend.routes import reset_api
+from backend.routes import status_api
+from backend.readiness import Readiness, warm_up
+from backend.zep_pool import close_thread_owners
+IMPORT_MS = round((perf_counter() - _import_started) * 1000.0, 1)
 
 
 # -----------------------------------------------------------------------------#
 # 🌱 Lifespan: Init & App-State
 # -----------------------------------------------------------------------------#
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """
-    Initialisiert beim App-Start die gesamte Runtime:
-    - Lädt Keys/Modelle über bootstrap.ensure_runtime()
-    - Erstellt Zep-Client, Threads T1..T6, HMA, ContextProvider, Messaging
-    - Startet optional den Dateiwächter (Hot-Reload)
-    """
-    logger.info("🚀 [Lifespan] Starte Gateway Backend – initialisiere Runtime…")
-
-    runtime = await bootstrap.ensure_runtime()
-
+def _attach_runtime(app: FastAPI, runtime: Any, lifespan_started: float) -> None:
+    """Runtime in den App-State hängen (nach dem Bootstrap – im Vorder- oder Hintergrund)."""
     # Gemeinsamer App-State für alle Endpoints
     app.state.runtime      = runtime
     app.state.zep_client   = runtime.zep_client
@@ -64,6 +61,61 @@ async def lifespan(app: FastAPI):
         runtime.t5_thread_id,
         runtime.t6_thread_id,
     )
+    app.state.startup = {
+        "import_ms": IMPORT_MS,
+        "lifespan_ms": round((perf_counter() - lifespan_started) * 1000.0, 1),
+    }
+    logger.info(
+        "⏱️ [Lifespan] Startup: import={} ms, bootstrap={} ms (Details: GET /status/startup)",
+        IMPORT_MS,
+        runtime.startup_phases.get("total"),
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Initialisiert beim App-Start die gesamte Runtime:
+    - Lädt Keys/Modelle über bootstrap.ensure_runtime()
+    - Erstellt Zep-Client, Threads T1..T6, HMA, ContextProvider, Messaging
+    - Warm-up (Verbindungen, T1-Caches, Agenten) im Hintergrund; /status/ready meldet 200 erst danach
+    - GATEWAY_BOOTSTRAP_BACKGROUND=1: auch der Bootstrap läuft im Hintergrund, die App nimmt sofort
+      Verbindungen an (/status/live), Requests warten über require_runtime auf die Runtime
+    - Startet optional den Dateiwächter (Hot-Reload)
+    """
+    logger.info("🚀 [Lifespan] Starte Gateway Backend – initialisiere Runtime…")
+    lifespan_started = perf_counter()
+    readiness = Readiness()
+    app.state.readiness = readiness
+
+    async def _boot() -> None:
+        readiness.set_state("bootstrapping")
+        runtime = await bootstrap.ensure_runtime()
+        _attach_runtime(app, runtime, lifespan_started)
+        readiness.runtime_attached()
+
+    async def _warm() -> None:
+        try:
+            if os.getenv("GATEWAY_WARMUP", "1") == "1":
+                await warm_up(app.state.runtime, readiness)
+        except Exception as e:
+            # Warm-up ist Optimierung – ein Fehler darf die Readiness nicht blockieren
+            logger.warning(f"⚠️ [Lifespan] Warm-up abgebrochen: {e!r}")
+        readiness.mark_ready()
+
+    async def _boot_and_warm() -> None:
+        try:
+            await _boot()
+            await _warm()
+        except Exception as e:
+            logger.exception(f"❌ [Lifespan] Start fehlgeschlagen: {e}")
+            readiness.mark_failed(e)
+
+    if os.getenv("GATEWAY_BOOTSTRAP_BACKGROUND", "0") == "1":
+        start_task = asyncio.create_task(_boot_and_warm(), name="lifespan-start")
+    else:
+        await _boot()
+        start_task = asyncio.create_task(_warm(), name="lifespan-warmup")
 
     # Optionaler Watcher (Hot-Reload für /app/backend)
     try:
@@ -76,6 +128,49 @@ async def lifespan(app: FastAPI):
         yield
     finally:
         logger.info("🧹 [Lifespan] FastAPI shutting down.")
+        if not start_task.done():
+            start_task.cancel()
+            await asyncio.gather(start_task, return_exceptions=True)
+        runtime = getattr(app.state, "runtime", None)
+        coordinator = getattr(runtime, "coordinator", None)
+        outbox = getattr(runtime, "outbox", None)
+        if outbox is not None and coordinator is not None and not coordinator.is_leader:
+            outbox.outbox.close()  # Zustellung ist Sache des Leader-Workers
+        elif outbox is not None:
+            # offene Writes zustellen (begrenzt); Rest bleibt in der Outbox und läuft nach dem Restart weiter
+            left = await outbox.stop(drain_timeout_s=float(os.getenv("GATEWAY_OUTBOX_DRAIN_S", "10")))
+            if left.get("pending"):
+                logger.warning(f"📮 [Lifespan] Outbox: {left['pending']} Writes bleiben für den nächsten Start liegen.")
+            outbox.outbox.close()
+        verify = getattr(runtime, "bootstrap_verify", None)
+        if verify is not None and not verify.done():
+            verify.cancel()
+        profile_view = getattr(runtime, "profile_view", None)
+        if profile_view is not None:
+            await profile_view.stop()
+        thread_gc = getattr(runtime, "thread_gc", None)
+        if thread_gc is not None:
+            await thread_gc.stop()
+        sessions = getattr(runtime, "sessions", None)
+        if sessions is not None:
+            await sessions.stop()
+        thread_registry = getattr(runtime, "thread_registry", None)
+        if thread_registry is not None:
+            await thread_registry.stop()  # letzte touch()-Zeitstempel persistieren
+        if coordinator is not None:
+            await coordinator.stop()  # Leader-Lease sofort freigeben
+        read_cache = getattr(runtime, "read_cache", None)
+        if read_cache is not None:
+            read_cache.close()
+        cassette = getattr(runtime, "cassette", None)
+        if cassette is not None:
+            cassette.close()
+        zep_client = getattr(runtime, "zep_client", None)
+        if zep_client is not None:
+            await asyncio.to_thread(close_thread_owners, zep_client)  # Zep-Pool: offene Besitzer-Einträge schreiben
+        zep_http = getattr(runtime, "zep_http", None)
+        if zep_http is not None:
+            await zep_http.aclose()
 
 
 # -----------------------------------------------------------------------------#
@@ -90,6 +185,7 @@ app = FastAPI(
 app.include_router(chat_router, tags=["chat"])
 app.include_router(reset_api.router)
 app.include_router(agent_hq_router)
+app.include_router(status_api.router)
 
 # -----------------------------------------------------------------------------#
 # 🧾 Middleware: Correlation-Id & Request-Logging
@@ -1,10 +1,30 @@
 # backend/memory/graph_api.py
 from __future__ import annotations
 from typing import Any, Dict, List, Literal, Callable
+import logging
 from zep_cloud.client import AsyncZep
 
 from dataclasses import dataclass, asdict
+import hashlib
+import json
+import os
 from .memory import ZepGraphAdmin  # Low-Level only; Normierung erfolgt hier
+from .overlay import RecentWritesOverlay, target_key
+from .read_cache import ReadCache
+from .tag_index import TagIndex, normalize_month_day, parse_tagged_payload
+from .vector_index import LocalVectorIndex
+
+logger = logging.getLogger(__name__)
+
+# Listener für frische Graph-Writes: (target_key, normalisierte Episode) → None
+WriteListener = Callable[[str, Dict[str, Any]], None]
+
+# Retrieval-Modi für search(): remote | fallback (remote, bei Fehler lokal) | auto (lokal zuerst) | local
+_RETRIEVAL_MODES = ("remote", "fallback", "auto", "local")
+_SCOPE_TYPES = {"edges": {"edge"}, "nodes": {"node"}, "episodes": {"episode"}}
+
+# Read-Cache-Namespace für normalisierte Remote-Suchergebnisse (Schlüssel: "<target>|<params-hash>")
+_SEARCH_NS = "graph.search"
 
 
 # ---------------------------------------------------------------------------------
@@ -98,10 +118,30 @@ class GraphAPI:
     Dünne, zentrale Fassade. Hält *eine* ZepGraphAdmin-Instanz
     und bietet eine einheitliche, normalisierte API für Tools & Module.
     """
-    def __init__(self, client: AsyncZep, *, graph_id: str | None = None, user_id: str | None = None) -> None:
+    def __init__(self, client: AsyncZep, *, graph_id: str | None = None, user_id: str | None = None,
+                 overlay: RecentWritesOverlay | None = None,
+                 write_listeners: List[WriteListener] | None = None,
+                 tag_index: TagIndex | None = None,
+                 vector_index: LocalVectorIndex | None = None,
+                 retrieval: str = "fallback",
+                 local_min_score: float = 0.35,
+                 read_cache: ReadCache | None = None,
+                 search_ttl_s: float = 60.0,
+                 search_stale_ttl_s: float = 86_400.0) -> None:
         # Merke dir den Client für spätere Scopes
         self._client = client
         self._admin = ZepGraphAdmin(client=client, graph_id=graph_id, user_id=user_id)
+        # Read-your-writes, Listener, Tag-Index: werden von Scopes geteilt (Schlüssel enthält das Ziel)
+        self._overlay = overlay if overlay is not None else RecentWritesOverlay()
+        self._listeners: List[WriteListener] = write_listeners if write_listeners is not None else []
+        self._tag_index = tag_index if tag_index is not None else TagIndex()
+        self._vectors = vector_index if vector_index is not None else LocalVectorIndex()
+        self._retrieval = retrieval if retrieval in _RETRIEVAL_MODES else "fallback"
+        self._local_min_score = float(local_min_score)
+        # Optionaler persistenter Read-Cache (Speicher + SQLite), ebenfalls geteilt
+        self._cache = read_cache
+        self._search_ttl_s = float(search_ttl_s)
+        self._search_stale_ttl_s = float(search_stale_ttl_s)
 
     # Neue Helper: aktuelle Targets & Scopes
     def current_target(self) -> Dict[str, Any]:
@@ -111,7 +151,92 @@ class GraphAPI:
         """Neues GraphAPI mit gleichem Client, aber anderem graph_id."""
         target = self._admin.target_kwargs()
         user_id = target.get("user_id")
-        return GraphAPI(self._client, graph_id=graph_id, user_id=user_id)
+        return GraphAPI(self._client, graph_id=graph_id, user_id=user_id,
+                        overlay=self._overlay, write_listeners=self._listeners,
+                        tag_index=self._tag_index, vector_index=self._vectors,
+                        retrieval=self._retrieval, local_min_score=self._local_min_score,
+                        read_cache=self._cache, search_ttl_s=self._search_ttl_s,
+                        search_stale_ttl_s=self._search_stale_ttl_s)
+
+    @property
+    def overlay(self) -> RecentWritesOverlay:
+        return self._overlay
+
+    @property
+    def tag_index(self) -> TagIndex:
+        return self._tag_index
+
+    @property
+    def vector_index(self) -> LocalVectorIndex:
+        return self._vectors
+
+    @property
+    def read_cache(self) -> ReadCache | None:
+        return self._cache
+
+    def _invalidate_searches(self, key: str) -> None:
+        if self._cache is not None:
+            self._cache.invalidate_prefix(_SEARCH_NS, key + "|")
+
+    def _index_vectors(self, key: str, items: List[Dict[str, Any]]) -> None:
+        for it in items:
+            if it.get("pending"):
+                continue  # Overlay-Einträge sind bereits beim Write indexiert
+            text = str(it.get("content") or "")
+            item_id = str(it.get("uuid") or "") or "local:" + hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+            self._vectors.upsert(key, item_id, text, it)
+
+    def add_write_listener(self, listener: WriteListener) -> None:
+        """Registriert einen Listener, der jede frisch geschriebene Episode erhält."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def _target_key(self, user_id: str | None = None) -> str:
+        target = self._admin.target_kwargs()
+        # add_raw_data(user_id=...) schreibt nur ohne graph_id in den User-Graph
+        if user_id and "graph_id" not in target:
+            target = {"user_id": user_id}
+        return target_key(target)
+
+    @staticmethod
+    def _normalize_write(res: Any, *, data: str, role: str | None, source: str | None) -> Dict[str, Any]:
+        ep = _episode_from_zep(res).to_dict()
+        if not ep.get("content"):
+            ep["content"] = data
+        ep["role"] = ep.get("role") or role
+        ep["source"] = ep.get("source") or source
+        return ep
+
+    def _remember_write(self, res: Any, *, data: str, role: str | None, source: str | None,
+                        user_id: str | None = None) -> Dict[str, Any]:
+        """Normalisiert das graph.add-Resultat und legt es im Read-your-writes-Overlay ab."""
+        ep = self._normalize_write(res, data=data, role=role, source=source)
+        key = self._target_key(user_id)
+        self._overlay.record(key, ep)
+        self._tag_index.index_item(key, ep)
+        self._index_vectors(key, [ep])
+        self._invalidate_searches(key)
+        for listener in list(self._listeners):
+            try:
+                listener(key, ep)
+            except Exception as e:
+                logger.debug(f"graph write-listener failed: {e}")
+        return ep
+
+    def _confirm_write(self, res: Any, *, data: str, role: str | None, source: str | None,
+                       user_id: str | None = None) -> Dict[str, Any]:
+        """Zustellung eines per note_local_write vermerkten Writes: lokale IDs gegen die Zep-uuid tauschen."""
+        ep = self._normalize_write(res, data=data, role=role, source=source)
+        key = self._target_key(user_id)
+        self._invalidate_searches(key)
+        if ep.get("uuid"):
+            self._vectors.remove(key, "local:" + hashlib.sha1(data.encode("utf-8")).hexdigest()[:16])
+            self._index_vectors(key, [ep])
+            parsed = parse_tagged_payload(data)
+            if parsed is not None:
+                self._tag_index.remove(key, "local:" + hashlib.sha1(parsed[0].encode("utf-8")).hexdigest()[:16])
+                self._tag_index.index_item(key, ep)
+        return ep
 
     # ---- Mutierende Aktionen -------------------------------------------------
     async def set_ontology(self, schema: Dict[str, Any]) -> Dict[str, Any]:
@@ -121,6 +246,7 @@ class GraphAPI:
 
     async def add_node(self, name: str, *, summary: str | None = None, attributes: Dict[str, Any] | None = None) -> Dict[str, Any]:
         node = await self._admin.add_node(name=name, summary=summary, attributes=attributes or {})
+        self._invalidate_searches(self._target_key())
         return {"ok": True, "data": {"node": _node_from_zep(node).to_dict()}}
 
     async def add_edge(self, *, head_uuid: str, relation: str, tail_uuid: str,
@@ -133,6 +259,7 @@ class GraphAPI:
             fact=fact, attributes=attributes, rating=rating,
             valid_at=valid_at, invalid_at=invalid_at, expired_at=expired_at,
             graph_id=graph_id)
+        self._invalidate_searches(target_key({"graph_id": graph_id}) if graph_id else self._target_key())
         return {"ok": True, "data": {"edge": _edge_from_zep(res).to_dict()}}
 
     async def add_data(self, *, data: str, data_type: Literal["text","json","message"] = "text",
@@ -142,30 +269,51 @@ class GraphAPI:
         parts = split_long_text(data, max_len=10_000)
         last = None
         for chunk in parts:
-            last = await self._admin.add_raw_data(
+            res = await self._admin.add_raw_data(
                 user_id=None, data_type=data_type, data=chunk,
                 role=role, source=source, metadata=metadata or {})
-        return {"ok": True, "data": {"episode": _episode_from_zep(last).to_dict() if last else None}}
+            last = self._remember_write(res, data=chunk, role=role, source=source)
+        return {"ok": True, "data": {"episode": last}}
 
     # Alias für bestehenden Call-Site-Namen aus P0 (Memory.add → api.add_raw_data)
     async def add_raw_data(self, *, user_id: str | None, data_type: Literal["text","json","message"] = "text", data: str,
                            role: str | None = None, source: str | None = None,
-                           metadata: Dict[str, Any] | None = None) -> Dict[str, Any]:
+                           metadata: Dict[str, Any] | None = None, record_local: bool = True) -> Dict[str, Any]:
+        """record_local=False: Zustellung eines bereits per note_local_write vermerkten Writes (Outbox)."""
         from .memory_utils import split_long_text
         parts = split_long_text(data, max_len=10_000)
         last = None
         for chunk in parts:
-            last = await self._admin.add_raw_data(
+            res = await self._admin.add_raw_data(
                 user_id=user_id, data_type=data_type, data=chunk,
                 role=role, source=source, metadata=metadata or {})
-        return {"ok": True, "data": {"episode": _episode_from_zep(last).to_dict() if last else None}}
+            if record_local:
+                last = self._remember_write(res, data=chunk, role=role, source=source, user_id=user_id)
+            else:
+                last = self._confirm_write(res, data=chunk, role=role, source=source, user_id=user_id)
+        return {"ok": True, "data": {"episode": last}}
+
+    def note_local_write(self, *, user_id: str | None, data: str, role: str | None = None,
+                         source: str | None = None, **_: Any) -> None:
+        """
+        Write, der erst später zugestellt wird (Outbox): sofort in Overlay, Tag-/Vektor-Index und
+        Write-Listener (Profil-View) aufnehmen – wie add_raw_data, nur ohne Zep-Resultat.
+        """
+        from .memory_utils import split_long_text
+        for chunk in split_long_text(data, max_len=10_000):
+            self._remember_write(None, data=chunk, role=role, source=source, user_id=user_id)
 
     async def delete_edge(self, edge_uuid: str, *, graph_id: str | None = None) -> Dict[str, Any]:
         await self._admin.delete_edge(edge_uuid=edge_uuid, graph_id=graph_id)
+        self._invalidate_searches(target_key({"graph_id": graph_id}) if graph_id else self._target_key())
         return {"ok": True, "data": {"edge_uuid": edge_uuid}}
 
     async def delete_episode(self, episode_uuid: str, *, graph_id: str | None = None) -> Dict[str, Any]:
         await self._admin.delete_episode(episode_uuid=episode_uuid, graph_id=graph_id)
+        key = target_key({"graph_id": graph_id}) if graph_id else self._target_key()
+        self._tag_index.remove(key, episode_uuid)
+        self._vectors.remove(key, episode_uuid)
+        self._invalidate_searches(key)
         return {"ok": True, "data": {"episode_uuid": episode_uuid}}
 
     async def clone_graph(self, *, src_graph_id: str, new_label: str) -> Dict[str, Any]:
@@ -181,13 +329,98 @@ class GraphAPI:
         """
         Liefert direkt die normalisierte Ergebnisliste (Edge/Node/Episode → dict).
         Kein Wrapper-Objekt mehr, damit Call-Sites (z. B. ZepMemory) sofort Listen verarbeiten.
+        Noch nicht von Zep verarbeitete eigene Schreibvorgänge werden vorne eingemischt
+        (Markierung "pending": True).
+        Filter tags=[...] / month_day="MM-DD" beantworten exakt aus dem lokalen Tag-Index.
+        retrieval="local"|"auto"|"fallback"|"remote" wählt den lokalen Vektorindex als
+        First-Pass bzw. Fallback (Default aus GATEWAY_LOCAL_RETRIEVAL).
+        """
+        tags = params.pop("tags", None)
+        month_day = params.pop("month_day", None)
+        limit = int(params.get("limit") or 10)
+        if tags or month_day:
+            return await self.find_tagged(tags=tags, month_day=month_day, limit=limit)
+        mode = str(params.pop("retrieval", None) or self._retrieval)
+        query = str(params.get("query") or "")
+        key = self._target_key()
+        if mode in ("local", "auto"):
+            local = self.search_local(query, limit=limit, scope=params.get("scope"))
+            if mode == "local" or len(local) >= limit:
+                return local
+        try:
+            results = await self._search_remote(key, params)
+        except Exception:
+            if mode == "remote":
+                raise
+            local = self.search_local(query, limit=limit, scope=params.get("scope"))
+            if not local:
+                raise
+            logger.warning("graph.search failed – serving %d local results", len(local))
+            return local
+        self._index_vectors(key, results)
+        return self._overlay.merge(key, query, results, limit=limit)
+
+    async def _search_remote(self, key: str, params: Dict[str, Any]) -> List[dict[str, Any]]:
+        """
+        Remote-Suche inkl. Normalisierung; mit Read-Cache: frisch → direkt, abgelaufen → stale
+        ausliefern und im Hintergrund neu laden (überlebt Restarts über die SQLite-Stufe).
+        Writes auf das Ziel (add_*, delete_*, Outbox-Zustellung) verwerfen dessen Einträge; andere
+        Worker verwerfen ihre Speicher-Stufe über die Write-Version graph:<target> (Coordinator.sync).
+        """
+        async def _load() -> List[dict[str, Any]]:
+            raw = await self._admin.search(**params)
+            results: list[dict[str, Any]] = []
+            for e in (getattr(raw, "edges", []) or []):   results.append(_edge_from_zep(e).to_dict())
+            for n in (getattr(raw, "nodes", []) or []):   results.append(_node_from_zep(n).to_dict())
+            for ep in (getattr(raw, "episodes", []) or []): results.append(_episode_from_zep(ep).to_dict())
+            return results
+
+        if self._cache is None:
+            return await _load()
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:20]
+        cached = await self._cache.get_or_load(
+            _SEARCH_NS, f"{key}|{digest}", _load,
+            ttl_s=self._search_ttl_s, stale_ttl_s=self._search_stale_ttl_s)
+        return [dict(it) for it in cached]
+
+    def search_local(self, query: str, *, limit: int = 10, scope: str | None = None) -> List[dict[str, Any]]:
+        """Schneller First-Pass über den In-Process-Vektorindex (ohne Netz-I/O)."""
+        hits = self._vectors.search(
+            self._target_key(), query, k=limit, min_score=self._local_min_score,
+            types=_SCOPE_TYPES.get(scope or ""))
+        out: List[dict[str, Any]] = []
+        for score, item in hits:
+            item["score"] = score
+            item["retrieval"] = "local"
+            out.append(item)
+        return out
+
+    async def find_tagged(self, *, tags: List[str] | None = None, month_day: str | None = None,
+                          limit: int | None = None) -> List[dict[str, Any]]:
+        """
+        Exakte, indexierte Suche nach Tags/month_day (lazy Backfill aus dem Graphen). Solange der
+        Backfill nicht vollständig ist, ergänzt eine gezielte Remote-Suche den lokalen Index.
         """
-        raw = await self._admin.search(**params)
-        results: list[dict[str, Any]] = []
-        for e in (getattr(raw, "edges", []) or []):   results.append(_edge_from_zep(e).to_dict())
-        for n in (getattr(raw, "nodes", []) or []):   results.append(_node_from_zep(n).to_dict())
-        for ep in (getattr(raw, "episodes", []) or []): results.append(_episode_from_zep(ep).to_dict())
-        return results
+        key = self._target_key()
+        if not self._tag_index.is_backfilled(key):
+            await self._tag_index.backfill(key, self)
+        if not self._tag_index.is_backfilled(key):
+            md = normalize_month_day(month_day)
+            query = " ".join([*(str(t) for t in tags or []), *([f"date:{md}"] if md else [])])
+            try:
+                items = await self.search(query=query, scope="episodes", limit=max(int(limit or 10), 10),
+                                          retrieval="remote")
+            except Exception as e:
+                logger.debug(f"tagged remote search failed, serving tag index only: {e}")
+            else:
+                for it in items:
+                    self._tag_index.index_item(key, it)
+        recs = self._tag_index.lookup(key, tags=tags, month_day=month_day, limit=limit)
+        return [
+            {"type": "episode", "uuid": r.get("uuid"), "content": r.get("text"), "tags": r.get("tags"),
+             "month_day": r.get("month_day"), "created_at": r.get("created_at"), "source": "tag_index"}
+            for r in recs
+        ]
 
     async def get_node(self, node_uuid: str, *, graph_id: str | None = None) -> Dict[str, Any]:
         obj = await self._admin.get_node(node_uuid=node_uuid, graph_id=graph_id)
@@ -208,9 +441,33 @@ class GraphAPIProvider:
     Sehr schlanke Factory/DI: liefert *eine* GraphAPI-Instanz pro Scope.
     Tools bekommen nur noch get_api() injiziert – keine Admin-News.
     """
-    def __init__(self, client: AsyncZep, *, graph_id: str | None = None, user_id: str | None = None) -> None:
+    def __init__(self, client: AsyncZep, *, graph_id: str | None = None, user_id: str | None = None,
+                 overlay: RecentWritesOverlay | None = None,
+                 write_listeners: List[WriteListener] | None = None,
+                 tag_index: TagIndex | None = None,
+                 vector_index: LocalVectorIndex | None = None,
+                 read_cache: ReadCache | None = None) -> None:
         self._client = client
-        self._api = GraphAPI(client=client, graph_id=graph_id, user_id=user_id)
+        if overlay is None:
+            overlay = RecentWritesOverlay(
+                ttl_s=float(os.getenv("GATEWAY_RYW_TTL_S", "120")),
+                max_per_target=int(os.getenv("GATEWAY_RYW_MAX_ITEMS", "200")),
+            )
+        self._overlay = overlay
+        self._listeners: List[WriteListener] = write_listeners if write_listeners is not None else []
+        self._tag_index = tag_index if tag_index is not None else TagIndex()
+        if vector_index is None:
+            vector_index = LocalVectorIndex(max_items=int(os.getenv("GATEWAY_LOCAL_INDEX_MAX_ITEMS", "20000")))
+        self._vectors = vector_index
+        self._cache = read_cache
+        self._api = GraphAPI(client=client, graph_id=graph_id, user_id=user_id,
+                             overlay=overlay, write_listeners=self._listeners,
+                             tag_index=self._tag_index, vector_index=vector_index,
+                             retrieval=os.getenv("GATEWAY_LOCAL_RETRIEVAL", "fallback"),
+                             local_min_score=float(os.getenv("GATEWAY_LOCAL_MIN_SCORE", "0.35")),
+                             read_cache=read_cache,
+                             search_ttl_s=float(os.getenv("GATEWAY_CACHE_SEARCH_TTL_S", "60")),
+                             search_stale_ttl_s=float(os.getenv("GATEWAY_CACHE_SEARCH_STALE_S", "86400")))
 
     def get_api(self) -> GraphAPI:
         return self._api
@@ -225,4 +482,7 @@ class GraphAPIProvider:
             user_id = self._api.current_target().get("user_id")
         except Exception:
             pass
-        return GraphAPIProvider(self._client, graph_id=graph_id, user_id=user_id)
\ No newline at end of file
+        return GraphAPIProvider(self._client, graph_id=graph_id, user_id=user_id,
+                                overlay=self._overlay, write_listeners=self._listeners,
+                                tag_index=self._tag_index, vector_index=self._vectors,
+                                read_cache=self._cache)
\ No newline at end of file
@@ -23,20 +23,40 @@ from zep_cloud.core.api_error import ApiError
 # from zep_cloud.thread import Message, Role
 from datetime import datetime
 import logging
+import os
 import time
 import uuid
+from .rate_governor import BACKGROUND, INTERACTIVE, current_priority
+from .resilience import get_resilience
 logger = logging.getLogger(__name__)
 
 class MemoryBackendError(RuntimeError):
     pass
 
+# Zep-Operationen nach Semantik: Reads sind idempotent, werden ab p95 gehedged und vom
+# Rate-Governor bevorzugt; idempotente Writes dürfen wiederholt werden; alles andere
+# (add/create/clone) läuft genau einmal (außer nach 429) mit Background-Priorität.
+_READ_OPS = {"thread.get", "thread.get_user_context", "graph.search", "graph.list",
+             "graph.get_node", "graph.get_edge", "graph.get_node_edges"}
+_IDEMPOTENT_OPS = _READ_OPS | {"thread.delete", "graph.update", "graph.set_ontology",
+                               "graph.delete_edge", "graph.delete_episode"}
+
+
+async def _zep_call(op: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Jeder Zep-Call läuft über die Resilienz-Schicht (Rate-Governor, Deadline, Retry, Breaker, Hedging)."""
+    return await get_resilience().call(
+        op, lambda: fn(*args, **kwargs),
+        idempotent=op in _IDEMPOTENT_OPS, hedge=op in _READ_OPS,
+        priority=current_priority(INTERACTIVE if op in _READ_OPS else BACKGROUND))
+
 ######################################################################################################
 # Hauptklasse: ZepMemory
 ######################################################################################################
 class ZepMemory(Memory):
     def __init__(self,client: AsyncZep, user_id: str, thread_id: Optional[str] = None, **kwargs: Any) -> None:
-        if not isinstance(client, AsyncZep):
-            raise TypeError("client must be an instance of AsyncZep")
+        # Duck-Typing: AsyncZep oder AsyncZep-kompatibel (z. B. ZepClientPool)
+        if not (hasattr(client, "thread") and hasattr(client, "graph")):
+            raise TypeError("client must be an AsyncZep-compatible client (thread/graph namespaces)")
         if not user_id:
             raise ValueError("user_id is required")
         self._client: AsyncZep = client
@@ -45,6 +65,8 @@ class ZepMemory(Memory):
         self._logger = logging.getLogger(__name__)
         self._thread = ZepThreadMemory(self._client, self._user_id, thread_id=thread_id)
         self._get_api_cb: Optional[Callable[[], Any]] = None
+        self._profile_view: Any | None = None  # ProfileFactsView (optional, via set_profile_view)
+        self._outbox: Any | None = None  # OutboxReplayer (optional, via set_outbox)
         self._reset_after: float | None = None
 
     @property
@@ -58,6 +80,39 @@ class ZepMemory(Memory):
     def set_api(self, get_api: Callable[[], Any]) -> None:
         self._get_api_cb = get_api
 
+    def set_read_cache(self, cache: Any) -> None:
+        """Persistenter Read-Cache (ReadCache) für Thread-Nachrichten und User-Context."""
+        self._thread.set_read_cache(cache)
+
+    def set_profile_view(self, view: Any) -> None:
+        """Materialisierte Profil-Fakten (ProfileFactsView) statt per-Turn-Wildcard-Suche."""
+        self._profile_view = view
+
+    def set_outbox(self, replayer: Any) -> None:
+        """Dauerhafte Outbox (OutboxReplayer): Thread- und Graph-Writes lokal annehmen, im Hintergrund zustellen."""
+        self._outbox = replayer
+        self._thread.set_outbox(replayer)
+
+    def set_thread_registry(self, registry: Any) -> None:
+        """ThreadRegistry: letzte Nutzung je Thread-ID für den Thread-GC (backend/memory/thread_gc.py)."""
+        self._thread.set_thread_registry(registry)
+
+    def add_write_listener(self, fn: Callable[[str], None]) -> None:
+        """fn(thread_id) nach jedem angenommenen Thread-Write (z. B. Worker-Koordination)."""
+        self._thread.add_write_listener(fn)
+
+    def invalidate_cache(self, *, local_only: bool = False) -> None:
+        self._thread.invalidate_cache(local_only=local_only)
+
+    async def _add_graph_data(self, **kwargs: Any) -> None:
+        if self._outbox is not None:
+            self._outbox.outbox.enqueue(f"graph:user:{self._user_id}", "graph.add_raw_data", kwargs)
+            self._outbox.notify()
+            # read-your-writes: Overlay/Indizes/Profil-View sehen den Write schon vor der Zustellung
+            self._get_api().note_local_write(**kwargs)
+            return
+        await self._get_api().add_raw_data(**kwargs)
+
     def _get_api(self):
         if not self._get_api_cb:
             raise RuntimeError("GraphAPI ist nicht injiziert. Bitte via set_api(...) setzen.")
@@ -97,8 +152,7 @@ class ZepMemory(Memory):
             await self._thread.add_messages([msg], ignore_roles=meta.get("ignore_roles"))
             if also_graph and not self._thread._is_local:
                 try:
-                    api = self._get_api()
-                    await api.add_raw_data(
+                    await self._add_graph_data(
                         user_id=self._user_id,
                         data_type="message",
                         data=str(text),
@@ -117,8 +171,7 @@ class ZepMemory(Memory):
                 MemoryMimeType.MARKDOWN: "text",
                 MemoryMimeType.JSON: "json",}
             data_type = mime_to_type.get(content.mime_type, "text")
-            api = self._get_api()
-            await api.add_raw_data(user_id=self._user_id, data_type=data_type, data=str(content.content))
+            await self._add_graph_data(user_id=self._user_id, data_type=data_type, data=str(content.content))
             return
         raise ValueError(f"Unsupported metadata type: {content_type}. Supported: 'message', 'data'")
 
@@ -134,8 +187,9 @@ class ZepMemory(Memory):
         await self.add(MemoryContent(content=payload,mime_type=MemoryMimeType.JSON,metadata={"type": "data"},))
 
     async def search(self,query: str,*,k: int = 10,tags: Optional[list[str]] = None,**kwargs: Any,) -> list[MemoryContent]:
-        _ = tags  # reserved (zukünftige Tag-Filter)
         limit = int(kwargs.pop("limit", k))
+        if tags:
+            kwargs["tags"] = list(tags)  # exakter Lookup über den lokalen Tag-Index (GraphAPI)
         try:
             api = self._get_api()
             items: list[dict[str, Any]] = await api.search(query=query, limit=limit, **kwargs)
@@ -156,7 +210,11 @@ class ZepMemory(Memory):
     async def clear(self) -> None:
         try:
             if self._thread.thread_id:
-                await self._client.thread.delete(thread_id=self._thread.thread_id)
+                if self._outbox is not None:
+                    # offene Writes würden den gelöschten Thread sonst per 404 → create wiederbeleben
+                    self._outbox.outbox.discard(ZepThreadMemory.outbox_stream(self._thread.thread_id))
+                await _zep_call("thread.delete", self._client.thread.delete, thread_id=self._thread.thread_id)
+                self._thread.invalidate_cache()
         except Exception as e:
             self._logger.error(f"Error clearing Zep memory: {e}")
             raise
@@ -210,7 +268,14 @@ class ZepMemory(Memory):
                     parts.append(block)
         except Exception as e:
             self._logger.debug(f"thread-context skipped: {e}")
-        if graph and not self._thread._is_local:
+        if graph and not self._thread._is_local and self._profile_view is not None and not graph_filters:
+            try:
+                lines = [f"- {c}" for c in await self._profile_view.get_lines()]
+                if lines:
+                    parts.append("Memory graph (compact):\n" + "\n".join(lines))
+            except Exception as e:
+                self._logger.debug(f"graph-context (view) skipped: {e}")
+        elif graph and not self._thread._is_local:
             try:
                 params: dict[str, Any] = {"limit": 5}
                 if graph_filters:
@@ -234,12 +299,45 @@ class ZepMemory(Memory):
 # Embedded: ZepThreadMemory
 # -------------------------------
 class ZepThreadMemory:
+    # Read-Cache-Namespaces (Schlüssel: thread_id bzw. "thread_id:mode")
+    _MESSAGES_NS = "thread.messages"
+    _CONTEXT_NS = "thread.context"
+
     def __init__(self,client: AsyncZep,user_id: str,thread_id: Optional[str] = None,*,default_context_mode: Literal["basic", "summary"] = "basic",) -> None:
         self._client: Any = client
         self._user_id = user_id
         self._thread_id = thread_id
         self._default_context_mode = default_context_mode
         self._reset_after: float | None = None
+        self._cache: Any | None = None  # ReadCache (optional, via set_read_cache)
+        self._outbox: Any | None = None  # OutboxReplayer (optional, via set_outbox)
+        self._registry: Any | None = None  # ThreadRegistry (optional, via set_thread_registry)
+        self._write_listeners: list[Callable[[str], None]] = []
+        self._messages_ttl_s = float(os.getenv("GATEWAY_CACHE_MESSAGES_TTL_S", "30"))
+        self._context_ttl_s = float(os.getenv("GATEWAY_CACHE_CONTEXT_TTL_S", "30"))
+        self._stale_ttl_s = float(os.getenv("GATEWAY_CACHE_THREAD_STALE_S", "604800"))
+
+    def set_read_cache(self, cache: Any) -> None:
+        self._cache = cache
+
+    def set_outbox(self, replayer: Any) -> None:
+        self._outbox = replayer
+
+    def set_thread_registry(self, registry: Any) -> None:
+        self._registry = registry
+
+    def add_write_listener(self, fn: Callable[[str], None]) -> None:
+        self._write_listeners.append(fn)
+
+    @staticmethod
+    def outbox_stream(thread_id: str) -> str:
+        return f"thread:{thread_id}"
+
+    def invalidate_cache(self, *, local_only: bool = False) -> None:
+        if self._cache is None or not self._thread_id:
+            return
+        self._cache.invalidate(self._MESSAGES_NS, self._thread_id, local_only=local_only)
+        self._cache.invalidate_prefix(self._CONTEXT_NS, f"{self._thread_id}:", local_only=local_only)
 
     @property
     def thread_id(self) -> Optional[str]:
@@ -255,7 +353,7 @@ class ZepThreadMemory:
 
     async def ensure_thread(self, force_check: bool = False) -> str:
         if not self._thread_id:
-            t = await self._client.thread.create(user_id=self._user_id)  # type: ignore[call-arg]
+            t = await _zep_call("thread.create", self._client.thread.create, user_id=self._user_id)  # type: ignore[call-arg]
             tid = getattr(t, "thread_id", None) or getattr(t, "uuid", None) or getattr(t, "id", None)
             if not tid:
                 raise RuntimeError("ZEP thread.create returned no id")
@@ -263,10 +361,10 @@ class ZepThreadMemory:
             return self._thread_id
         if force_check:
             try:
-                await self._client.thread.get(thread_id=self._thread_id)
+                await _zep_call("thread.get", self._client.thread.get, thread_id=self._thread_id)
             except ApiError as e:
                 if getattr(e, "status_code", None) == 404:
-                    t = await self._client.thread.create(user_id=self._user_id, thread_id=self._thread_id)
+                    t = await _zep_call("thread.create", self._client.thread.create, user_id=self._user_id, thread_id=self._thread_id)
                     tid = getattr(t, "thread_id", None) or getattr(t, "uuid", None) or getattr(t, "id", None)
                     self._thread_id = str(tid) if tid else self._thread_id
                 else:
@@ -274,8 +372,11 @@ class ZepThreadMemory:
         return self._thread_id
 
     async def add_messages(self, messages: list[dict[str, Any]], *, ignore_roles: list[str] | None = None) -> None:
-        from .memory_utils import prepare_message_dict, chunk_messages
-        thread_id = await self.ensure_thread(force_check=True)
+        from .memory_utils import prepare_message_dict
+        if self._outbox is not None and self._thread_id and not self._is_local:
+            thread_id = self._thread_id  # Existenz prüft/erzeugt der Replayer (404 → create)
+        else:
+            thread_id = await self.ensure_thread(force_check=True)
         ignore = set((ignore_roles or []))
         norm: list[dict[str, Any]] = []
         for m in messages or []:
@@ -291,14 +392,37 @@ class ZepThreadMemory:
                 norm.append(item)
         if not norm:
             return
+        if self._registry is not None:
+            self._registry.touch(thread_id)
+        if self._outbox is not None and not self._is_local:
+            # Durable: lokal anhängen (Mikrosekunden), Zustellung geordnet im Hintergrund
+            self._outbox.outbox.enqueue(self.outbox_stream(thread_id), "thread.add_messages", {
+                "user_id": self._user_id, "thread_id": thread_id,
+                "messages": norm, "ignore_roles": ignore_roles or []})
+            self._outbox.notify()
+            self._append_cached(thread_id, norm)
+        else:
+            await self.deliver_messages(thread_id, norm, ignore_roles=ignore_roles)
+        for fn in self._write_listeners:
+            try:
+                fn(thread_id)
+            except Exception as e:
+                # Write ist bereits angenommen – ein Listener-Fehler darf ihn nicht als gescheitert melden
+                logger.warning(f"thread write-listener failed for {thread_id}: {e!r}")
+
+    async def deliver_messages(self, thread_id: str, norm: list[dict[str, Any]], *, ignore_roles: list[str] | None = None) -> None:
+        """Remote-Zustellung bereits normalisierter Nachrichten (direkt oder aus dem Outbox-Replayer)."""
+        from .memory_utils import chunk_messages
         try:
             for batch in chunk_messages(norm, max_batch=30):
-                await self._client.thread.add_messages(thread_id=thread_id, messages=batch, ignore_roles=ignore_roles or [])
+                await _zep_call("thread.add_messages", self._client.thread.add_messages, thread_id=thread_id, messages=batch, ignore_roles=ignore_roles or [])
+            self._append_cached(thread_id, norm)
             return
         except ApiError as e:
             if getattr(e, "status_code", None) != 404:
                 raise
-            t = await self._client.thread.create(
+            t = await _zep_call(
+                "thread.create", self._client.thread.create,
                 user_id=self._user_id,
                 thread_id=thread_id,)
             tid = (
@@ -307,16 +431,32 @@ class ZepThreadMemory:
                 or getattr(t, "id", None)
                 or thread_id)
             self._thread_id = str(tid)
-            await self._client.thread.add_messages(
+            await _zep_call(
+                "thread.add_messages", self._client.thread.add_messages,
                 thread_id=self._thread_id,
                 messages=norm,
                 ignore_roles=ignore_roles,)
+            self._append_cached(self._thread_id, norm)
+
+    def _append_cached(self, thread_id: str, norm: list[dict[str, Any]]) -> None:
+        """Write-through: eigene Nachrichten direkt an die gecachte Thread-Historie anhängen."""
+        if self._cache is None:
+            return
+        cached = self._cache.get(self._MESSAGES_NS, thread_id)
+        if cached is None:
+            return  # kein frischer Stand → nächster Read lädt remote
+        ts = datetime.utcnow().isoformat()
+        added = [{"role": m.get("role"), "content": m.get("content"), "created_at": ts} for m in norm]
+        self._cache.set(self._MESSAGES_NS, thread_id, list(cached) + added,
+                        ttl_s=self._messages_ttl_s, stale_ttl_s=self._stale_ttl_s)
 
     async def list_recent_messages(self, limit: int = 10) -> List[Dict[str, Any]]:
         if not self._thread_id or self._is_local:
             return []
-        try:
-            resp = await self._client.thread.get(thread_id=self._thread_id)
+        thread_id = self._thread_id
+
+        async def _load() -> List[Dict[str, Any]]:
+            resp = await _zep_call("thread.get", self._client.thread.get, thread_id=thread_id)
             raw = getattr(resp, "messages", None) or []
             tmp = []
             for m in raw:
@@ -326,20 +466,57 @@ class ZepThreadMemory:
                     tmp.append({"role": getattr(m, "role", None) or getattr(m, "type", None),
                                 "content": getattr(m, "content", None) or getattr(m, "text", None),
                                 "created_at": getattr(m, "created_at", None)})
+            return tmp
+
+        try:
+            if self._cache is not None:
+                tmp = await self._cache.get_or_load(
+                    self._MESSAGES_NS, thread_id, _load,
+                    ttl_s=self._messages_ttl_s, stale_ttl_s=self._stale_ttl_s)
+            else:
+                tmp = await _load()
+            tmp = self._merge_pending(thread_id, tmp)
             from .memory_utils import format_message_list
             return format_message_list(tmp, limit=limit)
         except Exception as e:
             logger.error("thread.get failed in list_recent_messages", exc_info=True)
             raise MemoryBackendError(f"thread.get failed: {e}") from e
 
+    def _merge_pending(self, thread_id: str, loaded: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Noch nicht zugestellte Outbox-Nachrichten anhängen (read-your-writes), ohne Doppelte."""
+        if self._outbox is None:
+            return loaded
+        pending = self._outbox.outbox.pending(self.outbox_stream(thread_id), op="thread.add_messages")
+        if not pending:
+            return loaded
+        seen = {(m.get("role"), m.get("content")) for m in loaded[-50:]}
+        out = list(loaded)
+        for entry in pending:
+            ts = datetime.utcfromtimestamp(entry.created_at).isoformat()
+            for m in entry.payload.get("messages") or []:
+                if (m.get("role"), m.get("content")) in seen:
+                    continue
+                out.append({"role": m.get("role"), "content": m.get("content"), "created_at": ts})
+        return out
+
     async def get_user_context(self, mode: Optional[str] = None) -> str:
         if not self._thread_id or self._is_local:
             return ""
-        try:
-            ctx = await self._client.thread.get_user_context(
-                thread_id=self._thread_id, mode=mode or self._default_context_mode)
+        thread_id = self._thread_id
+        mode = mode or self._default_context_mode
+
+        async def _load() -> str:
+            ctx = await _zep_call("thread.get_user_context", self._client.thread.get_user_context, thread_id=thread_id, mode=mode)
             return str(getattr(ctx, "context", "") or "")
-        except Exception:
+
+        try:
+            if self._cache is not None:
+                return await self._cache.get_or_load(
+                    self._CONTEXT_NS, f"{thread_id}:{mode}", _load,
+                    ttl_s=self._context_ttl_s, stale_ttl_s=self._stale_ttl_s)
+            return await _load()
+        except Exception as e:
+            logger.debug(f"thread.get_user_context skipped: {e}")
             return ""
 
     async def build_context_block(self, *, include_recent: bool = True, recent_limit: int = 10) -> str:
@@ -434,36 +611,38 @@ class ZepGraphAdmin:
         return self.target_kwargs()
 
     async def create_graph(self, graph_id: str, *, name: str | None = None, description: str | None = None) -> Any:
-        return await self._client.graph.create(
+        return await _zep_call(
+            "graph.create", self._client.graph.create,
             graph_id=graph_id, name=name, description=description)
 
 
     async def list_graphs(self) -> List[Any]:
-        return await self._client.graph.list()
+        return await _zep_call("graph.list", self._client.graph.list)
 
     async def update_graph(self, graph_id: str, **kwargs: Any) -> Any:
-        return await self._client.graph.update(graph_id=graph_id, **kwargs)
+        return await _zep_call("graph.update", self._client.graph.update, graph_id=graph_id, **kwargs)
 
     async def clone_graph(self, src_graph_id: str, *, target_graph_id: Optional[str] = None, new_label: Optional[str] = None) -> Any:
         if target_graph_id:
-            return await self._client.graph.clone(source_graph_id=src_graph_id, target_graph_id=target_graph_id)
-        return await self._client.graph.clone(graph_id=src_graph_id, new_label=new_label or "copy")
+            return await _zep_call("graph.clone", self._client.graph.clone, source_graph_id=src_graph_id, target_graph_id=target_graph_id)
+        return await _zep_call("graph.clone", self._client.graph.clone, graph_id=src_graph_id, new_label=new_label or "copy")
 
 
     async def clone_user_graph(self,source_user_id: str,target_user_id: str,) -> Any:
-        return await self._client.graph.clone(
+        return await _zep_call(
+            "graph.clone", self._client.graph.clone,
             source_user_id=source_user_id,
             target_user_id=target_user_id,)
     
     async def set_ontology(self, graph_id: Optional[str], schema: Dict[str, Any]) -> Any:
         gid = self._gid(graph_id)
-        return await self._client.graph.set_ontology(graph_id=gid, schema=schema)
+        return await _zep_call("graph.set_ontology", self._client.graph.set_ontology, graph_id=gid, schema=schema)
 
     async def add_node(self, name: str, *, summary: Optional[str] = None,
                         attributes: Optional[Dict[str, Any]] = None,
                         graph_id: Optional[str] = None, user_id: Optional[str] = None) -> Any:
         target = self._choose_target(graph_id=graph_id, user_id=user_id)
-        return await self._client.graph.add_node(**target, name=name, summary=summary, attributes=attributes or {})
+        return await _zep_call("graph.add_node", self._client.graph.add_node, **target, name=name, summary=summary, attributes=attributes or {})
 
     async def add_fact_triple(
         self,
@@ -488,45 +667,49 @@ class ZepGraphAdmin:
             valid_at=valid_at, invalid_at=invalid_at, expired_at=expired_at,
         )
         target = self._choose_target(graph_id=graph_id, user_id=user_id)
-        return await self._client.graph.add_edge(**target, **payload)
+        return await _zep_call("graph.add_edge", self._client.graph.add_edge, **target, **payload)
 
 
     async def get_node(self, node_uuid: str, *, graph_id: Optional[str] = None, user_id: Optional[str] = None) -> Any:
         target = self._choose_target(graph_id=graph_id, user_id=user_id)
-        return await self._client.graph.get_node(**target, node_uuid=node_uuid)
+        return await _zep_call("graph.get_node", self._client.graph.get_node, **target, node_uuid=node_uuid)
 
     async def get_edge(self, edge_uuid: str, *, graph_id: Optional[str] = None, user_id: Optional[str] = None) -> Any:
         target = self._choose_target(graph_id=graph_id, user_id=user_id)
-        return await self._client.graph.get_edge(**target, edge_uuid=edge_uuid)
+        return await _zep_call("graph.get_edge", self._client.graph.get_edge, **target, edge_uuid=edge_uuid)
 
     async def get_node_edges(self,node_uuid: str,*, direction: Optional[str] = None, graph_id: Optional[str] = None,) -> Any:
         gid = self._gid(graph_id)
         if direction is not None:
-            return await self._client.graph.get_node_edges(
+            return await _zep_call(
+                "graph.get_node_edges", self._client.graph.get_node_edges,
                 graph_id=gid,
                 node_uuid=node_uuid,
                 direction=direction,)
-        return await self._client.graph.get_node_edges(
+        return await _zep_call(
+            "graph.get_node_edges", self._client.graph.get_node_edges,
             graph_id=gid,
             node_uuid=node_uuid,)
 
     async def delete_edge(self, edge_uuid: str, *, graph_id: Optional[str] = None, user_id: Optional[str] = None) -> None:
         target = self._choose_target(graph_id=graph_id, user_id=user_id)
-        await self._client.graph.delete_edge(**target, edge_uuid=edge_uuid)
+        await _zep_call("graph.delete_edge", self._client.graph.delete_edge, **target, edge_uuid=edge_uuid)
 
     async def delete_episode(self, episode_uuid: str, *, graph_id: Optional[str] = None, user_id: Optional[str] = None) -> None:
         target = self._choose_target(graph_id=graph_id, user_id=user_id)
-        await self._client.graph.delete_episode(**target, episode_uuid=episode_uuid)
+        await _zep_call("graph.delete_episode", self._client.graph.delete_episode, **target, episode_uuid=episode_uuid)
 
     async def add_raw_data(self,*,user_id: Optional[str],data_type: str,data: str,role: Optional[str] = None,source: Optional[str] = None,metadata: Optional[Dict[str, Any]] = None,) -> Any:
         if getattr(self, "_graph_id", None):
-            return await self._client.graph.add(
+            return await _zep_call(
+                "graph.add", self._client.graph.add,
                 graph_id=self._graph_id, type=data_type, data=data,
                 role=role, source=source, metadata=metadata or {})
         uid = user_id or self._user_id
         if not uid:
             raise ValueError("user_id required for add_raw_data when no graph_id is set")
-        return await self._client.graph.add(
+        return await _zep_call(
+            "graph.add", self._client.graph.add,
             user_id=uid, type=data_type, data=data,
             role=role, source=source, metadata=metadata or {})
 
@@ -538,9 +721,27 @@ class ZepGraphAdmin:
             center_node_uuid=center_node_uuid, **kwargs)
         params: Dict[str, Any] = {**target, **built}
         try:
-            search_results = await self._client.graph.search(**params)
+            search_results = await _zep_call("graph.search", self._client.graph.search, **params)
             return search_results
         except Exception as e:
             logger.error("graph.search failed", exc_info=True)
             raise
 
+
+
+######################################################################################################
+# Outbox-Zustellung (Handler für OutboxReplayer)
+######################################################################################################
+def build_outbox_handlers(client: Any, get_api: Callable[[], Any]) -> Dict[str, Callable[[Dict[str, Any]], Any]]:
+    """Op → Zustell-Handler für die durable Outbox (backend/memory/outbox.py)."""
+
+    async def _thread_add_messages(payload: Dict[str, Any]) -> None:
+        thread = ZepThreadMemory(client, payload["user_id"], thread_id=payload["thread_id"])
+        await thread.deliver_messages(payload["thread_id"], payload.get("messages") or [],
+                                      ignore_roles=payload.get("ignore_roles"))
+
+    async def _graph_add_raw_data(payload: Dict[str, Any]) -> None:
+        # bereits beim Enqueue lokal vermerkt (ZepMemory._add_graph_data) → nicht doppelt aufnehmen
+        await get_api().add_raw_data(**payload, record_local=False)
+
+    return {"thread.add_messages": _thread_add_messages, "graph.add_raw_data": _graph_add_raw_data}
@@ -84,6 +84,7 @@ def create_search_graph_tool(get_api: GetAPI) -> FunctionTool:
         graph_id: Annotated[str | None, "Custom graph scope"] = None,
         user_id: Annotated[str | None, "User graph scope"] = None,
         extra: Annotated[Dict[str, Any] | None, "Additional params passed to Zep search as-is"] = None,
+        retrieval: Annotated[Literal["remote", "fallback", "auto", "local"] | None, "local=fast in-process index only, auto=local first"] = None,
     ) -> List[Dict[str, Any]]:
         api = get_api()
         params: Dict[str, Any] = {
@@ -98,6 +99,7 @@ def create_search_graph_tool(get_api: GetAPI) -> FunctionTool:
             "bfs_origin_node_uuids": bfs_origin_node_uuids,
             "graph_id": graph_id,
             "user_id": user_id,
+            "retrieval": retrieval,
         }
         if extra:
             for k, v in extra.items():
@@ -109,6 +111,19 @@ def create_search_graph_tool(get_api: GetAPI) -> FunctionTool:
         name="search_graph",
         description="Search the Zep graph (edges/nodes/episodes) with optional filters, rerankers, and pass-through params.",)
 
+def create_find_by_tag_tool(get_api: GetAPI) -> FunctionTool:
+    async def find_by_tag(
+        tags: Annotated[List[str] | None, "Exact tags, all must match (e.g. ['note', 'date:02-03'])"] = None,
+        month_day: Annotated[str | None, "Exact month-day 'MM-DD' (e.g. '02-03' for 3 February)"] = None,
+        limit: Annotated[int | None, "Max number of results"] = None,
+    ) -> List[Dict[str, Any]]:
+        api = get_api()
+        return await api.find_tagged(tags=tags, month_day=month_day, limit=limit)
+    return FunctionTool(
+        func=find_by_tag,
+        name="find_by_tag",
+        description="Exact indexed lookup of stored facts by tag and/or month_day (e.g. birthdays on a date).",)
+
 def create_add_graph_data_tool(get_api: GetAPI) -> FunctionTool:
     async def bound_add_memory_data(
         data: Annotated[str, "The data/information to store in memory"],
@@ -0,0 +1,385 @@
+# backend/memory/outbox.py
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..metrics import metrics
+from .rate_governor import BACKGROUND, zep_priority
+from .resilience import CircuitOpenError, is_retryable
+
+__all__ = ["OUTBOX_SCHEMA_VERSION", "OutboxEntry", "Outbox", "OutboxReplayer", "OutboxHandler"]
+
+logger = logging.getLogger(__name__)
+
+# Format-Version der Payloads (PRAGMA user_version); offene Writes werden nie stillschweigend verworfen
+OUTBOX_SCHEMA_VERSION = 1
+
+OutboxHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+@dataclass
+class OutboxEntry:
+    id: int
+    stream: str
+    op: str
+    payload: Dict[str, Any]
+    attempts: int
+    created_at: float
+    last_error: Optional[str] = None
+
+
+class Outbox:
+    """
+    Dauerhafte, append-only Outbox für Zep-Writes auf SQLite (WAL).
+
+    - enqueue() schreibt lokal (Mikrosekunden, kein Netz) und liefert die Eintrags-ID,
+    - Einträge gehören zu einem Stream (z. B. "thread:<id>"); innerhalb eines Streams
+      gilt strikte FIFO-Reihenfolge über die monotone ID,
+    - Zustände: pending → (gelöscht nach Zustellung) | dead (Dead-Letter, bleibt zur Analyse),
+    - überlebt Prozess-Restarts: offene Einträge werden beim nächsten Start weiter zugestellt.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._path = str(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " stream TEXT NOT NULL, op TEXT NOT NULL, payload TEXT NOT NULL,"
+                " state TEXT NOT NULL DEFAULT 'pending',"
+                " attempts INTEGER NOT NULL DEFAULT 0, next_at REAL NOT NULL DEFAULT 0,"
+                " created_at REAL NOT NULL, last_error TEXT)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS outbox_stream ON outbox(state, stream, id)")
+            self._conn.execute(f"PRAGMA user_version={OUTBOX_SCHEMA_VERSION}")
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    # ---- Schreiben -------------------------------------------------------------
+    def enqueue(self, stream: str, op: str, payload: Dict[str, Any]) -> int:
+        blob = json.dumps(payload, ensure_ascii=False, default=str)
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO outbox (stream, op, payload, created_at) VALUES (?, ?, ?, ?)",
+                (stream, op, blob, time.time()))
+            rid = int(cur.lastrowid or 0)
+        metrics.inc("outbox.enqueued", op=op)
+        return rid
+
+    def ack(self, entry_id: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM outbox WHERE id=?", (entry_id,))
+
+    def retry_later(self, entry_id: int, *, delay_s: float, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET attempts=attempts+1, next_at=?, last_error=? WHERE id=?",
+                (time.time() + delay_s, error[:2000], entry_id))
+
+    def dead_letter(self, entry_id: int, *, error: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET state='dead', attempts=attempts+1, last_error=? WHERE id=?",
+                (error[:2000], entry_id))
+
+    def discard(self, stream: str) -> int:
+        """Offene Einträge eines Streams verwerfen (z. B. wenn der Ziel-Thread gelöscht wird)."""
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM outbox WHERE state='pending' AND stream=?", (stream,))
+            return int(cur.rowcount or 0)
+
+    def requeue_dead(self, stream: str | None = None) -> int:
+        """Dead-Letter wieder zustellbar machen (z. B. nach behobenem Konfigurationsfehler)."""
+        with self._lock:
+            if stream is None:
+                cur = self._conn.execute("UPDATE outbox SET state='pending', attempts=0, next_at=0 WHERE state='dead'")
+            else:
+                cur = self._conn.execute(
+                    "UPDATE outbox SET state='pending', attempts=0, next_at=0 WHERE state='dead' AND stream=?", (stream,))
+            return int(cur.rowcount or 0)
+
+    # ---- Lesen -----------------------------------------------------------------
+    @staticmethod
+    def _row(row: Any) -> OutboxEntry:
+        try:
+            payload = json.loads(row[3])
+        except Exception:
+            payload = {}
+        return OutboxEntry(id=int(row[0]), stream=row[1], op=row[2], payload=payload,
+                           attempts=int(row[4]), created_at=float(row[5]), last_error=row[6])
+
+    def head(self, stream: str) -> tuple[Optional[OutboxEntry], float]:
+        """Ältester offener Eintrag eines Streams und sein next_at (Reihenfolge-Garantie)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, stream, op, payload, attempts, created_at, last_error, next_at FROM outbox"
+                " WHERE state='pending' AND stream=? ORDER BY id LIMIT 1", (stream,)).fetchone()
+        if row is None:
+            return None, 0.0
+        return self._row(row), float(row[7])
+
+    def due_streams(self, *, now: float | None = None) -> tuple[List[str], Optional[float]]:
+        """Streams, deren Kopf-Eintrag fällig ist; dazu der früheste künftige Fälligkeitszeitpunkt."""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT o.stream, o.next_at FROM outbox o JOIN ("
+                " SELECT stream, MIN(id) AS id FROM outbox WHERE state='pending' GROUP BY stream"
+                ") h ON o.id = h.id").fetchall()
+        due = [s for s, nxt in rows if nxt <= now]
+        later = [nxt for _, nxt in rows if nxt > now]
+        return due, (min(later) if later else None)
+
+    def pending(self, stream: str, *, op: str | None = None) -> List[OutboxEntry]:
+        sql = ("SELECT id, stream, op, payload, attempts, created_at, last_error FROM outbox"
+               " WHERE state='pending' AND stream=?")
+        args: tuple[Any, ...] = (stream,)
+        if op is not None:
+            sql += " AND op=?"
+            args += (op,)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY id", args).fetchall()
+        return [self._row(r) for r in rows]
+
+    def dead_letters(self, limit: int = 50) -> List[OutboxEntry]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, stream, op, payload, attempts, created_at, last_error FROM outbox"
+                " WHERE state='dead' ORDER BY id DESC LIMIT ?", (int(limit),)).fetchall()
+        return [self._row(r) for r in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM outbox GROUP BY state").fetchall()
+        out = {"pending": 0, "dead": 0}
+        out.update({state: int(n) for state, n in rows})
+        return out
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (oldest,) = self._conn.execute("SELECT MIN(created_at) FROM outbox WHERE state='pending'").fetchone()
+            (streams,) = self._conn.execute("SELECT COUNT(DISTINCT stream) FROM outbox WHERE state='pending'").fetchone()
+        return {
+            "path": self._path,
+            **self.counts(),
+            "streams": int(streams),
+            "oldest_pending_age_s": round(time.time() - oldest, 3) if oldest else 0.0,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+    @classmethod
+    def from_env(cls, default_path: str | Path) -> Optional["Outbox"]:
+        """
+        GATEWAY_OUTBOX=0 deaktiviert die Outbox (Writes wieder synchron); Ort: GATEWAY_OUTBOX_PATH,
+        sonst default_path (Bootstrap: state_path("outbox.sqlite3")).
+        """
+        if os.getenv("GATEWAY_OUTBOX", "1") in ("0", "false", "False"):
+            return None
+        return cls(os.getenv("GATEWAY_OUTBOX_PATH") or default_path)
+
+
+class OutboxReplayer:
+    """
+    Hintergrund-Zusteller der Outbox.
+
+    - je Stream streng geordnet (der Kopf blockiert bis Zustellung oder Dead-Letter),
+      verschiedene Streams unabhängig voneinander: ein Task pro fälligem Stream, höchstens
+      `concurrency` gleichzeitig (Semaphore) – ein langsamer Stream hält die anderen nicht auf,
+    - transiente Fehler (Timeout/429/5xx/offener Breaker) → exponentielles Backoff mit Jitter,
+      nach `max_attempts` bzw. bei nicht-transienten Fehlern → Dead-Letter,
+    - alle Zustellungen laufen mit Background-Priorität durch den Rate-Governor,
+    - stop(drain_timeout_s) stellt beim Shutdown noch so viel wie möglich zu; der Rest bleibt
+      dauerhaft liegen und wird nach dem Restart fortgesetzt.
+    """
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        handlers: Dict[str, OutboxHandler],
+        *,
+        concurrency: int = 8,
+        max_attempts: int = 8,
+        backoff_base_s: float = 1.0,
+        backoff_cap_s: float = 300.0,
+        idle_poll_s: float = 5.0,
+    ) -> None:
+        self._outbox = outbox
+        self._handlers = dict(handlers)
+        self._concurrency = max(1, int(concurrency))
+        self._max_attempts = max(1, int(max_attempts))
+        self._backoff_base_s = float(backoff_base_s)
+        self._backoff_cap_s = float(backoff_cap_s)
+        self._idle_poll_s = float(idle_poll_s)
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self._stopping = False
+        self._sem = asyncio.Semaphore(self._concurrency)
+        self._streams: Dict[str, asyncio.Task[None]] = {}  # ein Zustell-Task je Stream
+        self._active: set[str] = set()
+
+    @property
+    def outbox(self) -> Outbox:
+        return self._outbox
+
+    def register(self, op: str, handler: OutboxHandler) -> None:
+        self._handlers[op] = handler
+
+    def notify(self) -> None:
+        """Nach enqueue(): Replayer sofort wecken (statt auf den nächsten Poll zu warten)."""
+        self._wake.set()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(), name="outbox-replayer")
+
+    async def stop(self, *, drain_timeout_s: float = 10.0) -> Dict[str, int]:
+        """Drain bis zum Timeout, dann Loop beenden. Rückgabe: verbleibende Zähler."""
+        if drain_timeout_s > 0:
+            try:
+                await asyncio.wait_for(self.drain(), timeout=drain_timeout_s)
+            except asyncio.TimeoutError:
+                pass
+        self._stopping = True
+        self._wake.set()
+        tasks = [t for t in (self._task, *self._streams.values()) if t is not None]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+        return self._outbox.counts()
+
+    async def drain(self) -> None:
+        """Stellt alle derzeit fälligen Einträge zu (ohne auf zukünftige Backoffs zu warten)."""
+        while True:
+            due, _ = self._outbox.due_streams()
+            self._spawn(due)
+            if not self._streams:
+                return
+            await asyncio.wait(list(self._streams.values()), return_when=asyncio.FIRST_COMPLETED)
+
+    # ---- Loop ------------------------------------------------------------------
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                self._wake.clear()  # vor dem Abfragen: spätere notify()/Stream-Enden gehen nicht verloren
+                due, next_at = self._outbox.due_streams()
+                self._spawn(due)
+                timeout = self._idle_poll_s if next_at is None else min(self._idle_poll_s, max(0.01, next_at - time.time()))
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"outbox replayer loop error: {e!r}")
+                await asyncio.sleep(1.0)
+
+    def _spawn(self, streams: List[str]) -> None:
+        """Für jeden fälligen Stream ohne laufenden Task einen Zustell-Task starten (kein Warten auf den Batch)."""
+        for stream in streams:
+            if stream not in self._streams:
+                task = asyncio.create_task(self._stream_task(stream), name=f"outbox:{stream}")
+                self._streams[stream] = task
+                task.add_done_callback(lambda _t, s=stream: self._stream_done(s))
+
+    def _stream_done(self, stream: str) -> None:
+        self._streams.pop(stream, None)
+        self._wake.set()  # Loop neu planen lassen (z. B. inzwischen fällige Einträge desselben Streams)
+
+    async def _stream_task(self, stream: str) -> None:
+        try:
+            async with self._sem:
+                await self._drain_stream(stream)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"outbox stream {stream} delivery error: {e!r}")
+
+    async def _drain_stream(self, stream: str) -> None:
+        if stream in self._active:
+            return
+        self._active.add(stream)
+        try:
+            while True:
+                entry, next_at = self._outbox.head(stream)
+                if entry is None or next_at > time.time():
+                    return
+                if not await self._deliver(entry):
+                    return  # Kopf wartet auf Backoff → Reihenfolge bleibt erhalten
+        finally:
+            self._active.discard(stream)
+
+    async def _deliver(self, entry: OutboxEntry) -> bool:
+        handler = self._handlers.get(entry.op)
+        if handler is None:
+            self._outbox.dead_letter(entry.id, error=f"no handler for op '{entry.op}'")
+            metrics.inc("outbox.dead_lettered", op=entry.op)
+            logger.error(f"outbox entry {entry.id} ({entry.op}) dead-lettered: no handler")
+            return True
+        started = time.perf_counter()
+        try:
+            with zep_priority(BACKGROUND):
+                await handler(entry.payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            attempts = entry.attempts + 1
+            transient = isinstance(e, CircuitOpenError) or is_retryable(e)
+            if transient and attempts < self._max_attempts:
+                delay = min(self._backoff_cap_s, self._backoff_base_s * (2 ** (attempts - 1)))
+                delay *= 0.5 + random.random() / 2
+                self._outbox.retry_later(entry.id, delay_s=delay, error=repr(e))
+                metrics.inc("outbox.retries", op=entry.op)
+                logger.info(f"outbox entry {entry.id} ({entry.op}, {entry.stream}) retry {attempts} in {delay:.1f}s: {e!r}")
+                return False
+            self._outbox.dead_letter(entry.id, error=repr(e))
+            metrics.inc("outbox.dead_lettered", op=entry.op)
+            logger.error(f"outbox entry {entry.id} ({entry.op}, {entry.stream}) dead-lettered after {attempts} attempt(s): {e!r}")
+            return True
+        self._outbox.ack(entry.id)
+        metrics.inc("outbox.delivered", op=entry.op)
+        metrics.observe("outbox.lag_ms", (time.time() - entry.created_at) * 1000.0, op=entry.op)
+        metrics.observe("outbox.deliver_ms", (time.perf_counter() - started) * 1000.0, op=entry.op)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._outbox.stats(), "running": bool(self._task and not self._task.done()),
+                "active_streams": len(self._active), "scheduled_streams": len(self._streams)}
+
+    @classmethod
+    def from_env(cls, outbox: Outbox, handlers: Dict[str, OutboxHandler]) -> "OutboxReplayer":
+        return cls(
+            outbox,
+            handlers,
+            concurrency=int(os.getenv("GATEWAY_OUTBOX_CONCURRENCY", "8")),
+            max_attempts=int(os.getenv("GATEWAY_OUTBOX_MAX_ATTEMPTS", "8")),
+            backoff_base_s=float(os.getenv("GATEWAY_OUTBOX_BACKOFF_BASE_S", "1")),
+            backoff_cap_s=float(os.getenv("GATEWAY_OUTBOX_BACKOFF_CAP_S", "300")),
+        )
@@ -0,0 +1,118 @@
+# backend/memory/overlay.py
+from __future__ import annotations
+
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+__all__ = ["RecentWritesOverlay", "target_key"]
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def target_key(target: Dict[str, Any]) -> str:
+    """
+    Stabiler Schlüssel für ein Graph-Ziel ({"graph_id": ...} oder {"user_id": ...}).
+    graph_id hat – wie in ZepGraphAdmin.target_kwargs() – Vorrang.
+    """
+    if target.get("graph_id"):
+        return f"graph:{target['graph_id']}"
+    if target.get("user_id"):
+        return f"user:{target['user_id']}"
+    return "default"
+
+
+def _tokens(text: str) -> set[str]:
+    return {t for t in _TOKEN_RE.findall((text or "").casefold()) if len(t) > 1}
+
+
+@dataclass
+class _PendingWrite:
+    item: Dict[str, Any]
+    expires_at: float
+    tokens: set[str] = field(default_factory=set)
+
+
+class RecentWritesOverlay:
+    """
+    Kurzlebiges, lokales Overlay der letzten Graph-Schreibvorgänge pro Ziel.
+
+    Zep verarbeitet Episoden aus graph.add asynchron – ein gerade geschriebener Fakt
+    taucht erst nach einer Weile in graph.search auf. Das Overlay merkt sich die
+    normalisierten Episoden (wie GraphAPI sie zurückgibt) und mischt passende Einträge
+    in Suchergebnisse, bis Zep die verarbeitete Version liefert oder die TTL abläuft.
+    """
+
+    def __init__(self, *, ttl_s: float = 120.0, max_per_target: int = 200) -> None:
+        self._ttl = float(ttl_s)
+        self._max = max(1, int(max_per_target))
+        self._pending: Dict[str, Deque[_PendingWrite]] = {}
+
+    @property
+    def ttl_s(self) -> float:
+        return self._ttl
+
+    def record(self, key: str, item: Dict[str, Any]) -> None:
+        """Merkt sich einen frisch geschriebenen (normalisierten) Eintrag."""
+        content = str(item.get("content") or "").strip()
+        if not content or self._ttl <= 0:
+            return
+        entry = dict(item)
+        entry["pending"] = True
+        q = self._pending.setdefault(key, deque(maxlen=self._max))
+        q.append(_PendingWrite(item=entry, expires_at=time.monotonic() + self._ttl, tokens=_tokens(content)))
+
+    def pending(self, key: str) -> List[Dict[str, Any]]:
+        """Alle noch gültigen Overlay-Einträge eines Ziels (neueste zuerst)."""
+        q = self._prune(key)
+        return [dict(p.item) for p in reversed(q)] if q else []
+
+    def merge(self, key: str, query: str, remote: Iterable[Dict[str, Any]], *, limit: int | None = None) -> List[Dict[str, Any]]:
+        """
+        Mischt passende Overlay-Einträge vor die Remote-Ergebnisse.
+
+        - Einträge, deren uuid oder Inhalt bereits in `remote` steht, gelten als
+          von Zep verarbeitet und werden aus dem Overlay entfernt.
+        - query "*" (bzw. leer) passt auf alles, sonst reicht ein gemeinsames Token.
+        """
+        remote_list = list(remote)
+        q = self._prune(key)
+        if not q:
+            return remote_list[:limit] if limit else remote_list
+
+        seen_uuids = {str(r.get("uuid")) for r in remote_list if r.get("uuid")}
+        seen_content = {str(r.get("content") or "").strip().casefold() for r in remote_list}
+        q_tokens = _tokens(query) if (query or "").strip() not in ("", "*") else set()
+
+        survivors: Deque[_PendingWrite] = deque(maxlen=self._max)
+        matches: List[Dict[str, Any]] = []
+        for p in q:
+            uuid = p.item.get("uuid")
+            content = str(p.item.get("content") or "").strip().casefold()
+            if (uuid and str(uuid) in seen_uuids) or content in seen_content:
+                continue  # verarbeitet → Overlay-Eintrag verwerfen
+            survivors.append(p)
+            if not q_tokens or (q_tokens & p.tokens):
+                matches.append(dict(p.item))
+        self._pending[key] = survivors
+
+        matches.reverse()  # neueste zuerst
+        merged = matches + remote_list
+        return merged[:limit] if limit else merged
+
+    def clear(self, key: Optional[str] = None) -> None:
+        if key is None:
+            self._pending.clear()
+        else:
+            self._pending.pop(key, None)
+
+    def _prune(self, key: str) -> Optional[Deque[_PendingWrite]]:
+        q = self._pending.get(key)
+        if not q:
+            return None
+        now = time.monotonic()
+        while q and q[0].expires_at <= now:
+            q.popleft()
+        return q
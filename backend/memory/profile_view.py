@@ -0,0 +1,122 @@
+# backend/memory/profile_view.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .overlay import target_key
+
+__all__ = ["ProfileFactsView"]
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileFactsView:
+    """
+    Lokal materialisierte Sicht auf die wichtigsten User-/Profil-Fakten des Graphen.
+
+    Ersetzt den per-Turn-Aufruf api.search(query="*", limit=5) in ZepMemory.get_context:
+    - refresh() lädt die kompakten Fakten einmalig bzw. periodisch im Hintergrund,
+    - apply_write(key, item) übernimmt frische Graph-Writes sofort (GraphAPI-Listener),
+    - get_lines() liest danach ohne Netz-I/O aus dem Speicher.
+    """
+
+    def __init__(
+        self,
+        get_api: Callable[[], Any],
+        *,
+        limit: int = 5,
+        refresh_interval_s: float = 60.0,
+        max_line_len: int = 500,
+    ) -> None:
+        self._get_api = get_api
+        self._limit = max(1, int(limit))
+        self._interval = float(refresh_interval_s)
+        self._max_line_len = int(max_line_len)
+        self._lines: List[str] = []
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    @property
+    def age_s(self) -> float | None:
+        return None if self._loaded_at is None else time.monotonic() - self._loaded_at
+
+    def lines(self) -> List[str]:
+        """Aktueller Snapshot (ohne I/O)."""
+        return list(self._lines)
+
+    async def get_lines(self) -> List[str]:
+        """Snapshot; lädt beim allerersten Zugriff synchron nach (einmalig)."""
+        if not self.is_loaded:
+            await self.refresh()
+        return self.lines()
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            try:
+                api = self._get_api()
+                items: list[Dict[str, Any]] = await api.search(query="*", limit=self._limit)
+            except Exception as e:
+                logger.debug(f"profile-view refresh skipped: {e}")
+                return
+            lines: List[str] = []
+            for it in items:
+                self._push(lines, it.get("content"))
+            self._lines = lines[: self._limit]
+            self._loaded_at = time.monotonic()
+
+    def apply_write(self, key: str, item: Dict[str, Any]) -> None:
+        """Write-Listener für GraphAPI: frische Fakten sofort vorne einsortieren."""
+        try:
+            if key != target_key(self._get_api().current_target()):
+                return
+        except Exception:
+            return
+        lines = list(self._lines)
+        self._push(lines, item.get("content"), front=True)
+        self._lines = lines[: self._limit]
+
+    def invalidate(self) -> None:
+        self._lines = []
+        self._loaded_at = None
+
+    # ---- Hintergrund-Refresh --------------------------------------------------
+    def start(self) -> None:
+        if self._task is not None or self._interval <= 0:
+            return
+        self._task = asyncio.create_task(self._run(), name="profile-facts-refresh")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self._interval)
+
+    def _push(self, lines: List[str], content: Any, *, front: bool = False) -> None:
+        c = str(content or "").strip()
+        if not c:
+            return
+        if len(c) > self._max_line_len:
+            c = c[: self._max_line_len] + " …"
+        if c in lines:
+            lines.remove(c)
+        if front:
+            lines.insert(0, c)
+        else:
+            lines.append(c)
@@ -0,0 +1,222 @@
+# backend/memory/rate_governor.py
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, Iterator, Mapping, Optional
+
+from ..metrics import MetricsRegistry, metrics as _default_metrics
+
+__all__ = [
+    "INTERACTIVE",
+    "BACKGROUND",
+    "RateGovernor",
+    "get_governor",
+    "zep_priority",
+    "current_priority",
+    "parse_retry_after",
+]
+
+# Prioritäten: kleinere Zahl = zuerst bedient
+INTERACTIVE = 0
+BACKGROUND = 1
+_PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Optionaler Override für den aktuellen Task (z. B. Nutzer-Message auf dem /chat-Pfad)
+_priority_var: ContextVar[Optional[int]] = ContextVar("zep_priority", default=None)
+
+
+@contextmanager
+def zep_priority(level: int) -> Iterator[None]:
+    """Setzt die Zep-Priorität für alle Calls im aktuellen Kontext (async-sicher via ContextVar)."""
+    token = _priority_var.set(level)
+    try:
+        yield
+    finally:
+        _priority_var.reset(token)
+
+
+def current_priority(default: int) -> int:
+    p = _priority_var.get()
+    return default if p is None else p
+
+
+def parse_retry_after(headers: Mapping[str, Any] | None) -> Optional[float]:
+    """Retry-After (Sekunden oder HTTP-Datum) bzw. retry-after-ms → Sekunden."""
+    if not headers:
+        return None
+    h = {str(k).lower(): v for k, v in dict(headers).items()}
+    ms = h.get("retry-after-ms")
+    if ms is not None:
+        try:
+            return max(0.0, float(ms) / 1000.0)
+        except (TypeError, ValueError):
+            pass
+    ra = h.get("retry-after")
+    if ra is None:
+        return None
+    try:
+        return max(0.0, float(ra))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(str(ra)).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class RateGovernor:
+    """
+    Prozessweiter, adaptiver Token-Bucket für allen Zep-Traffic.
+
+    - acquire(priority) wartet auf ein Token; Wartende werden strikt nach Priorität
+      bedient (interaktive Reads vor Background-Writes), innerhalb einer Priorität FIFO,
+    - AIMD: jede 429-Antwort halbiert die Rate und pausiert den Bucket bis Retry-After,
+      jeder Erfolg erhöht die Rate additiv (≈ +increase_per_s Requests/s pro Sekunde),
+      sodass sich der Durchsatz knapp unter der erlaubten Obergrenze einpendelt.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float = 20.0,
+        burst: float = 20.0,
+        min_rate: float = 1.0,
+        max_rate: float = 200.0,
+        increase_per_s: float = 1.0,
+        registry: MetricsRegistry | None = None,
+    ) -> None:
+        self._rate = float(rate)
+        self._burst = max(1.0, float(burst))
+        self._min_rate = max(0.1, float(min_rate))
+        self._max_rate = max(self._min_rate, float(max_rate))
+        self._increase = float(increase_per_s)
+        self._tokens = self._burst
+        self._last = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiters: Dict[int, Deque[asyncio.Future[None]]] = {INTERACTIVE: deque(), BACKGROUND: deque()}
+        self._timer: asyncio.TimerHandle | None = None
+        self._metrics = registry or _default_metrics
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    # ---- Token-Bucket ----------------------------------------------------------
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if now > self._blocked_until:
+            start = max(self._last, self._blocked_until)
+            self._tokens = min(self._burst, self._tokens + (now - start) * self._rate)
+        self._last = now
+
+    def try_acquire(self) -> bool:
+        """Nicht-blockierend (z. B. für Hedge-Requests): nur wenn sofort ein Token frei ist."""
+        self._refill()
+        if self._tokens >= 1.0 and not any(self._waiters.values()) and time.monotonic() >= self._blocked_until:
+            self._tokens -= 1.0
+            return True
+        return False
+
+    async def acquire(self, priority: int = INTERACTIVE) -> None:
+        started = time.perf_counter()
+        queue = self._waiters.setdefault(priority, deque())
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        queue.append(fut)
+        self._dispatch()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if not fut.done() or fut.cancelled():
+                try:
+                    queue.remove(fut)
+                except ValueError:
+                    pass
+            else:
+                self._tokens += 1.0  # bereits zugeteiltes Token zurückgeben
+            raise
+        self._metrics.observe("zep.rate.wait_ms", (time.perf_counter() - started) * 1000.0,
+                              priority=_PRIORITY_NAMES.get(priority, str(priority)))
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        self._refill()
+        now = time.monotonic()
+        if now >= self._blocked_until:
+            for prio in sorted(self._waiters):
+                queue = self._waiters[prio]
+                while queue and self._tokens >= 1.0:
+                    fut = queue.popleft()
+                    if fut.done():
+                        continue
+                    self._tokens -= 1.0
+                    fut.set_result(None)
+                if queue:
+                    break  # höhere Priorität wartet noch → niedrigere nicht vorziehen
+        waiting = sum(len(q) for q in self._waiters.values())
+        self._metrics.set_gauge("zep.rate.queued", waiting)
+        if waiting and self._timer is None:
+            if now < self._blocked_until:
+                delay = self._blocked_until - now
+            else:
+                delay = max(0.001, (1.0 - self._tokens) / self._rate)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    # ---- Adaption --------------------------------------------------------------
+    def on_success(self) -> None:
+        if self._rate < self._max_rate:
+            self._rate = min(self._max_rate, self._rate + self._increase / max(1.0, self._rate))
+        self._metrics.set_gauge("zep.rate.limit", round(self._rate, 3))
+
+    def on_rate_limited(self, retry_after_s: Optional[float] = None) -> float:
+        """429 erhalten: Rate halbieren, Bucket leeren und bis Retry-After pausieren. Rückgabe: Pause in s."""
+        self._rate = max(self._min_rate, self._rate / 2.0)
+        pause = retry_after_s if retry_after_s is not None else 1.0 / self._rate
+        self._tokens = 0.0
+        self._blocked_until = max(self._blocked_until, time.monotonic() + pause)
+        self._metrics.inc("zep.rate.limited")
+        self._metrics.set_gauge("zep.rate.limit", round(self._rate, 3))
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        try:
+            self._dispatch()
+        except RuntimeError:
+            pass  # kein laufender Loop (z. B. aus Sync-Kontext)
+        return pause
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "rate": round(self._rate, 3),
+            "tokens": round(self._tokens, 3),
+            "blocked_for_s": round(max(0.0, self._blocked_until - time.monotonic()), 3),
+            "queued": {_PRIORITY_NAMES.get(p, str(p)): len(q) for p, q in self._waiters.items()},
+        }
+
+    @classmethod
+    def from_env(cls) -> "RateGovernor":
+        return cls(
+            rate=float(os.getenv("GATEWAY_ZEP_RATE", "20")),
+            burst=float(os.getenv("GATEWAY_ZEP_BURST", "20")),
+            min_rate=float(os.getenv("GATEWAY_ZEP_RATE_MIN", "1")),
+            max_rate=float(os.getenv("GATEWAY_ZEP_RATE_MAX", "200")),
+            increase_per_s=float(os.getenv("GATEWAY_ZEP_RATE_INCREASE", "1")),
+        )
+
+
+_governor: RateGovernor | None = None
+
+
+def get_governor() -> RateGovernor:
+    """Prozessweite Instanz; GATEWAY_ZEP_RATE steuert die Start-Rate (Requests/s)."""
+    global _governor
+    if _governor is None:
+        _governor = RateGovernor.from_env()
+        _default_metrics.register_collector("zep_rate_governor", _governor.stats)
+    return _governor
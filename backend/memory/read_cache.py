@@ -0,0 +1,309 @@
+# backend/memory/read_cache.py
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+__all__ = ["CACHE_SCHEMA_VERSION", "DiskCache", "ReadCache"]
+
+logger = logging.getLogger(__name__)
+
+# Bei inkompatiblen Änderungen an gecachten Formaten hochzählen → alte Einträge werden ignoriert/verworfen
+CACHE_SCHEMA_VERSION = 1
+
+_Entry = Tuple[Any, float, float]  # (value, fresh_until, stale_until) – Wall-Clock-Sekunden
+
+
+class DiskCache:
+    """
+    Persistente Cache-Stufe auf SQLite (WAL) – überlebt uvicorn-Reloads und Container-Restarts.
+
+    - Einträge pro Namespace (ns, key) mit fresh_until/stale_until und Format-Version,
+    - Größenlimit (Bytes) mit LRU-Eviction nach last access,
+    - synchroner Zugriff: Einzel-Lookups auf einer lokalen WAL-Datenbank liegen im
+      Mikrosekundenbereich und blockieren den Event-Loop nicht spürbar.
+    """
+
+    def __init__(self, path: str | Path, *, max_bytes: int = 64 * 1024 * 1024, version: int = CACHE_SCHEMA_VERSION) -> None:
+        self._path = str(path)
+        self._max_bytes = int(max_bytes)
+        self._version = int(version)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_schema()
+        self._size = self._total_size()
+
+    def _init_schema(self) -> None:
+        with self._lock:
+            (uv,) = self._conn.execute("PRAGMA user_version").fetchone()
+            if uv != self._version:
+                self._conn.execute("DROP TABLE IF EXISTS entries")
+                self._conn.execute(f"PRAGMA user_version={self._version}")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " ns TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " fresh_until REAL NOT NULL, stale_until REAL NOT NULL,"
+                " accessed_at REAL NOT NULL, size INTEGER NOT NULL,"
+                " PRIMARY KEY (ns, key))")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries(accessed_at)")
+
+    def _total_size(self) -> int:
+        with self._lock:
+            (n,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return int(n)
+
+    def get(self, ns: str, key: str) -> Optional[_Entry]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, fresh_until, stale_until FROM entries WHERE ns=? AND key=?", (ns, key)).fetchone()
+            if row is None:
+                return None
+            if row[2] < now:
+                self._conn.execute("DELETE FROM entries WHERE ns=? AND key=?", (ns, key))
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at=? WHERE ns=? AND key=?", (now, ns, key))
+        try:
+            return json.loads(row[0]), float(row[1]), float(row[2])
+        except Exception:
+            return None
+
+    def set(self, ns: str, key: str, value: Any, *, fresh_until: float, stale_until: float) -> None:
+        try:
+            blob = json.dumps(value, ensure_ascii=False, default=str)
+        except Exception as e:
+            logger.debug(f"disk-cache skip (not serializable): {e}")
+            return
+        size = len(blob)
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE ns=? AND key=?", (ns, key)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (ns, key, value, fresh_until, stale_until, accessed_at, size)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (ns, key, blob, fresh_until, stale_until, time.time(), size))
+            self._size += size - (int(old[0]) if old else 0)
+        if self._size > self._max_bytes:
+            self._evict()
+
+    def delete(self, ns: str, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE ns=? AND key=?", (ns, key))
+        self._size = self._total_size()
+
+    def delete_prefix(self, ns: str, prefix: str) -> None:
+        esc = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE ns=? AND key LIKE ? ESCAPE '\\'", (ns, esc + "%"))
+        self._size = self._total_size()
+
+    def clear(self, ns: str | None = None) -> None:
+        with self._lock:
+            if ns is None:
+                self._conn.execute("DELETE FROM entries")
+            else:
+                self._conn.execute("DELETE FROM entries WHERE ns=?", (ns,))
+        self._size = self._total_size()
+
+    def _evict(self) -> None:
+        """Abgelaufene Einträge löschen, dann LRU bis 90 % des Limits."""
+        target = int(self._max_bytes * 0.9)
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE stale_until < ?", (time.time(),))
+            (size,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+            if size > target:
+                freed = 0
+                victims = []
+                for ns, key, sz in self._conn.execute("SELECT ns, key, size FROM entries ORDER BY accessed_at ASC"):
+                    victims.append((ns, key))
+                    freed += sz
+                    if size - freed <= target:
+                        break
+                self._conn.executemany("DELETE FROM entries WHERE ns=? AND key=?", victims)
+                size -= freed
+            self._size = int(size)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (n,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        return {"path": self._path, "entries": int(n), "bytes": self._size, "max_bytes": self._max_bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+
+class ReadCache:
+    """
+    Zweistufiger Read-Cache (Speicher-LRU über optionaler DiskCache) mit
+    stale-while-revalidate: frische Einträge kommen direkt, abgelaufene aber noch
+    „stale“-gültige Einträge werden sofort ausgeliefert und im Hintergrund neu geladen.
+    Gleichzeitige Loads pro Schlüssel werden zusammengefasst (single-flight).
+    """
+
+    def __init__(self, disk: DiskCache | None = None, *, mem_max_entries: int = 2048) -> None:
+        self._disk = disk
+        self._mem: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._mem_max = max(1, int(mem_max_entries))
+        self._inflight: Dict[Tuple[str, str], asyncio.Future[Any]] = {}
+        self._bg: set[asyncio.Task[Any]] = set()
+        self._stats: Dict[str, int] = {"mem_hits": 0, "disk_hits": 0, "stale_hits": 0, "misses": 0, "loads": 0}
+
+    @property
+    def disk(self) -> DiskCache | None:
+        return self._disk
+
+    # ---- Basis-Operationen ---------------------------------------------------
+    def peek(self, ns: str, key: str) -> Optional[_Entry]:
+        k = (ns, key)
+        entry = self._mem.get(k)
+        if entry is not None:
+            if entry[2] < time.time():
+                self._mem.pop(k, None)
+                entry = None
+            else:
+                self._mem.move_to_end(k)
+                self._stats["mem_hits"] += 1
+                return entry
+        if self._disk is not None:
+            entry = self._disk.get(ns, key)
+            if entry is not None:
+                self._stats["disk_hits"] += 1
+                self._remember(k, entry)
+                return entry
+        return None
+
+    def get(self, ns: str, key: str) -> Any | None:
+        """Nur frische Werte (ohne Laden)."""
+        entry = self.peek(ns, key)
+        return entry[0] if entry is not None and entry[1] >= time.time() else None
+
+    def set(self, ns: str, key: str, value: Any, *, ttl_s: float, stale_ttl_s: float = 0.0) -> None:
+        now = time.time()
+        entry: _Entry = (value, now + ttl_s, now + max(ttl_s, stale_ttl_s))
+        self._remember((ns, key), entry)
+        if self._disk is not None:
+            self._disk.set(ns, key, value, fresh_until=entry[1], stale_until=entry[2])
+
+    def local_value(self, ns: str, key: str) -> Any | None:
+        """Wert aus der Speicher-Stufe ohne Disk-Zugriff, LRU-Update und Statistik (für Speicher-Abschätzungen)."""
+        entry = self._mem.get((ns, key))
+        return entry[0] if entry is not None else None
+
+    def invalidate(self, ns: str, key: str, *, local_only: bool = False) -> None:
+        """local_only=True: nur die Speicher-Stufe (die geteilte Disk-Stufe hat bereits den neuen Stand)."""
+        self._mem.pop((ns, key), None)
+        if self._disk is not None and not local_only:
+            self._disk.delete(ns, key)
+
+    def invalidate_prefix(self, ns: str, prefix: str, *, local_only: bool = False) -> None:
+        """Alle Schlüssel eines Namespaces mit Präfix verwerfen (z. B. alle Suchen eines Graph-Ziels)."""
+        for k in [k for k in self._mem if k[0] == ns and k[1].startswith(prefix)]:
+            self._mem.pop(k, None)
+        if self._disk is not None and not local_only:
+            self._disk.delete_prefix(ns, prefix)
+
+    # ---- Laden mit stale-while-revalidate --------------------------------------
+    async def get_or_load(
+        self,
+        ns: str,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        *,
+        ttl_s: float,
+        stale_ttl_s: float = 0.0,
+    ) -> Any:
+        entry = self.peek(ns, key)
+        now = time.time()
+        if entry is not None:
+            value, fresh_until, _ = entry
+            if fresh_until >= now:
+                return value
+            self._stats["stale_hits"] += 1
+            self._refresh_in_background(ns, key, loader, ttl_s=ttl_s, stale_ttl_s=stale_ttl_s)
+            return value
+        self._stats["misses"] += 1
+        return await self._load(ns, key, loader, ttl_s=ttl_s, stale_ttl_s=stale_ttl_s)
+
+    async def _load(self, ns: str, key: str, loader: Callable[[], Awaitable[Any]], *, ttl_s: float, stale_ttl_s: float) -> Any:
+        k = (ns, key)
+        fut = self._inflight.get(k)
+        if fut is not None:
+            return await asyncio.shield(fut)
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[k] = fut
+        try:
+            self._stats["loads"] += 1
+            value = await loader()
+            self.set(ns, key, value, ttl_s=ttl_s, stale_ttl_s=stale_ttl_s)
+            fut.set_result(value)
+            return value
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()  # als abgerufen markieren (kein "never retrieved"-Warning)
+            raise
+        finally:
+            self._inflight.pop(k, None)
+
+    def _refresh_in_background(self, ns: str, key: str, loader: Callable[[], Awaitable[Any]], *, ttl_s: float, stale_ttl_s: float) -> None:
+        if (ns, key) in self._inflight:
+            return
+
+        async def _run() -> None:
+            try:
+                await self._load(ns, key, loader, ttl_s=ttl_s, stale_ttl_s=stale_ttl_s)
+            except Exception as e:
+                logger.debug(f"read-cache refresh failed for {ns}:{key}: {e}")
+
+        task = asyncio.create_task(_run())
+        self._bg.add(task)
+        task.add_done_callback(self._bg.discard)
+
+    def _remember(self, k: Tuple[str, str], entry: _Entry) -> None:
+        self._mem[k] = entry
+        self._mem.move_to_end(k)
+        while len(self._mem) > self._mem_max:
+            self._mem.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        out: Dict[str, Any] = dict(self._stats)
+        out["mem_entries"] = len(self._mem)
+        if self._disk is not None:
+            out["disk"] = self._disk.stats()
+        return out
+
+    def close(self) -> None:
+        for task in list(self._bg):
+            task.cancel()
+        if self._disk is not None:
+            self._disk.close()
+
+    @classmethod
+    def from_env(cls, default_path: str | Path | None = None) -> "ReadCache":
+        """
+        Disk-Stufe unter default_path (Bootstrap: state_path("read_cache.sqlite3")) bzw. GATEWAY_CACHE_PATH,
+        ohne beides nur Speicher; GATEWAY_CACHE_DISK=0 deaktiviert die Disk-Stufe, GATEWAY_CACHE_MAX_MB /
+        GATEWAY_CACHE_MEM_ENTRIES steuern die Größen.
+        """
+        disk: DiskCache | None = None
+        path = os.getenv("GATEWAY_CACHE_PATH") or default_path
+        if path and os.getenv("GATEWAY_CACHE_DISK", "1") not in ("0", "false", "False"):
+            try:
+                disk = DiskCache(str(path), max_bytes=int(float(os.getenv("GATEWAY_CACHE_MAX_MB", "64")) * 1024 * 1024))
+            except Exception as e:
+                logger.warning(f"disk cache disabled: {e}")
+        return cls(disk, mem_max_entries=int(os.getenv("GATEWAY_CACHE_MEM_ENTRIES", "2048")))
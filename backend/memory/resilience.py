@@ -0,0 +1,320 @@
+# backend/memory/resilience.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+from zep_cloud.core.api_error import ApiError
+
+from ..metrics import MetricsRegistry, metrics as _default_metrics
+from .rate_governor import BACKGROUND, INTERACTIVE, RateGovernor, current_priority, get_governor, parse_retry_after
+
+__all__ = [
+    "CircuitOpenError",
+    "CircuitBreaker",
+    "ResiliencePolicy",
+    "ZepResilience",
+    "get_resilience",
+    "is_retryable",
+]
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Transiente HTTP-Status (Rate-Limit, Gateway-/Server-Fehler, Timeouts)
+_RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """Fast-Fail: Breaker der Endpoint-Familie ist offen, Zep wird nicht angefragt."""
+
+    def __init__(self, family: str, retry_in_s: float) -> None:
+        super().__init__(f"zep circuit '{family}' open (retry in {retry_in_s:.1f}s)")
+        self.family = family
+        self.retry_in_s = retry_in_s
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Transiente Fehler (Timeout, Transport, 408/425/429/5xx) → Retry/Breaker-relevant."""
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, httpx.TransportError, ConnectionError)):
+        return True
+    if isinstance(exc, ApiError):
+        return getattr(exc, "status_code", None) in _RETRYABLE_STATUS
+    return False
+
+
+@dataclass
+class ResiliencePolicy:
+    read_deadline_s: float = 8.0
+    write_deadline_s: float = 20.0
+    retries: int = 2
+    backoff_base_s: float = 0.2
+    backoff_cap_s: float = 2.0
+    hedge: bool = True
+    hedge_percentile: float = 95.0
+    hedge_min_samples: int = 20
+    hedge_min_delay_s: float = 0.05
+    breaker_threshold: int = 5
+    breaker_reset_s: float = 15.0
+    rate_limit_retries: int = 5
+
+    @classmethod
+    def from_env(cls) -> "ResiliencePolicy":
+        env = os.getenv
+        return cls(
+            read_deadline_s=float(env("GATEWAY_ZEP_READ_DEADLINE_S", "8")),
+            write_deadline_s=float(env("GATEWAY_ZEP_WRITE_DEADLINE_S", "20")),
+            retries=int(env("GATEWAY_ZEP_RETRIES", "2")),
+            backoff_base_s=float(env("GATEWAY_ZEP_BACKOFF_BASE_S", "0.2")),
+            backoff_cap_s=float(env("GATEWAY_ZEP_BACKOFF_CAP_S", "2")),
+            hedge=env("GATEWAY_ZEP_HEDGE", "1") not in ("0", "false", "False"),
+            hedge_percentile=float(env("GATEWAY_ZEP_HEDGE_PERCENTILE", "95")),
+            hedge_min_samples=int(env("GATEWAY_ZEP_HEDGE_MIN_SAMPLES", "20")),
+            breaker_threshold=int(env("GATEWAY_ZEP_BREAKER_THRESHOLD", "5")),
+            breaker_reset_s=float(env("GATEWAY_ZEP_BREAKER_RESET_S", "15")),
+            rate_limit_retries=int(env("GATEWAY_ZEP_RATE_LIMIT_RETRIES", "5")),
+        )
+
+
+class CircuitBreaker:
+    """
+    Klassischer Breaker pro Endpoint-Familie (graph / thread / user):
+    closed → (threshold aufeinanderfolgende transiente Fehler) → open
+    → (reset_s) → half_open (genau ein Probe-Call) → closed | open.
+    """
+
+    def __init__(self, family: str, *, threshold: int = 5, reset_s: float = 15.0) -> None:
+        self.family = family
+        self._threshold = max(1, int(threshold))
+        self._reset_s = float(reset_s)
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def retry_in(self) -> float:
+        return max(0.0, self._opened_at + self._reset_s - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == "open":
+            if self.retry_in() > 0:
+                return False
+            self.state = "half_open"
+            self._probing = False
+        if self.state == "half_open":
+            if self._probing:
+                return False
+            self._probing = True
+        return True
+
+    def release_probe(self) -> None:
+        """Probe ohne Ergebnis beendet (Abbruch, Deadline, 429): der nächste Call darf erneut proben."""
+        if self.state == "half_open":
+            self._probing = False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self.state == "half_open" or self._failures >= self._threshold:
+            if self.state != "open":
+                logger.warning(f"zep circuit '{self.family}' opened after {self._failures} failures")
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class ZepResilience:
+    """
+    Resilienz-Schicht um jeden Zep-Call:
+    - Deadline pro Call (über alle Versuche),
+    - Retries mit Full-Jitter-Backoff nur für idempotente Operationen,
+    - Circuit-Breaker pro Endpoint-Familie (Präfix von op, z. B. "graph.search" → "graph"),
+    - Hedged Reads: läuft ein Read länger als das p-Perzentil seiner op, wird ein zweiter
+      identischer Request gestartet; der erste Erfolg gewinnt, der andere wird abgebrochen,
+    - optional ein RateGovernor: jeder Versuch holt ein Token (Reads interaktiv, Writes im
+      Hintergrund), 429 drosselt adaptiv und wird – auch für Writes – nach Retry-After wiederholt.
+    Metriken landen in backend.metrics (zep.calls, zep.latency_ms, zep.retries, zep.hedges, …).
+    """
+
+    def __init__(self, policy: ResiliencePolicy | None = None, *, registry: MetricsRegistry | None = None,
+                 governor: RateGovernor | None = None) -> None:
+        self.policy = policy or ResiliencePolicy()
+        self._metrics = registry or _default_metrics
+        self._governor = governor
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker(self, family: str) -> CircuitBreaker:
+        br = self._breakers.get(family)
+        if br is None:
+            br = self._breakers[family] = CircuitBreaker(
+                family, threshold=self.policy.breaker_threshold, reset_s=self.policy.breaker_reset_s)
+        return br
+
+    def breaker_states(self) -> Dict[str, str]:
+        return {f: b.state for f, b in self._breakers.items()}
+
+    async def call(
+        self,
+        op: str,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        idempotent: bool = False,
+        hedge: bool = False,
+        deadline_s: Optional[float] = None,
+        priority: Optional[int] = None,
+    ) -> T:
+        pol = self.policy
+        family = op.split(".", 1)[0]
+        br = self.breaker(family)
+        gov = self._governor
+        prio = current_priority(INTERACTIVE if hedge else BACKGROUND) if priority is None else priority
+        loop = asyncio.get_running_loop()
+        budget = deadline_s if deadline_s is not None else (pol.read_deadline_s if idempotent else pol.write_deadline_s)
+        deadline = loop.time() + budget
+        attempts = 1 + (max(0, pol.retries) if idempotent else 0)
+        attempt = 0
+        throttled = 0
+        last_exc: BaseException | None = None
+        probe = False  # dieser Call hält den Half-Open-Probe des Breakers
+        try:
+            while attempt < attempts:
+                if not br.allow():
+                    self._metrics.inc("zep.short_circuits", op=op)
+                    raise CircuitOpenError(family, br.retry_in())
+                probe = br.state == "half_open"
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                if gov is not None:
+                    try:
+                        await asyncio.wait_for(gov.acquire(prio), remaining)
+                    except asyncio.TimeoutError:
+                        self._metrics.inc("zep.calls", op=op, outcome="throttled")
+                        raise asyncio.TimeoutError(f"zep {op}: no rate token within deadline") from None
+                    remaining = deadline - loop.time()
+                started = time.perf_counter()
+                try:
+                    result = await self._attempt(op, fn, remaining, hedge=hedge and pol.hedge)
+                except Exception as e:
+                    elapsed_ms = (time.perf_counter() - started) * 1000.0
+                    last_exc = e
+                    if isinstance(e, ApiError) and getattr(e, "status_code", None) == 429:
+                        # Rate-Limit: Request wurde nicht verarbeitet → auch Writes dürfen erneut laufen.
+                        # Kein Breaker-Fehler; der Governor drosselt und pausiert bis Retry-After.
+                        self._metrics.inc("zep.calls", op=op, outcome="rate_limited")
+                        pause = gov.on_rate_limited(parse_retry_after(e.headers)) if gov is not None else pol.backoff_cap_s
+                        throttled += 1
+                        if probe:
+                            # 429 sagt nichts über die Gesundheit des Endpoints → Probe neutral freigeben
+                            br.release_probe()
+                            probe = False
+                        if throttled > pol.rate_limit_retries or loop.time() + pause >= deadline:
+                            break
+                        if gov is None:
+                            await asyncio.sleep(pause)
+                        continue
+                    if not is_retryable(e):
+                        # Client-Fehler (404, 400, …): Zep ist erreichbar → Breaker gesund
+                        br.record_success()
+                        probe = False
+                        self._metrics.inc("zep.calls", op=op, outcome="client_error")
+                        raise
+                    br.record_failure()
+                    probe = False
+                    timeout = isinstance(e, (asyncio.TimeoutError, TimeoutError))
+                    self._metrics.inc("zep.calls", op=op, outcome="timeout" if timeout else "error")
+                    self._metrics.observe("zep.failed_latency_ms", elapsed_ms, op=op)
+                    attempt += 1
+                    if attempt >= attempts:
+                        break
+                    delay = random.uniform(0, min(pol.backoff_cap_s, pol.backoff_base_s * (2 ** (attempt - 1))))
+                    if loop.time() + delay >= deadline:
+                        break
+                    self._metrics.inc("zep.retries", op=op)
+                    logger.debug(f"zep {op} failed ({e!r}) – retry {attempt}/{attempts - 1} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                br.record_success()
+                probe = False
+                if gov is not None:
+                    gov.on_success()
+                self._metrics.inc("zep.calls", op=op, outcome="ok")
+                self._metrics.observe("zep.latency_ms", (time.perf_counter() - started) * 1000.0, op=op)
+                return result
+
+            if last_exc is None:
+                self._metrics.inc("zep.deadline_exceeded", op=op)
+                raise asyncio.TimeoutError(f"zep {op}: deadline of {budget:.1f}s exceeded")
+            raise last_exc
+        finally:
+            if probe:
+                # Abbruch (Client weg, Hedge-Verlierer, wait_for des Aufrufers) o. Ä. → Probe freigeben,
+                # sonst bliebe der Breaker dauerhaft half_open mit belegtem Probe
+                br.release_probe()
+
+    def _hedge_delay(self, op: str) -> float | None:
+        pol = self.policy
+        if self._metrics.count("zep.latency_ms", op=op) < pol.hedge_min_samples:
+            return None
+        p = self._metrics.percentile("zep.latency_ms", pol.hedge_percentile, op=op)
+        if p is None:
+            return None
+        return max(pol.hedge_min_delay_s, p / 1000.0)
+
+    async def _attempt(self, op: str, fn: Callable[[], Awaitable[T]], timeout: float, *, hedge: bool) -> T:
+        delay = self._hedge_delay(op) if hedge else None
+        if delay is None or delay >= timeout:
+            return await asyncio.wait_for(fn(), timeout)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        primary: asyncio.Future[T] = asyncio.ensure_future(fn())
+        tasks: set[asyncio.Future[T]] = {primary}
+        last_exc: BaseException | None = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done and (self._governor is None or self._governor.try_acquire()):
+                self._metrics.inc("zep.hedges", op=op)
+                tasks.add(asyncio.ensure_future(fn()))
+            while tasks:
+                done, _ = await asyncio.wait(
+                    tasks, timeout=max(0.0, deadline - loop.time()), return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise asyncio.TimeoutError(f"zep {op}: attempt timed out")
+                for t in done:
+                    tasks.discard(t)
+                    exc = t.exception()
+                    if exc is None:
+                        if t is not primary:
+                            self._metrics.inc("zep.hedge_wins", op=op)
+                        return t.result()
+                    last_exc = exc
+            assert last_exc is not None
+            raise last_exc
+        finally:
+            for t in tasks:
+                t.cancel()
+
+
+_resilience: ZepResilience | None = None
+
+
+def get_resilience() -> ZepResilience:
+    """Prozessweite Instanz (Policy aus ENV), geteilt von ZepGraphAdmin und ZepThreadMemory."""
+    global _resilience
+    if _resilience is None:
+        governor = get_governor() if os.getenv("GATEWAY_ZEP_RATE_GOVERNOR", "1") not in ("0", "false", "False") else None
+        _resilience = ZepResilience(ResiliencePolicy.from_env(), governor=governor)
+        _default_metrics.register_collector("zep_breakers", _resilience.breaker_states)
+    return _resilience
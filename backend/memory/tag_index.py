@@ -0,0 +1,185 @@
+# backend/memory/tag_index.py
+from __future__ import annotations
+
+import ast
+import asyncio
+import hashlib
+import json
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+__all__ = ["TagIndex", "parse_tagged_payload", "normalize_month_day"]
+
+logger = logging.getLogger(__name__)
+
+_DATE_TAG_RE = re.compile(r"date:(\d{2}-\d{2})")
+_MONTH_DAY_RE = re.compile(r"^(\d{1,2})-(\d{1,2})$")
+
+
+def normalize_month_day(value: Any) -> Optional[str]:
+    """'2-3' | '02-03' | 'date:02-03' → '02-03' (MM-DD); sonst None."""
+    s = str(value or "").strip()
+    if s.startswith("date:"):
+        s = s[5:]
+    m = _MONTH_DAY_RE.match(s)
+    if not m:
+        return None
+    mon, day = int(m.group(1)), int(m.group(2))
+    if not (1 <= mon <= 12 and 1 <= day <= 31):
+        return None
+    return f"{mon:02d}-{day:02d}"
+
+
+def _as_mapping(raw: Any) -> Optional[Dict[str, Any]]:
+    if isinstance(raw, dict):
+        return raw
+    s = str(raw or "").strip()
+    if not s.startswith("{"):
+        return None
+    try:
+        d = json.loads(s)
+    except Exception:
+        # ZepMemory.add_episode schreibt str(dict) → Python-Literal
+        try:
+            d = ast.literal_eval(s)
+        except Exception:
+            return None
+    return d if isinstance(d, dict) else None
+
+
+def parse_tagged_payload(content: Any, _depth: int = 0) -> Optional[Tuple[str, List[str], Optional[str]]]:
+    """
+    Extrahiert (text, tags, month_day) aus einem Episoden-Payload, wie ihn
+    memory_api (_episode_from_content / „Merke:“) erzeugt – auch wenn er durch
+    add_episode in einen {"kind": "episode", "content": ...}-Block eingebettet ist.
+    Rückgabe None, wenn keine Tags erkennbar sind.
+    """
+    d = _as_mapping(content)
+    if d is not None:
+        tags = d.get("tags")
+        if isinstance(tags, list):
+            clean = [str(t).strip() for t in tags if str(t).strip()]
+            md = normalize_month_day(d.get("month_day")) or next(
+                (normalize_month_day(t) for t in clean if t.startswith("date:")), None)
+            text = str(d.get("text") or d.get("content") or "").strip()
+            return text, clean, md
+        inner = d.get("content")
+        if inner is not None and _depth < 3:
+            return parse_tagged_payload(inner, _depth + 1)
+        return None
+    # Fallback: nur Datums-Tags im Freitext
+    s = str(content or "")
+    dates = _DATE_TAG_RE.findall(s)
+    if not dates:
+        return None
+    return s.strip(), [f"date:{d}" for d in dates], dates[0]
+
+
+class TagIndex:
+    """
+    Lokaler Sekundärindex: Tag bzw. month_day → Episoden-IDs (pro Graph-Ziel).
+
+    Befüllt über den GraphAPI-Write-Listener (memory_add, add_graph_data, …) und per
+    backfill() aus dem Graphen; lookup() beantwortet exakte Anfragen wie
+    „Geburtstage am 3. Februar“ ohne Remote-Suche.
+    """
+
+    def __init__(self) -> None:
+        self._by_tag: Dict[str, Dict[str, Set[str]]] = {}
+        self._by_md: Dict[str, Dict[str, Set[str]]] = {}
+        self._records: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._backfilled: Set[str] = set()   # vollständig aus dem Graphen übernommen
+        self._truncated: Set[str] = set()    # Backfill hat das Limit erreicht → Index unvollständig
+        self._backfill_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return sum(len(r) for r in self._records.values())
+
+    # ---- Schreiben -------------------------------------------------------------
+    def add(self, key: str, episode_id: str, *, text: str, tags: Iterable[str],
+            month_day: Optional[str] = None, **extra: Any) -> None:
+        tag_list = [str(t) for t in tags if str(t).strip()]
+        md = normalize_month_day(month_day)
+        self.remove(key, episode_id)
+        self._records.setdefault(key, {})[episode_id] = {
+            "uuid": episode_id, "text": text, "tags": tag_list, "month_day": md, **extra}
+        by_tag = self._by_tag.setdefault(key, {})
+        for t in tag_list:
+            by_tag.setdefault(t, set()).add(episode_id)
+        if md:
+            self._by_md.setdefault(key, {}).setdefault(md, set()).add(episode_id)
+
+    def index_item(self, key: str, item: Dict[str, Any]) -> bool:
+        """Normalisierte Episode (GraphAPI-dict) indexieren, falls sie Tags trägt."""
+        parsed = parse_tagged_payload(item.get("content"))
+        if parsed is None:
+            return False
+        text, tags, md = parsed
+        eid = str(item.get("uuid") or "") or "local:" + hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+        self.add(key, eid, text=text, tags=tags, month_day=md, created_at=item.get("created_at"))
+        return True
+
+    def remove(self, key: str, episode_id: str) -> None:
+        rec = self._records.get(key, {}).pop(episode_id, None)
+        if not rec:
+            return
+        for t in rec.get("tags") or []:
+            ids = self._by_tag.get(key, {}).get(t)
+            if ids:
+                ids.discard(episode_id)
+        md = rec.get("month_day")
+        if md:
+            ids = self._by_md.get(key, {}).get(md)
+            if ids:
+                ids.discard(episode_id)
+
+    # ---- Lesen -----------------------------------------------------------------
+    def lookup(self, key: str, *, tags: Iterable[str] | None = None, month_day: Optional[str] = None,
+               limit: int | None = None) -> List[Dict[str, Any]]:
+        """Exakte Schnittmenge aller angegebenen Tags (und month_day)."""
+        sets: List[Set[str]] = []
+        for t in tags or []:
+            md = normalize_month_day(t) if str(t).startswith("date:") else None
+            if md:
+                sets.append(self._by_md.get(key, {}).get(md, set()))
+            else:
+                sets.append(self._by_tag.get(key, {}).get(str(t), set()))
+        if month_day is not None:
+            md = normalize_month_day(month_day)
+            sets.append(self._by_md.get(key, {}).get(md, set()) if md else set())
+        if not sets:
+            return []
+        ids = set.intersection(*sets) if len(sets) > 1 else set(sets[0])
+        recs = self._records.get(key, {})
+        out = [dict(recs[i]) for i in ids if i in recs]
+        out.sort(key=lambda r: str(r.get("created_at") or ""), reverse=True)
+        return out[:limit] if limit else out
+
+    # ---- Backfill ----------------------------------------------------------------
+    def is_backfilled(self, key: str) -> bool:
+        """True nur nach vollständigem Backfill – erst dann ist lookup() für das Ziel maßgeblich."""
+        return key in self._backfilled
+
+    async def backfill(self, key: str, api: Any, *, query: str = "tags date", limit: int = 50) -> int:
+        """
+        Indexiert getaggte Episoden aus dem Graphen (einmal pro Ziel). Schlägt die Suche fehl,
+        wird beim nächsten Aufruf erneut versucht; liefert sie volle `limit` Treffer, gibt es
+        vermutlich mehr – das Ziel gilt dann nicht als backfilled (kein erneuter Voll-Backfill).
+        """
+        async with self._backfill_lock:
+            if key in self._backfilled or key in self._truncated:
+                return 0
+            try:
+                # nur Zep-Daten belegen Vollständigkeit (kein lokaler First-Pass/Fallback)
+                items = await api.search(query=query, scope="episodes", limit=limit, retrieval="remote")
+            except Exception as e:
+                logger.debug(f"tag-index backfill failed, retrying on next lookup: {e}")
+                return 0
+            n = sum(1 for it in items if isinstance(it, dict) and self.index_item(key, it))
+            if len(items) >= limit:
+                self._truncated.add(key)
+                logger.debug(f"tag-index backfill for {key} truncated at {limit} episodes")
+            else:
+                self._backfilled.add(key)
+            return n
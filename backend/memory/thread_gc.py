@@ -0,0 +1,167 @@
+# backend/memory/thread_gc.py
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from zep_cloud.core.api_error import ApiError
+
+from ..metrics import metrics
+from ..state import ThreadRegistry
+from .memory import ZepThreadMemory, _zep_call
+
+__all__ = ["ThreadCollector"]
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadCollector:
+    """
+    Räumt verwaiste Zep-Threads aus dem ThreadRegistry ab.
+
+    - Kandidaten: Threads mit abandoned_at, deren letzte Nutzung länger als retention_s zurückliegt,
+    - aktuell von der Runtime genutzte Thread-IDs (protect()) werden nie gelöscht,
+    - Löschen mit begrenzter Parallelität (thread.delete, Background-Priorität im Rate-Governor);
+      404 zählt als bereits gelöscht, beides entfernt den Eintrag aus dem Register,
+    - jeder Lauf liefert einen Report (auch als last_report und Metriken thread_gc.*).
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        registry: ThreadRegistry,
+        *,
+        retention_s: float = 7 * 24 * 3600.0,
+        concurrency: int = 4,
+        interval_s: float = 3600.0,
+        max_per_run: int = 200,
+        protect: Optional[Callable[[], Iterable[Optional[str]]]] = None,
+        outbox: Any | None = None,
+    ) -> None:
+        self._client = client
+        self._registry = registry
+        self._retention = float(retention_s)
+        self._concurrency = max(1, int(concurrency))
+        self._interval = float(interval_s)
+        self._max_per_run = max(1, int(max_per_run))
+        self._protect = protect
+        self._outbox = outbox  # OutboxReplayer (optional): offene Writes des Threads verwerfen
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task[None]] = None
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_env(cls, client: Any, registry: ThreadRegistry, **kwargs: Any) -> "ThreadCollector":
+        return cls(
+            client,
+            registry,
+            retention_s=float(os.getenv("GATEWAY_THREAD_GC_RETENTION_S", str(7 * 24 * 3600))),
+            concurrency=int(os.getenv("GATEWAY_THREAD_GC_CONCURRENCY", "4")),
+            interval_s=float(os.getenv("GATEWAY_THREAD_GC_INTERVAL_S", "3600")),
+            max_per_run=int(os.getenv("GATEWAY_THREAD_GC_MAX_PER_RUN", "200")),
+            **kwargs,
+        )
+
+    async def collect(self, *, dry_run: bool = False) -> Dict[str, Any]:
+        """Ein GC-Lauf; gleichzeitige Aufrufe laufen nacheinander."""
+        async with self._lock:
+            return await self._collect(dry_run)
+
+    async def _collect(self, dry_run: bool) -> Dict[str, Any]:
+        started = time.perf_counter()
+        protected = {tid for tid in (self._protect() if self._protect is not None else ()) if tid}
+        abandoned = await asyncio.to_thread(self._registry.abandoned, self._retention)  # flush + Datei-I/O
+        due = [(tid, e) for tid, e in abandoned if tid not in protected]
+        batch, deferred = due[: self._max_per_run], max(0, len(due) - self._max_per_run)
+
+        deleted: List[str] = []
+        missing: List[str] = []
+        failed: Dict[str, str] = {}
+        sem = asyncio.Semaphore(self._concurrency)
+
+        async def _delete(thread_id: str) -> None:
+            async with sem:
+                if self._outbox is not None:
+                    # sonst würde der Replayer den Thread per 404 → create wiederbeleben
+                    self._outbox.outbox.discard(ZepThreadMemory.outbox_stream(thread_id))
+                try:
+                    await _zep_call("thread.delete", self._client.thread.delete, thread_id=thread_id)
+                    deleted.append(thread_id)
+                except ApiError as e:
+                    if getattr(e, "status_code", None) != 404:
+                        failed[thread_id] = f"ApiError {getattr(e, 'status_code', None)}"
+                        return
+                    missing.append(thread_id)
+                except Exception as e:
+                    failed[thread_id] = f"{type(e).__name__}: {e}"
+                    return
+                self._registry.forget(thread_id)
+
+        if not dry_run:
+            await asyncio.gather(*(_delete(tid) for tid, _ in batch))
+
+        report: Dict[str, Any] = {
+            "at": time.time(),
+            "dry_run": dry_run,
+            "retention_s": self._retention,
+            "candidates": [
+                {"thread_id": tid, "label": e.get("label"), "abandoned_at": e.get("abandoned_at"),
+                 "last_used": e.get("last_used")}
+                for tid, e in batch
+            ],
+            "deleted": len(deleted),
+            "already_gone": len(missing),
+            "failed": failed,
+            "deferred": deferred,
+            "protected": len(protected),
+            "duration_ms": round((time.perf_counter() - started) * 1000.0, 1),
+            "registry": self._registry.stats(),
+        }
+        self.last_report = report
+        if not dry_run:
+            metrics.inc("thread_gc.runs")
+            metrics.inc("thread_gc.deleted", len(deleted) + len(missing))
+            if failed:
+                metrics.inc("thread_gc.failed", len(failed))
+        if batch:
+            logger.info(
+                f"thread gc{' (dry run)' if dry_run else ''}: {len(batch)} candidates, {len(deleted)} deleted, "
+                f"{len(missing)} already gone, {len(failed)} failed, {deferred} deferred ({report['duration_ms']} ms)"
+            )
+        return report
+
+    def stats(self) -> Dict[str, Any]:
+        last = self.last_report or {}
+        return {
+            **self._registry.stats(),
+            "last_run_at": last.get("at"),
+            "last_deleted": last.get("deleted"),
+            "last_failed": len(last.get("failed") or {}),
+        }
+
+    def start(self) -> None:
+        if self._task is not None or self._interval <= 0:
+            return
+        self._task = asyncio.create_task(self._run(), name="thread-gc")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self._registry.flush)
+
+    async def _run(self) -> None:
+        # erster Lauf erst nach einem Intervall → kein Zusatz-Traffic während des Starts
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.collect()
+            except Exception as e:
+                logger.warning(f"thread gc run failed: {e}")
@@ -0,0 +1,156 @@
+# backend/memory/vector_index.py
+from __future__ import annotations
+
+import re
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+__all__ = ["Embedder", "HashingEmbedder", "LocalVectorIndex"]
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class Embedder(Protocol):
+    """Pluggable Embedder: liefert L2-normalisierte float32-Zeilen (len(texts) × dim)."""
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray: ...
+
+
+class HashingEmbedder:
+    """
+    Offline-Default ohne Modell/Netz: Hashing-Vectorizer über Wörter und
+    Zeichen-n-Gramme (robust gegen Flexion, z. B. „Geburtstag“/„Geburtstags“).
+    """
+
+    def __init__(self, dim: int = 512, *, char_ngram: int = 3) -> None:
+        self.dim = int(dim)
+        self._n = int(char_ngram)
+
+    def _features(self, text: str) -> List[str]:
+        words = _WORD_RE.findall((text or "").casefold())
+        feats = [f"w:{w}" for w in words]
+        if self._n > 0:
+            for w in words:
+                padded = f"<{w}>"
+                feats.extend(f"c:{padded[i:i + self._n]}" for i in range(max(1, len(padded) - self._n + 1)))
+        return feats
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for f in self._features(text):
+                h = zlib.crc32(f.encode("utf-8"))
+                out[row, h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
+
+
+@dataclass
+class _Partition:
+    dim: int
+    matrix: np.ndarray = field(init=False)
+    ids: List[str] = field(default_factory=list)
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    rows: Dict[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self.matrix = np.zeros((64, self.dim), dtype=np.float16)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class LocalVectorIndex:
+    """
+    In-Process-Vektorindex über Episoden/Fakten (pro Graph-Ziel partitioniert).
+
+    - Speicherung als float16-NumPy-Matrix (halber RAM, wächst per Verdopplung),
+    - Brute-Force-Cosine-Suche in float32-Blöcken (bei wenigen zehntausend Items
+      schneller und exakter als ein IVF-Training),
+    - inkrementell über upsert(); älteste Einträge fallen bei max_items heraus.
+    """
+
+    def __init__(self, embedder: Optional[Embedder] = None, *, max_items: int = 20_000, block_rows: int = 4096) -> None:
+        self._embedder: Embedder = embedder or HashingEmbedder()
+        self._max = max(1, int(max_items))
+        self._block = max(1, int(block_rows))
+        self._parts: Dict[str, _Partition] = {}
+
+    @property
+    def embedder(self) -> Embedder:
+        return self._embedder
+
+    def __len__(self) -> int:
+        return sum(len(p) for p in self._parts.values())
+
+    def upsert(self, key: str, item_id: str, text: str, item: Dict[str, Any]) -> None:
+        text = (text or "").strip()
+        if not text or not item_id:
+            return
+        vec = self._embedder.embed([text])[0].astype(np.float16)
+        part = self._parts.get(key)
+        if part is None:
+            part = self._parts[key] = _Partition(dim=self._embedder.dim)
+        row = part.rows.get(item_id)
+        if row is not None:
+            part.matrix[row] = vec
+            part.items[row] = dict(item)
+            return
+        if len(part) >= self._max:
+            self._drop_oldest(part, max(1, self._max // 10))
+        n = len(part)
+        if n >= part.matrix.shape[0]:
+            grown = np.zeros((part.matrix.shape[0] * 2, part.dim), dtype=np.float16)
+            grown[:n] = part.matrix[:n]
+            part.matrix = grown
+        part.matrix[n] = vec
+        part.ids.append(item_id)
+        part.items.append(dict(item))
+        part.rows[item_id] = n
+
+    def remove(self, key: str, item_id: str) -> None:
+        part = self._parts.get(key)
+        if part is None or item_id not in part.rows:
+            return
+        row = part.rows.pop(item_id)
+        last = len(part) - 1
+        if row != last:  # Swap-Remove: letzte Zeile nachrücken
+            part.matrix[row] = part.matrix[last]
+            part.ids[row] = part.ids[last]
+            part.items[row] = part.items[last]
+            part.rows[part.ids[row]] = row
+        part.ids.pop()
+        part.items.pop()
+
+    def search(self, key: str, query: str, *, k: int = 10, min_score: float = 0.0,
+               types: Optional[set[str]] = None) -> List[Tuple[float, Dict[str, Any]]]:
+        part = self._parts.get(key)
+        if part is None or not len(part) or not (query or "").strip():
+            return []
+        q = self._embedder.embed([query])[0].astype(np.float32)
+        n = len(part)
+        scores = np.empty(n, dtype=np.float32)
+        for start in range(0, n, self._block):
+            stop = min(n, start + self._block)
+            scores[start:stop] = part.matrix[start:stop].astype(np.float32) @ q
+        if types:
+            mask = np.fromiter((str(it.get("type")) in types for it in part.items), dtype=bool, count=n)
+            scores[~mask] = -np.inf
+        kk = min(int(k), n)
+        if kk <= 0:
+            return []
+        top = np.argpartition(-scores, kk - 1)[:kk]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), dict(part.items[i])) for i in top if scores[i] >= min_score]
+
+    def _drop_oldest(self, part: _Partition, count: int) -> None:
+        keep = len(part) - count
+        part.matrix[:keep] = part.matrix[count:len(part)]
+        part.ids = part.ids[count:]
+        part.items = part.items[count:]
+        part.rows = {i: r for r, i in enumerate(part.ids)}
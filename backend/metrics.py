@@ -0,0 +1,103 @@
+# backend/metrics.py
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Tuple
+
+__all__ = ["MetricsRegistry", "metrics"]
+
+_LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> _LabelKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt(key: _LabelKey) -> str:
+    name, labels = key
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={v}" for k, v in labels) + "}"
+
+
+class MetricsRegistry:
+    """
+    Minimale In-Process-Metriken (ohne externe Abhängigkeit):
+    Counter, Gauges und Latenz-Reservoirs (letzte N Werte → p50/p95/p99),
+    plus registrierbare Collector-Callbacks für Fremdzustände (Cache, Pool, …).
+    Thread-safe, da auch aus asyncio.to_thread-Adaptern geschrieben wird.
+    """
+
+    def __init__(self, *, reservoir_size: int = 512) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[_LabelKey, float] = {}
+        self._gauges: Dict[_LabelKey, float] = {}
+        self._samples: Dict[_LabelKey, Deque[float]] = {}
+        self._totals: Dict[_LabelKey, int] = {}
+        self._reservoir = max(16, int(reservoir_size))
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        k = _key(name, labels)
+        with self._lock:
+            self._counters[k] = self._counters.get(k, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._gauges[_key(name, labels)] = float(value)
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        k = _key(name, labels)
+        with self._lock:
+            buf = self._samples.get(k)
+            if buf is None:
+                buf = self._samples[k] = deque(maxlen=self._reservoir)
+            buf.append(float(value))
+            self._totals[k] = self._totals.get(k, 0) + 1
+
+    def count(self, name: str, **labels: Any) -> int:
+        with self._lock:
+            return len(self._samples.get(_key(name, labels)) or ())
+
+    def percentile(self, name: str, p: float, **labels: Any) -> float | None:
+        with self._lock:
+            buf = self._samples.get(_key(name, labels))
+            values = sorted(buf) if buf else []
+        if not values:
+            return None
+        idx = min(len(values) - 1, max(0, int(round(p / 100.0 * (len(values) - 1)))))
+        return values[idx]
+
+    def register_collector(self, name: str, fn: Callable[[], Dict[str, Any]]) -> None:
+        self._collectors[name] = fn
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {_fmt(k): v for k, v in self._counters.items()}
+            gauges = {_fmt(k): v for k, v in self._gauges.items()}
+            samples = {k: (sorted(v), self._totals.get(k, 0)) for k, v in self._samples.items() if v}
+        latencies: Dict[str, Any] = {}
+        for k, (values, total) in samples.items():
+            def pct(p: float) -> float:
+                return round(values[min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))], 3)
+            latencies[_fmt(k)] = {"count": total, "p50": pct(50), "p95": pct(95), "p99": pct(99),
+                                  "max": round(values[-1], 3)}
+        collected: Dict[str, Any] = {}
+        for name, fn in list(self._collectors.items()):
+            try:
+                collected[name] = fn()
+            except Exception as e:
+                collected[name] = {"error": str(e)}
+        return {"counters": counters, "gauges": gauges, "latency": latencies, "collectors": collected}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._samples.clear()
+            self._totals.clear()
+
+
+# Prozessweite Instanz
+metrics = MetricsRegistry()
@@ -0,0 +1,220 @@
+# backend/readiness.py
+"""
+Readiness-Gate und Warm-up nach dem Bootstrap.
+
+Zustände: starting → bootstrapping → warming → ready (bzw. failed).
+- /status/live  : Prozess lebt (503 nur, wenn der Bootstrap endgültig fehlgeschlagen ist),
+- /status/ready : 200 erst nach Bootstrap + Warm-up; sonst 503 mit aktuellem Zustand.
+
+Warm-up (GATEWAY_WARMUP=1, Default), jeder Schritt mit eigenem Timeout und ohne harten Fehler:
+- connections : Zep-Verbindungen vorab öffnen (parallele, billige user.get-Calls),
+- t1_context  : Kontext-/Nachrichten-Cache für T1 füllen (MemoryManager.get_context),
+- profile     : Profil-Fakten-View laden,
+- agents      : Ich-Agenten bauen (AG2-/OpenAI-Import, im Thread); Demo-Agenten bleiben lazy
+                (GATEWAY_LAZY_AGENTS gilt: Bau bei der ersten Auswahl durch select_demos bzw. mit
+                GATEWAY_LAZY_AGENTS=0 schon im Bootstrap),
+- dry_turn    : optional (GATEWAY_WARMUP_DRY_TURN=1) ein HMA-Turn gegen Stand-ins
+                (Demos und Ich-Agent mit festen Antworten, keine Memory-Writes, kein LLM-Call).
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException, Request
+from loguru import logger
+
+from .metrics import metrics
+
+__all__ = ["Readiness", "warm_up", "require_runtime"]
+
+
+class Readiness:
+    """Start-Zustand der App (in app.state.readiness) inkl. Warm-up-Schritten."""
+
+    def __init__(self) -> None:
+        self.state = "starting"
+        self.error: Optional[str] = None
+        self.warmup: Dict[str, Dict[str, Any]] = {}
+        self._started = time.monotonic()
+        self._ready_after_s: Optional[float] = None
+        self._runtime_event = asyncio.Event()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "ready"
+
+    @property
+    def failed(self) -> bool:
+        return self.state == "failed"
+
+    def set_state(self, state: str) -> None:
+        self.state = state
+        metrics.set_gauge("readiness.ready", 1.0 if state == "ready" else 0.0)
+
+    def runtime_attached(self) -> None:
+        self._runtime_event.set()
+
+    def mark_ready(self) -> None:
+        self._ready_after_s = round(time.monotonic() - self._started, 3)
+        self.set_state("ready")
+        self._runtime_event.set()
+
+    def mark_failed(self, exc: BaseException) -> None:
+        self.error = f"{type(exc).__name__}: {exc}"
+        self.set_state("failed")
+        # Wartende Requests nicht hängen lassen
+        self._runtime_event.set()
+
+    async def wait_runtime(self, timeout_s: float) -> bool:
+        if timeout_s <= 0:
+            return self._runtime_event.is_set()
+        try:
+            await asyncio.wait_for(self._runtime_event.wait(), timeout_s)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "ready": self.is_ready,
+            "error": self.error,
+            "uptime_s": round(time.monotonic() - self._started, 3),
+            "ready_after_s": self._ready_after_s,
+            "warmup": dict(self.warmup),
+        }
+
+
+def _synced(runtime: Any) -> Any:
+    """Multi-Worker: Thread-Wechsel und Writes anderer Worker übernehmen (zwei kleine SQLite-Reads)."""
+    coordinator = getattr(runtime, "coordinator", None)
+    if coordinator is not None:
+        coordinator.sync(runtime)
+    return runtime
+
+
+async def require_runtime(request: Request) -> Any:
+    """
+    Runtime für Request-Handler; solange der Bootstrap (im Hintergrund) läuft, wird bis zu
+    GATEWAY_READY_WAIT_S gewartet, danach 503 mit Retry-After. Im Multi-Worker-Modus wird die
+    Runtime vorher mit dem Koordinations-Speicher abgeglichen (Coordinator.sync).
+    """
+    st = request.app.state
+    runtime = getattr(st, "runtime", None)
+    if runtime is not None:
+        return _synced(runtime)
+    readiness: Optional[Readiness] = getattr(st, "readiness", None)
+    if readiness is not None and not readiness.failed:
+        await readiness.wait_runtime(float(os.getenv("GATEWAY_READY_WAIT_S", "30")))
+        runtime = getattr(st, "runtime", None)
+        if runtime is not None:
+            return _synced(runtime)
+    state = readiness.state if readiness is not None else "starting"
+    raise HTTPException(status_code=503, detail=f"runtime not ready ({state})", headers={"Retry-After": "2"})
+
+
+# ---- Warm-up ------------------------------------------------------------------
+class _DryDemo:
+    """Stand-in-Demo für den Probe-Turn: feste Antwort, kein LLM-Call."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    async def run(self, *, user_text: str, context: str) -> str:
+        return f"{self.name}: Warm-up-Beitrag zu '{user_text[:40]}'."
+
+
+class _DryLLM:
+    def completion(self, *, system: str, prompt: str) -> str:
+        return 'Ich bin bereit.\n<<<ROUTE>>> {"deliver_to":"user","args":{}} <<<END>>>'
+
+
+async def _step(readiness: Readiness, name: str, fn: Callable[[], Awaitable[Any]], timeout_s: float) -> None:
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(fn(), timeout_s)
+        outcome = "ok"
+    except asyncio.TimeoutError:
+        outcome = "timeout"
+    except Exception as e:
+        outcome = f"error: {type(e).__name__}: {e}"
+    ms = round((time.perf_counter() - started) * 1000.0, 1)
+    readiness.warmup[name] = {"ms": ms, "outcome": outcome}
+    metrics.set_gauge("warmup.step_ms", ms, step=name)
+    if outcome == "ok":
+        logger.debug(f"🔥 [Warmup] {name}: {ms} ms")
+    else:
+        logger.warning(f"⚠️ [Warmup] {name} nach {ms} ms: {outcome}")
+
+
+async def warm_up(runtime: SimpleNamespace, readiness: Readiness) -> None:
+    """Führt die Warm-up-Schritte aus (Fehler/Timeouts werden nur protokolliert)."""
+    readiness.set_state("warming")
+    timeout_s = float(os.getenv("GATEWAY_WARMUP_TIMEOUT_S", "15"))
+    started = time.perf_counter()
+
+    async def _connections() -> None:
+        # Mehrere Requests parallel → mehrere Keep-Alive-Verbindungen (TLS-Handshake vorab)
+        cassette = getattr(runtime, "cassette", None)
+        if cassette is not None and cassette.mode == "replay":
+            return  # Antworten kommen aus der Kassette, kein Netz
+        n = max(1, int(os.getenv("GATEWAY_WARMUP_CONNECTIONS", "4")))
+        user_id = getattr(runtime.t1_memory, "user_id", None)
+        results = await asyncio.gather(
+            *(runtime.zep_client.user.get(user_id=user_id) for _ in range(n)), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, Exception) and getattr(r, "status_code", None) is None]
+        if errors:
+            raise errors[0]
+
+    async def _t1_context() -> None:
+        await runtime.memory.get_context(include_recent=True, graph=True)
+
+    async def _profile() -> None:
+        view = getattr(runtime, "profile_view", None)
+        if view is not None and not view.is_loaded:
+            await view.refresh()
+
+    async def _agents() -> None:
+        # nur der Ich-Agent (jeder Turn braucht ihn); Demos baut select_demos bei Bedarf
+        llm = getattr(runtime, "llm_client", None)
+        if llm is not None and hasattr(llm, "agent"):
+            await asyncio.to_thread(lambda: llm.agent)
+
+    async def _dry_turn() -> None:
+        from .agent_core.hma.hma import HMA
+        from .agent_core.hma.hma_config import DEFAULT_HMA_CONFIG
+
+        dry = HMA(
+            som_system_prompt=DEFAULT_HMA_CONFIG.som_system_prompt,
+            templates=DEFAULT_HMA_CONFIG,
+            demos=[_DryDemo(getattr(d, "name", "Demo")) for d in getattr(runtime, "demo_registry", [])],
+            messaging=None,
+            llm=_DryLLM(),
+            ctx_provider=runtime.ctx_provider,
+            runtime=None,  # keine Memory-Writes
+        )
+        await dry.run(user_text="Warm-up: Plane kurz den nächsten Schritt.", corr_id="warmup")
+
+    # Verbindungen zuerst, dann Caches parallel; Agentenbau läuft im Thread nebenher
+    await _step(readiness, "connections", _connections, timeout_s)
+    steps = [
+        _step(readiness, "t1_context", _t1_context, timeout_s),
+        _step(readiness, "profile", _profile, timeout_s),
+    ]
+    if os.getenv("GATEWAY_WARMUP_AGENTS", "1") == "1":
+        steps.append(_step(readiness, "agents", _agents, timeout_s))
+    await asyncio.gather(*steps)
+    if os.getenv("GATEWAY_WARMUP_DRY_TURN", "0") == "1":
+        await _step(readiness, "dry_turn", _dry_turn, timeout_s)
+
+    total = round((time.perf_counter() - started) * 1000.0, 1)
+    readiness.warmup["total"] = {"ms": total, "outcome": "ok"}
+    logger.info(
+        "🔥 [Warmup] abgeschlossen in {} ms | {}",
+        total,
+        " ".join(f"{k}={v['ms']}" for k, v in readiness.warmup.items() if k != "total"),
+    )
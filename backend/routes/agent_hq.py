@@ -12,6 +12,8 @@ from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Request, HTTPException
 from pydantic import BaseModel, Field
 
+from backend.readiness import require_runtime
+
 router = APIRouter(prefix="/agent-hq", tags=["agent-hq"])
 
 ENV_BEARER = "AGENTHQ_BEARER_TOKEN"
@@ -183,9 +185,7 @@ async def agenthq_docs_sync(request: Request) -> DocsSyncResponse:
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
 
-    rt = getattr(request.app.state, "runtime", None)
-    if rt is None:
-        raise HTTPException(status_code=500, detail="Runtime not initialized (app.state.runtime missing)")
+    await require_runtime(request)  # wartet ggf. auf den Bootstrap (sonst 503)
 
     changed = set(payload.changed_files)
 
@@ -254,3 +254,39 @@ async def agenthq_docs_sync(request: Request) -> DocsSyncResponse:
         todos=todos,
         patch_suggestion=patch,
     )
+
+
+class RuntimeRebuildRequest(BaseModel):
+    model_name: Optional[str] = Field(None, description="optional model override (default: LLM_MODEL)")
+    reload_config: bool = Field(True, description="re-import hma_config.py before rebuilding")
+
+
+@router.post("/runtime/rebuild")
+async def agenthq_runtime_rebuild(request: Request, payload: Optional[RuntimeRebuildRequest] = None) -> Dict[str, Any]:
+    """
+    Baut HMA, Demos und LLM-Adapter aus der aktuellen Config neu und tauscht sie atomar aus
+    (Zep-Client und Memories bleiben). Laufende Turns beenden sich auf der alten Instanz.
+    """
+    _verify_bearer(request)
+    rt = await require_runtime(request)
+    payload = payload or RuntimeRebuildRequest()
+
+    from backend.bootstrap import rebuild_agents
+
+    try:
+        result = await rebuild_agents(rt, model_name=payload.model_name, reload_config=payload.reload_config)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Rebuild failed, previous runtime stays active: {e}")
+    request.app.state.hma = rt.hma
+    return {"ok": True, **result}
+
+
+@router.post("/threads/gc")
+async def agenthq_threads_gc(request: Request, dry_run: bool = False) -> Dict[str, Any]:
+    """Thread-GC sofort ausführen (dry_run=true: nur Kandidaten melden, nichts löschen)."""
+    _verify_bearer(request)
+    rt = await require_runtime(request)
+    thread_gc = getattr(rt, "thread_gc", None)
+    if thread_gc is None:
+        raise HTTPException(status_code=409, detail="Thread GC disabled (GATEWAY_THREAD_GC / thread registry)")
+    return {"ok": True, **(await thread_gc.collect(dry_run=dry_run))}
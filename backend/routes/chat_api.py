@@ -1,37 +1,63 @@
 from __future__ import annotations
-from fastapi import APIRouter, Request
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from backend.agent_core.messaging import Message, Envelope, UserProxy
+from backend.readiness import require_runtime
+from backend.turns import TurnQueueFull
 
 router = APIRouter()
 
 class ChatRequest(BaseModel):
     prompt: str
+    session_id: Optional[str] = None  # alternativ Header X-Session-Id → eigene Session-Runtime
 
 @router.post("/chat")
 async def chat(req: ChatRequest, request: Request):
-    rt = request.app.state.runtime
-    t1_mem = rt.t1_memory
-    hma = rt.hma
-
-    # UserProxy – in Zukunft gerne im Runtime-Bootstrap zentral instanzieren.
-    user_proxy = getattr(rt, "user_proxy", None)
-    if user_proxy is None:
-        user_proxy = UserProxy(hma=hma, t1_memory=t1_mem, messaging=getattr(rt, "messaging", None))
-
-    # 1) Request → Envelope (Thread T1, Rolle "user")
-    msg = Message(
-        role="user",
-        text=req.prompt,
-        meta=None,
-        deliver_to=None,
-    )
-    env = Envelope(
-        thread="T1",
-        message=msg,
-        attachments=None,  # später: Dateien/Bilder aus dem Request befüllen
-    )
-
-    # 2) UserProxy verarbeitet das Envelope und delegiert an HMA
-    result = await user_proxy.handle(env)
-    return result
\ No newline at end of file
+    rt = await require_runtime(request)  # wartet ggf. auf den Bootstrap (sonst 503)
+    session_id = request.headers.get("x-session-id") or req.session_id
+    if not session_id:
+        return await _turn(rt, req)
+    sessions = getattr(rt, "sessions", None)
+    if sessions is None:
+        raise HTTPException(status_code=409, detail="session runtimes are disabled (GATEWAY_SESSIONS=0)")
+    async with sessions.lease(session_id) as session:
+        return await _turn(rt, req, session=session)
+
+
+async def _turn(rt, req: ChatRequest, *, session=None):
+    t1_mem = session.t1_memory if session is not None else rt.t1_memory
+
+    async def _run(prompt: str):
+        # HMA erst beim Start des Turns auflösen (nach Wartezeit ggf. neue Generation)
+        hma = rt.sessions.hma_for(session) if session is not None else rt.hma
+
+        # UserProxy – in Zukunft gerne im Runtime-Bootstrap zentral instanzieren.
+        user_proxy = getattr(rt, "user_proxy", None) if session is None else None
+        if user_proxy is None:
+            user_proxy = UserProxy(hma=hma, t1_memory=t1_mem, messaging=getattr(rt, "messaging", None))
+
+        # 1) Request → Envelope (Thread T1, Rolle "user")
+        msg = Message(
+            role="user",
+            text=prompt,
+            meta=None,
+            deliver_to=None,
+        )
+        env = Envelope(
+            thread="T1",
+            message=msg,
+            attachments=None,  # später: Dateien/Bilder aus dem Request befüllen
+        )
+
+        # 2) UserProxy verarbeitet das Envelope und delegiert an HMA
+        return await user_proxy.handle(env)
+
+    # Turns desselben Gesprächs (T1-Thread) nacheinander in Eingangsreihenfolge, ggf. zusammengefasst
+    turns = getattr(rt, "turns", None)
+    if turns is None:
+        return await _run(req.prompt)
+    try:
+        return await turns.submit(getattr(t1_mem, "thread_id", None) or "T1", req.prompt, _run)
+    except TurnQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "2"})
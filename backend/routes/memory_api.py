@@ -27,6 +27,9 @@ class SearchIn(BaseModel):
     min_fact_rating: Optional[float] = None
     reranker: Optional[str] = None
     center_node_uuid: Optional[str] = None
+    # Exakte Filter über den lokalen Tag-Index (z. B. ["date:02-03"] bzw. "02-03")
+    tags: Optional[List[str]] = None
+    month_day: Optional[str] = None
 
 # ──────────────────────────────────────────────────────────────────────────────
 # Utils
@@ -201,6 +204,8 @@ async def memory_search(req: Request, body: SearchIn):
         "min_fact_rating": body.min_fact_rating,
         "reranker": body.reranker,
         "center_node_uuid": body.center_node_uuid,
+        "tags": body.tags,
+        "month_day": body.month_day,
     }
     kwargs = {k: v for k, v in kwargs.items() if v is not None}
 
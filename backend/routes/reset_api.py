@@ -1,6 +1,6 @@
 # backend/routes/reset_api.py
 from fastapi import APIRouter, Request
-from backend.bootstrap import ensure_runtime
+from backend.bootstrap import ensure_runtime, record_thread_change
 from backend.reset_utils import generate_new_id
 router = APIRouter()
 
@@ -18,6 +18,8 @@ async def reset_chat(request: Request):
 
     runtime = await ensure_runtime()
     runtime.memory.start_new_chat(new_thread=new_thread)
+    if new_thread:
+        record_thread_change(runtime, "t1_root", runtime.t1_memory)
 
     return {"status": "started", "mode": "new_thread" if new_thread else "soft"}
 
@@ -41,5 +43,6 @@ async def hard_reset_chat(request: Request):
     # neue Thread-ID mit zentraler Helper-Funktion
     new_id = generate_new_id("thread_hardreset")
     runtime.memory.set_thread(new_id)
+    record_thread_change(runtime, "t1_root", runtime.t1_memory)
 
     return {"status": "restarted", "old_id": old_id, "new_id": new_id}
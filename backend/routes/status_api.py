@@ -3,6 +3,9 @@ from __future__ import annotations
 import os
 from typing import Any, Dict, List
 from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import JSONResponse
+
+from backend.routes.agent_hq import _verify_bearer
 
 # Prefix kommt aus main.py → hier nur /status
 router = APIRouter(prefix="/status", tags=["status"])
@@ -21,7 +24,9 @@ async def status_root(request: Request) -> Dict[str, Any]:
     Kompakter Status-Snapshot.
     - Keine Fallbacks: wenn Kernkomponenten fehlen → 503.
     - Nur vorhandene, V3-relevante States werden ausgewiesen.
+    - Enthält User-/Thread-IDs → Bearer (AGENTHQ_BEARER_TOKEN) erforderlich.
     """
+    _verify_bearer(request)
     st = request.app.state
     # Harte Anforderungen (sonst 503)
     if not getattr(st, "hub", None):
@@ -62,7 +67,9 @@ async def status_diag(request: Request) -> Dict[str, Any]:
     - Policy-Info + Entscheidung für ersten Sprecher (ohne den Chat auszuführen)
     - Maskierte ENV/Model-Info
     - Keine externen Aufrufe, kein Fallback
+    - Bearer (AGENTHQ_BEARER_TOKEN) erforderlich
     """
+    _verify_bearer(request)
     st = request.app.state
     hub = getattr(st, "hub", None)
     if not hub:
@@ -128,8 +135,81 @@ async def status_agents(request: Request) -> Dict[str, Any]:
     return {"ok": True, "agents": out}
 
 
+@router.get("/metrics")
+async def status_metrics() -> Dict[str, Any]:
+    """
+    Prozess-Metriken als JSON-Snapshot (ohne externe Aufrufe):
+    Zep-Resilienz (Calls/Retries/Hedges/Latenz-Perzentile, Breaker-Zustände) und Collector
+    wie Read-Cache-Statistiken.
+    """
+    from backend.metrics import metrics
+    return {"ok": True, **metrics.snapshot()}
+
+
+@router.get("/live")
+async def status_live(request: Request) -> Dict[str, Any]:
+    """
+    Liveness für Orchestrator/Load-Balancer: Prozess und Event-Loop antworten.
+    503 nur, wenn der Start endgültig fehlgeschlagen ist (Neustart sinnvoll).
+    """
+    readiness = getattr(request.app.state, "readiness", None)
+    if readiness is not None and readiness.failed:
+        raise HTTPException(status_code=503, detail=f"startup failed: {readiness.error}")
+    return {"ok": True, "state": readiness.state if readiness is not None else "unknown"}
+
+
+@router.get("/ready")
+async def status_ready(request: Request) -> JSONResponse:
+    """
+    Readiness: 200 erst nach Bootstrap + Warm-up (Traffic erst dann zuleiten), sonst 503.
+    Body enthält Zustand, Uptime und die Dauer der Warm-up-Schritte.
+    """
+    readiness = getattr(request.app.state, "readiness", None)
+    if readiness is None:
+        return JSONResponse({"ok": False, "state": "unknown"}, status_code=503)
+    snap = readiness.snapshot()
+    return JSONResponse({"ok": readiness.is_ready, **snap}, status_code=200 if readiness.is_ready else 503,
+                        headers=None if readiness.is_ready else {"Retry-After": "2"})
+
+
+@router.get("/startup")
+async def status_startup(request: Request) -> Dict[str, Any]:
+    """
+    Startzeit-Report: Import-Dauer von backend.main, Lifespan bis „ready“, Bootstrap-Phasen
+    (zep_client_cache/threads/tools/memory_wiring/agents_hma), eigene Dauer des Tool-Setups sowie
+    welche Demo-Agenten und Thread-Scopes schon gebaut/angelegt sind (lazy).
+    """
+    st = request.app.state
+    runtime = getattr(st, "runtime", None)
+    if runtime is None:
+        raise HTTPException(status_code=503, detail="runtime not initialized")
+    from backend.bootstrap import startup_report
+    return {"ok": True, **(getattr(st, "startup", None) or {}), **startup_report(runtime)}
+
+
+@router.get("/threads")
+async def status_threads(request: Request) -> Dict[str, Any]:
+    """Thread-Register (aktive/verwaiste Thread-IDs mit letzter Nutzung) und letzter Thread-GC-Report (Bearer)."""
+    _verify_bearer(request)  # listet alle User-/Thread-IDs
+    runtime = getattr(request.app.state, "runtime", None)
+    if runtime is None:
+        raise HTTPException(status_code=503, detail="runtime not initialized")
+    registry = getattr(runtime, "thread_registry", None)
+    if registry is None:
+        return {"ok": True, "enabled": False}
+    thread_gc = getattr(runtime, "thread_gc", None)
+    return {
+        "ok": True,
+        "enabled": True,
+        "stats": registry.stats(),
+        "threads": registry.snapshot(),
+        "gc": {"enabled": thread_gc is not None, "last_report": getattr(thread_gc, "last_report", None)},
+    }
+
+
 @router.get("/diag/env")
-def diag_env():
+def diag_env(request: Request):
+    _verify_bearer(request)  # Key-Fingerprint, Projekt-/Org-IDs
     key = os.getenv("OPENAI_API_KEY", "")
     fp  = f"{key[:6]}…{key[-4:]}" if key else "<empty>"
     return {
@@ -141,6 +221,7 @@ def diag_env():
 
 @router.get("/diag/runtime")
 def diag_runtime(request: Request):
+    _verify_bearer(request)
     st = request.app.state
     return {
         "user_id": getattr(st, "user_id", None),
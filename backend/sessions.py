@@ -0,0 +1,260 @@
+# backend/sessions.py
+"""
+Session-Runtimes: eigene T1..T6-Memories pro User/Session über der geteilten Runtime.
+
+Eine Session (Schlüssel aus Header X-Session-Id bzw. session_id im /chat-Body) bekommt
+- einen eigenen Zep-User und T1..T6 als lazy Thread-Handles (angelegt erst beim ersten Write),
+  mit deterministischen IDs aus dem Session-Schlüssel → nach Eviction oder Neustart (auch in
+  anderen Workern) landet dieselbe Session wieder in denselben Threads; der erste Lesezugriff
+  prüft per thread.get, ob sie schon existieren, und liefert dann deren Historie,
+- einen eigenen MemoryManager (ctx_provider) und eine leichte HMA-Instanz.
+Geteilt bleiben Zep-Client, Read-Cache, Outbox, Graph-API/Tools, Profil-Fakten-View und die
+Agenten (Demos, Ich-Agent) – eine weitere Session kostet nur ein paar Objekte.
+
+Der SessionPool hält die Sessions in LRU-Reihenfolge (GATEWAY_SESSION_MAX), verwirft Sessions
+nach GATEWAY_SESSION_IDLE_S ohne Nutzung und optional oberhalb eines Speicher-Budgets
+(GATEWAY_SESSION_MAX_MB, geschätzte Bytes je Session inkl. lokal gecachter Historie).
+Sessions mit laufendem Turn (lease) werden nie verworfen.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import sys
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from loguru import logger
+
+from .metrics import metrics
+from .zep_pool import note_thread_owner
+
+__all__ = ["SessionPool", "session_key"]
+
+_LABELS = ("t1_root", "t2_user_visible", "t3_meta_proto", "t4_lib_internal", "t5_task_internal", "t6_trn_internal")
+
+
+def session_key(raw: str) -> str:
+    """Stabiler, Zep-tauglicher Schlüssel (Hash) aus beliebiger Session-/User-Kennung."""
+    return hashlib.sha256(raw.strip().encode("utf-8")).hexdigest()[:16]
+
+
+def _deep_sizeof(obj: Any, shared: set[int], seen: set[int], depth: int = 0) -> int:
+    """Grobe Größe der session-eigenen Objekte (geteilte Objekte zählen nicht)."""
+    oid = id(obj)
+    if oid in seen or oid in shared or depth > 6:
+        return 0
+    seen.add(oid)
+    size = sys.getsizeof(obj, 64)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, shared, seen, depth + 1) + _deep_sizeof(v, shared, seen, depth + 1)
+                    for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(v, shared, seen, depth + 1) for v in obj)
+    elif hasattr(obj, "__dict__"):
+        size += _deep_sizeof(vars(obj), shared, seen, depth + 1)
+    return size
+
+
+class SessionPool:
+    """LRU-Pool der Session-Runtimes (siehe Moduldoku)."""
+
+    def __init__(
+        self,
+        runtime: SimpleNamespace,
+        *,
+        max_sessions: int = 256,
+        idle_ttl_s: float = 1800.0,
+        max_bytes: int = 0,
+    ) -> None:
+        self._rt = runtime
+        self._max_sessions = max(1, int(max_sessions))
+        self._idle_ttl = float(idle_ttl_s)
+        self._max_bytes = max(0, int(max_bytes))
+        self._sessions: "OrderedDict[str, SimpleNamespace]" = OrderedDict()
+        self._users: Dict[str, "asyncio.Future[None]"] = {}
+        self._task: Optional[asyncio.Task[None]] = None
+        self._stats: Dict[str, int] = {"created": 0, "hits": 0, "evicted_lru": 0, "evicted_idle": 0, "evicted_bytes": 0}
+
+    @classmethod
+    def from_env(cls, runtime: SimpleNamespace) -> Optional["SessionPool"]:
+        """GATEWAY_SESSIONS=0 deaktiviert Session-Runtimes (alle Requests nutzen die Basis-Runtime)."""
+        if os.getenv("GATEWAY_SESSIONS", "1") != "1":
+            return None
+        return cls(
+            runtime,
+            max_sessions=int(os.getenv("GATEWAY_SESSION_MAX", "256")),
+            idle_ttl_s=float(os.getenv("GATEWAY_SESSION_IDLE_S", "1800")),
+            max_bytes=int(float(os.getenv("GATEWAY_SESSION_MAX_MB", "0")) * 1024 * 1024),
+        )
+
+    # ---- Aufbau ----------------------------------------------------------------
+    def _build(self, key: str, raw: str) -> SimpleNamespace:
+        from .bootstrap import _LazyThreadMemory
+        from .memory.manager import MemoryManager
+
+        rt = self._rt
+        user_id = f"user_s_{key}"
+        session = SimpleNamespace(key=key, label=raw[:64], user_id=user_id, created_at=time.time(),
+                                  last_used=time.monotonic(), active=0, hma=None, generation=None)
+        for i, label in enumerate(_LABELS, start=1):
+            scope = SimpleNamespace(label=label, user_id=user_id, thread_id=f"thread_{label}_s_{key}",
+                                    stale_thread_id=None, first_name=f"Session {key[:6]}", last_name=label.upper())
+            note_thread_owner(rt.zep_client, scope.thread_id, user_id)
+            mem = _LazyThreadMemory(rt.zep_client, scope, self._users, probe=True)  # wiederkehrende Session: sofort lesbar
+            mem.set_api(rt.get_api)
+            mem.set_read_cache(rt.read_cache)
+            if getattr(rt, "profile_view", None) is not None:
+                mem.set_profile_view(rt.profile_view)
+            if getattr(rt, "outbox", None) is not None:
+                mem.set_outbox(rt.outbox)
+            coordinator = getattr(rt, "coordinator", None)
+            if coordinator is not None:
+                mem.add_write_listener(lambda tid: coordinator.bump_soon(f"thread:{tid}"))
+            setattr(session, f"t{i}_memory", mem)
+            setattr(session, f"t{i}_thread_id", scope.thread_id)
+        session.memory = MemoryManager(session.t1_memory, get_api=rt.get_api)
+        session.ctx_provider = session.memory
+        session.messaging = rt.messaging
+        shared = {id(v) for v in vars(rt).values()} | {id(rt), id(self._users)}
+        session.approx_bytes = _deep_sizeof(session, shared, set())
+        return session
+
+    def hma_for(self, session: SimpleNamespace) -> Any:
+        """Leichte HMA je Session über den aktuellen (ggf. neu gebauten) Agenten der Runtime (beim Turn-Start aufrufen)."""
+        rt = self._rt
+        generation = getattr(rt, "generation", 1)
+        if session.hma is None or session.generation != generation:
+            from .agent_core.hma.hma import HMA
+
+            cfg = rt.hma_config
+            session.hma = HMA(
+                som_system_prompt=cfg.som_system_prompt,
+                templates=cfg,
+                demos=rt.demo_registry,
+                messaging=rt.messaging,
+                llm=rt.llm_client,
+                ctx_provider=session.ctx_provider,
+                runtime=session,
+            )
+            session.generation = generation
+        return session.hma
+
+    # ---- Zugriff ---------------------------------------------------------------
+    def get(self, raw: str) -> SimpleNamespace:
+        """Session zu einer Kennung holen bzw. anlegen (ohne I/O; Threads entstehen beim ersten Write, der erste Read prüft sie)."""
+        key = session_key(raw)
+        session = self._sessions.get(key)
+        if session is None:
+            session = self._build(key, raw)
+            self._sessions[key] = session
+            self._stats["created"] += 1
+            metrics.inc("sessions.created")
+            logger.debug(f"👤 [Sessions] Neue Session {key} ({len(self._sessions)} aktiv)")
+            self._evict_over_budget(keep=key)  # nie die gerade angeforderte Session
+        else:
+            self._sessions.move_to_end(key)
+            self._stats["hits"] += 1
+        session.last_used = time.monotonic()
+        self.hma_for(session)
+        return session
+
+    @asynccontextmanager
+    async def lease(self, raw: str) -> AsyncIterator[SimpleNamespace]:
+        """Session für die Dauer eines Turns festhalten (wird währenddessen nicht verworfen)."""
+        session = self.get(raw)
+        session.active += 1
+        try:
+            yield session
+        finally:
+            session.active -= 1
+            session.last_used = time.monotonic()
+
+    def memories(self) -> Iterator[Any]:
+        for session in list(self._sessions.values()):
+            for i in range(1, 7):
+                yield getattr(session, f"t{i}_memory")
+
+    # ---- Eviction --------------------------------------------------------------
+    def _cached_bytes(self, session: SimpleNamespace) -> int:
+        cache = getattr(self._rt, "read_cache", None)
+        if cache is None:
+            return 0
+        from .memory.memory import ZepThreadMemory
+
+        total = 0
+        for i in range(1, 7):
+            messages = cache.local_value(ZepThreadMemory._MESSAGES_NS, getattr(session, f"t{i}_thread_id"))
+            total += sum(len(str(m.get("content") or "")) for m in messages or [])
+        return total
+
+    def _session_bytes(self, session: SimpleNamespace) -> int:
+        return session.approx_bytes + self._cached_bytes(session)
+
+    def _evict(self, key: str, reason: str) -> None:
+        session = self._sessions.pop(key, None)
+        if session is None:
+            return
+        for i in range(1, 7):
+            # lokale Historie freigeben; die Disk-Stufe behält sie für ein schnelles Wiederaufleben
+            getattr(session, f"t{i}_memory").invalidate_cache(local_only=True)
+        self._users.pop(session.user_id, None)
+        self._stats[f"evicted_{reason}"] += 1
+        metrics.inc("sessions.evicted", reason=reason)
+        logger.debug(f"👤 [Sessions] Session {key} verworfen ({reason})")
+
+    def _evict_over_budget(self, keep: Optional[str] = None) -> None:
+        idle = [k for k, s in self._sessions.items() if s.active == 0 and k != keep]  # älteste zuerst
+        while len(self._sessions) > self._max_sessions and idle:
+            self._evict(idle.pop(0), "lru")
+        if self._max_bytes:
+            total = sum(self._session_bytes(s) for s in self._sessions.values())
+            while total > self._max_bytes and idle:
+                key = idle.pop(0)
+                total -= self._session_bytes(self._sessions[key])
+                self._evict(key, "bytes")
+
+    def sweep(self) -> int:
+        """Sessions ohne Nutzung seit idle_ttl_s verwerfen; Rückgabe: Anzahl."""
+        cutoff = time.monotonic() - self._idle_ttl
+        expired = [k for k, s in self._sessions.items() if s.active == 0 and s.last_used < cutoff]
+        for key in expired:
+            self._evict(key, "idle")
+        self._evict_over_budget()
+        return len(expired)
+
+    def start(self) -> None:
+        if self._task is not None or self._idle_ttl <= 0:
+            return
+        self._task = asyncio.create_task(self._run(), name="session-sweeper")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        interval = max(1.0, min(60.0, self._idle_ttl / 4.0))
+        while True:
+            await asyncio.sleep(interval)
+            self.sweep()
+
+    def stats(self) -> Dict[str, Any]:
+        sessions: List[SimpleNamespace] = list(self._sessions.values())
+        return {
+            "sessions": len(sessions),
+            "active": sum(1 for s in sessions if s.active),
+            "approx_bytes": sum(self._session_bytes(s) for s in sessions),
+            "max_sessions": self._max_sessions,
+            "max_bytes": self._max_bytes,
+            **self._stats,
+        }
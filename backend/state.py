@@ -0,0 +1,341 @@
+# backend/state.py
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+try:  # POSIX; unter Windows ohne prozessübergreifenden Lock (ein Worker)
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+__all__ = ["state_dir", "state_path", "file_lock", "BootstrapState", "ThreadRegistry"]
+
+logger = logging.getLogger(__name__)
+
+
+def state_dir() -> Path:
+    """
+    Lokales Zustandsverzeichnis des Backends (Caches, Outbox, Bootstrap-State).
+    Default: ./.gateway_state (im Container /app/.gateway_state), per GATEWAY_STATE_DIR überschreibbar.
+    """
+    p = Path(os.getenv("GATEWAY_STATE_DIR", ".gateway_state")).expanduser()
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+def state_path(name: str) -> Path:
+    """Pfad einer Datei im Zustandsverzeichnis (Verzeichnis wird bei Bedarf angelegt)."""
+    return state_dir() / name
+
+
+def _zep_fingerprint() -> str:
+    """Hash aus Zep-Base-URL(s) und API-Key(s): bindet lokale Zustände an ein Zep-Projekt."""
+    raw = "|".join((os.getenv("ZEP_BASE_URL", ""), os.getenv("ZEP_BASE_URLS", ""),
+                    os.getenv("ZEP_API_KEY", ""), os.getenv("ZEP_API_KEYS", "")))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """
+    Prozessübergreifender, exklusiver Lock auf <path>.lock (fcntl.flock). Mehrere Uvicorn-Worker
+    eines Knotens serialisieren damit Read-Modify-Write-Zyklen auf gemeinsamen Zustandsdateien.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(path.with_name(path.name + ".lock"), "a+") as fh:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def _read_json(path: Path | None, version: int, fingerprint: str) -> Optional[Dict[str, Any]]:
+    """Gespeicherten Zustand lesen; None, wenn nicht vorhanden, unlesbar oder fremdes Zep-Projekt."""
+    if path is None or not path.exists():
+        return None
+    try:
+        loaded = json.loads(path.read_text(encoding="utf-8"))
+    except Exception as e:
+        logger.warning(f"state file unreadable ({path}): {e}")
+        return None
+    if loaded.get("version") != version or loaded.get("fingerprint") != fingerprint:
+        return None
+    return loaded
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, indent=1), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class BootstrapState:
+    """
+    Persistierter Bootstrap-Zustand (JSON im State-Verzeichnis): aufgelöste User-IDs, Thread-IDs
+    je Scope-Label und angelegte Graphen. Beim Warmstart übernimmt der Bootstrap die Thread-IDs
+    und überspringt die bereits bestätigten Remote-Creates.
+
+    Der Fingerprint (Hash aus Zep-Base-URL und API-Key) bindet den Zustand an ein Zep-Projekt;
+    bei Abweichung wird mit leerem Zustand begonnen. Schreibzugriffe lesen die Datei unter
+    file_lock neu ein (mehrere Worker teilen sich den Zustand, ohne Einträge zu überschreiben).
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path | None, fingerprint: str = "") -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self.fingerprint = fingerprint
+        self._data: Dict[str, Any] = {"version": self.VERSION, "fingerprint": fingerprint,
+                                      "users": {}, "threads": {}, "graphs": {}}
+        if not self._load() and path is not None and path.exists():
+            logger.info(f"bootstrap state {path} belongs to another Zep target – starting fresh")
+
+    def _load(self) -> bool:
+        loaded = _read_json(self._path, self.VERSION, self.fingerprint)
+        if loaded is None:
+            return False
+        for key in ("users", "threads", "graphs"):
+            self._data[key] = dict(loaded.get(key) or {})
+        return True
+
+    def reload(self) -> None:
+        """Stand anderer Worker übernehmen (z. B. im Bootstrap-Lock vor dem Auflösen der Threads)."""
+        with self._lock:
+            self._load()
+
+    @classmethod
+    def from_env(cls) -> "BootstrapState | None":
+        """GATEWAY_BOOTSTRAP_STATE=0 deaktiviert; Pfad per GATEWAY_BOOTSTRAP_STATE_PATH."""
+        if os.getenv("GATEWAY_BOOTSTRAP_STATE", "1") != "1":
+            return None
+        path = os.getenv("GATEWAY_BOOTSTRAP_STATE_PATH") or state_path("bootstrap_state.json")
+        return cls(Path(path), _zep_fingerprint())
+
+    # ---- Lesen -----------------------------------------------------------------
+    def thread(self, label: str) -> Optional[Dict[str, Any]]:
+        return self._data["threads"].get(label)
+
+    def has_user(self, user_id: str) -> bool:
+        return user_id in self._data["users"]
+
+    def has_thread(self, label: str, thread_id: str) -> bool:
+        t = self._data["threads"].get(label)
+        return bool(t and t.get("thread_id") == thread_id and t.get("created"))
+
+    def has_graph(self, graph_id: str) -> bool:
+        return graph_id in self._data["graphs"]
+
+    # ---- Schreiben (jeweils atomar persistiert) --------------------------------
+    def record_user(self, user_id: str) -> None:
+        self._update("users", user_id, {"verified_at": time.time()})
+
+    def record_thread(self, label: str, thread_id: str, user_id: str, *, created: bool = True) -> None:
+        self._update("threads", label, {"thread_id": thread_id, "user_id": user_id,
+                                        "created": created, "verified_at": time.time()})
+
+    def record_graph(self, graph_id: str) -> None:
+        self._update("graphs", graph_id, {"verified_at": time.time()})
+
+    def forget(self, section: str, key: str) -> None:
+        with self._shared():
+            if self._data[section].pop(key, None) is not None:
+                self._save()
+
+    def _update(self, section: str, key: str, value: Dict[str, Any]) -> None:
+        with self._shared():
+            self._data[section][key] = value
+            self._save()
+
+    @contextmanager
+    def _shared(self) -> Iterator[None]:
+        """Read-Modify-Write unter Prozess- und Datei-Lock."""
+        with self._lock:
+            if self._path is None:
+                yield
+                return
+            with file_lock(self._path):
+                self._load()
+                yield
+
+    def _save(self) -> None:
+        if self._path is None:
+            return
+        try:
+            _write_json_atomic(self._path, self._data)
+        except OSError as e:
+            logger.warning(f"bootstrap state not saved ({self._path}): {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return json.loads(json.dumps(self._data))
+
+
+class ThreadRegistry:
+    """
+    Register der von diesem Backend angelegten Zep-Threads (JSON im State-Verzeichnis).
+
+    Je Thread-ID: User, Scope-Label, created_at, last_used und – sobald der Scope eine neue
+    Thread-ID bekommt (Bootstrap ohne feste ID, GATEWAY_THREAD_RESET, /reset) – abandoned_at.
+    Verwaiste Threads räumt der ThreadCollector (backend/memory/thread_gc.py) nach Ablauf der
+    Retention ab. touch() läuft pro Write und merkt sich last_used nur im Speicher; start()
+    persistiert im Hintergrund-Thread alle flush_interval_s. Jede Persistierung liest die Datei
+    unter file_lock neu ein und führt last_used zusammen.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path | None, fingerprint: str = "", *, flush_interval_s: float = 30.0) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._flush_interval = float(flush_interval_s)
+        self._touched: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task[None]] = None
+        self.fingerprint = fingerprint
+        self._threads: Dict[str, Dict[str, Any]] = {}
+        if not self._load() and path is not None and path.exists():
+            logger.info(f"thread registry {path} belongs to another Zep target – starting fresh")
+
+    @classmethod
+    def from_env(cls) -> "ThreadRegistry | None":
+        """GATEWAY_THREAD_REGISTRY=0 deaktiviert; Pfad per GATEWAY_THREAD_REGISTRY_PATH."""
+        if os.getenv("GATEWAY_THREAD_REGISTRY", "1") != "1":
+            return None
+        path = os.getenv("GATEWAY_THREAD_REGISTRY_PATH") or state_path("thread_registry.json")
+        return cls(Path(path), _zep_fingerprint(),
+                   flush_interval_s=float(os.getenv("GATEWAY_THREAD_REGISTRY_FLUSH_S", "30")))
+
+    def _load(self) -> bool:
+        loaded = _read_json(self._path, self.VERSION, self.fingerprint)
+        if loaded is None:
+            return False
+        self._threads = dict(loaded.get("threads") or {})
+        return True
+
+    @contextmanager
+    def _shared(self) -> Iterator[None]:
+        """Read-Modify-Write unter Prozess- und Datei-Lock; lokale touch()-Zeitstempel werden eingemischt."""
+        with self._lock:
+            touched, self._touched = self._touched, {}  # touch() läuft parallel im Event-Loop weiter
+            if self._path is None:
+                yield
+            else:
+                with file_lock(self._path):
+                    self._load()
+                    for tid, ts in touched.items():
+                        entry = self._threads.get(tid)
+                        if entry is not None and ts > float(entry.get("last_used") or 0.0):
+                            entry["last_used"] = ts
+                    yield
+
+    # ---- Schreiben -------------------------------------------------------------
+    def activate(self, label: str, thread_id: str, user_id: str) -> None:
+        """thread_id ist ab jetzt der aktive Thread des Scopes; bisherige Threads des Labels gelten als verwaist."""
+        now = time.time()
+        with self._shared():
+            changed = bool(self._touched)
+            for tid, entry in self._threads.items():
+                if tid != thread_id and entry.get("label") == label and entry.get("abandoned_at") is None:
+                    entry["abandoned_at"] = now
+                    changed = True
+            entry = self._threads.get(thread_id)
+            if entry is None:
+                self._threads[thread_id] = {"user_id": user_id, "label": label, "created_at": now,
+                                            "last_used": now, "abandoned_at": None}
+                changed = True
+            elif (entry.get("label"), entry.get("user_id"), entry.get("abandoned_at")) != (label, user_id, None):
+                entry.update(label=label, user_id=user_id, abandoned_at=None)
+                changed = True
+            if changed:
+                self._save()
+
+    def touch(self, thread_id: Optional[str]) -> None:
+        """Pro Write: nur im Speicher (ohne Lock/I/O); persistiert wird über start() bzw. flush()."""
+        entry = self._threads.get(thread_id or "")
+        if entry is None:
+            return
+        now = time.time()
+        entry["last_used"] = now
+        self._touched[str(thread_id)] = now
+
+    def forget(self, thread_id: str) -> None:
+        with self._shared():
+            if self._threads.pop(thread_id, None) is not None:
+                self._save()
+
+    def flush(self) -> None:
+        if not self._touched:
+            return
+        with self._shared():
+            self._save()
+
+    # ---- Hintergrund-Persistierung ---------------------------------------------
+    def start(self) -> None:
+        if self._task is not None or self._path is None or self._flush_interval <= 0:
+            return
+        self._task = asyncio.create_task(self._run(), name="thread-registry-flush")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self.flush)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                logger.warning(f"thread registry flush failed: {e}")
+
+    def _save(self) -> None:
+        if self._path is None:
+            return
+        try:
+            _write_json_atomic(self._path, {"version": self.VERSION, "fingerprint": self.fingerprint,
+                                            "threads": self._threads})
+        except OSError as e:
+            logger.warning(f"thread registry not saved ({self._path}): {e}")
+
+    # ---- Lesen -----------------------------------------------------------------
+    def __contains__(self, thread_id: object) -> bool:
+        return thread_id in self._threads
+
+    def abandoned(self, retention_s: float, *, now: Optional[float] = None) -> list[tuple[str, Dict[str, Any]]]:
+        """Verwaiste Threads, deren letzte Nutzung/Aufgabe länger als retention_s zurückliegt (älteste zuerst)."""
+        now = time.time() if now is None else now
+        self.flush()
+        with self._lock:
+            self._load()  # Änderungen anderer Worker (z. B. /reset) berücksichtigen
+            due = [
+                (tid, dict(e)) for tid, e in self._threads.items()
+                if e.get("abandoned_at") is not None
+                and now - max(float(e["abandoned_at"]), float(e.get("last_used") or 0.0)) >= retention_s
+            ]
+        return sorted(due, key=lambda item: item[1]["abandoned_at"])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            abandoned = sum(1 for e in self._threads.values() if e.get("abandoned_at") is not None)
+            return {"threads": len(self._threads), "active": len(self._threads) - abandoned, "abandoned": abandoned}
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return json.loads(json.dumps(self._threads))
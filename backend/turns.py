@@ -0,0 +1,175 @@
+# backend/turns.py
+"""
+Geordnete Ausführung von /chat-Turns pro Gesprächs-Thread.
+
+Turns mit demselben Schlüssel (T1-Thread-ID der Basis- bzw. Session-Runtime) laufen strikt
+nacheinander in Eingangsreihenfolge – jeder Turn sieht den Kontext inkl. der Writes des
+vorherigen; verschiedene Threads laufen weiterhin parallel. Pro Thread gibt es eine Lane
+(Warteschlange + Worker-Task), die nach dem letzten Turn wieder verschwindet.
+
+Optionales Coalescing (GATEWAY_TURN_COALESCE_MS > 0): Prompts, die kurz nacheinander eintreffen
+(Abstand ≤ Fenster) bzw. sich hinter einem laufenden Turn stauen (alle bis zu dessen Ende
+eingetroffenen), werden zu einem Turn zusammengefasst (GATEWAY_TURN_COALESCE_MAX Prompts); alle beteiligten Requests erhalten dessen
+Ergebnis (mit coalesced=<Anzahl>). Pro Thread warten höchstens GATEWAY_TURN_QUEUE_MAX Turns,
+darüber hinaus TurnQueueFull (→ 429).
+
+Die Reihenfolge gilt pro Prozess; mehrere Uvicorn-Worker ordnen nur ihre eigenen Requests.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from loguru import logger
+
+from .metrics import metrics
+
+__all__ = ["TurnSequencer", "TurnQueueFull"]
+
+RunTurn = Callable[[str], Awaitable[Any]]
+
+
+class TurnQueueFull(RuntimeError):
+    """Zu viele wartende Turns für denselben Thread."""
+
+
+@dataclass
+class _Pending:
+    prompt: str
+    run: RunTurn
+    future: "asyncio.Future[Any]"
+    context: contextvars.Context = field(default_factory=contextvars.copy_context)  # corr_id des Requests
+    arrived: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _Lane:
+    items: Deque[_Pending] = field(default_factory=deque)
+    task: Optional["asyncio.Task[None]"] = None
+    running: bool = False
+    finished_at: float = 0.0  # Ende des letzten Turns (monotonic)
+
+
+class TurnSequencer:
+    """Pro-Thread-Warteschlangen für Turns (siehe Moduldoku)."""
+
+    def __init__(self, *, coalesce_window_s: float = 0.0, coalesce_max: int = 8, max_queue: int = 16) -> None:
+        self._window = max(0.0, float(coalesce_window_s))
+        self._coalesce_max = max(1, int(coalesce_max))
+        self._max_queue = max(1, int(max_queue))
+        self._lanes: Dict[str, _Lane] = {}
+        self._stats: Dict[str, int] = {"turns": 0, "requests": 0, "coalesced": 0, "rejected": 0, "max_depth": 0}
+
+    @classmethod
+    def from_env(cls) -> "TurnSequencer":
+        return cls(
+            coalesce_window_s=float(os.getenv("GATEWAY_TURN_COALESCE_MS", "0")) / 1000.0,
+            coalesce_max=int(os.getenv("GATEWAY_TURN_COALESCE_MAX", "8")),
+            max_queue=int(os.getenv("GATEWAY_TURN_QUEUE_MAX", "16")),
+        )
+
+    async def submit(self, key: str, prompt: str, run: RunTurn) -> Any:
+        """
+        Turn für Thread `key` einreihen und auf sein Ergebnis warten. run(prompt) führt den
+        eigentlichen Turn aus (ggf. mit zusammengefasstem Prompt). Bricht der Client ab,
+        solange der Turn noch wartet, entfällt er; ein laufender Turn wird zu Ende geführt.
+        """
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = _Lane()
+        waiting = sum(1 for item in lane.items if not item.future.done())
+        if waiting >= self._max_queue:
+            self._stats["rejected"] += 1
+            metrics.inc("turns.rejected")
+            raise TurnQueueFull(f"{waiting} turns already queued for {key}")
+        item = _Pending(prompt, run, asyncio.get_running_loop().create_future())
+        lane.items.append(item)
+        self._stats["requests"] += 1
+        depth = len(lane.items) + (1 if lane.running else 0)
+        self._stats["max_depth"] = max(self._stats["max_depth"], depth)
+        if depth > 1:
+            logger.debug(f"🧵 [Turns] {key}: Turn wartet auf {depth - 1} vorherige(n)")
+        if lane.task is None:
+            lane.task = asyncio.create_task(self._drain(key, lane), name=f"turns:{key}")
+        return await item.future
+
+    def _take(self, lane: _Lane) -> List[_Pending]:
+        """Nächsten Turn entnehmen, bei Coalescing samt direkt nachfolgender bzw. hinter dem letzten Turn gestauter Prompts."""
+        batch: List[_Pending] = []
+        while lane.items and len(batch) < self._coalesce_max:
+            nxt = lane.items[0]
+            if nxt.future.done():  # Client hat abgebrochen
+                lane.items.popleft()
+                continue
+            if batch and nxt.arrived > lane.finished_at and nxt.arrived - batch[-1].arrived > self._window:
+                break
+            batch.append(lane.items.popleft())
+            if self._window <= 0:
+                break
+        return batch
+
+    async def _drain(self, key: str, lane: _Lane) -> None:
+        try:
+            while lane.items:
+                if self._window > 0:
+                    # kurz auf Folge-Prompts warten (Fenster ab Eingang des ersten)
+                    delay = lane.items[0].arrived + self._window - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                batch = self._take(lane)
+                if not batch:
+                    continue
+                await self._run(key, lane, batch)
+        finally:
+            lane.task = None
+            if self._lanes.get(key) is lane:
+                if lane.items:  # nur bei Abbruch von außen
+                    for item in lane.items:
+                        if not item.future.done():
+                            item.future.cancel()
+                del self._lanes[key]
+
+    async def _run(self, key: str, lane: _Lane, batch: List[_Pending]) -> None:
+        prompt = batch[0].prompt if len(batch) == 1 else "\n\n".join(p.prompt for p in batch)
+        metrics.observe("turns.queue_wait_ms", (time.monotonic() - batch[0].arrived) * 1000.0)
+        if len(batch) > 1:
+            self._stats["coalesced"] += len(batch) - 1
+            metrics.inc("turns.coalesced", len(batch) - 1)
+            logger.info(f"🧵 [Turns] {key}: {len(batch)} Prompts zu einem Turn zusammengefasst")
+        lane.running = True
+        try:
+            result = await asyncio.create_task(batch[0].run(prompt), context=batch[0].context)
+        except BaseException as e:
+            for item in batch:
+                if item.future.done():
+                    continue
+                if isinstance(e, Exception):
+                    item.future.set_exception(e)
+                else:
+                    item.future.cancel()
+            if not isinstance(e, Exception):
+                raise
+            return
+        finally:
+            lane.running = False
+            lane.finished_at = time.monotonic()
+            self._stats["turns"] += 1
+        if len(batch) > 1 and isinstance(result, dict):
+            result = {**result, "coalesced": len(batch)}
+        for item in batch:
+            if not item.future.done():
+                item.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "lanes": len(self._lanes),
+            "queued": sum(len(lane.items) for lane in self._lanes.values()),
+            "running": sum(1 for lane in self._lanes.values() if lane.running),
+            "coalesce_window_ms": round(self._window * 1000.0, 1),
+            **self._stats,
+        }
@@ -0,0 +1,202 @@
+# backend/zep_client.py
+from __future__ import annotations
+
+import importlib.util
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import httpx
+from zep_cloud.client import AsyncZep
+
+from .metrics import metrics
+
+__all__ = ["ZepHttpSettings", "InstrumentedTransport", "build_http_client", "build_zep_client", "build_zep_from_env"]
+
+
+def _flag(name: str, default: str) -> str:
+    return os.getenv(name, default).strip().lower()
+
+
+@dataclass
+class ZepHttpSettings:
+    """Transport-Einstellungen des geteilten httpx.AsyncClient für Zep (alle per ENV einstellbar)."""
+    max_connections: int = 100
+    max_keepalive: int = 20
+    keepalive_expiry_s: float = 30.0
+    http2: bool = False
+    connect_timeout_s: float = 5.0
+    read_timeout_s: float = 30.0
+    write_timeout_s: float = 30.0
+    pool_timeout_s: float = 5.0
+
+    @classmethod
+    def from_env(cls) -> "ZepHttpSettings":
+        # HTTP/2 nur, wenn das optionale h2-Paket vorhanden ist ("auto") oder explizit gewünscht
+        h2_available = importlib.util.find_spec("h2") is not None
+        mode = _flag("GATEWAY_ZEP_HTTP2", "auto")
+        http2 = h2_available if mode == "auto" else (mode in ("1", "true", "yes") and h2_available)
+        return cls(
+            max_connections=int(os.getenv("GATEWAY_ZEP_MAX_CONNECTIONS", "100")),
+            max_keepalive=int(os.getenv("GATEWAY_ZEP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry_s=float(os.getenv("GATEWAY_ZEP_KEEPALIVE_EXPIRY_S", "30")),
+            http2=http2,
+            connect_timeout_s=float(os.getenv("GATEWAY_ZEP_CONNECT_TIMEOUT_S", "5")),
+            read_timeout_s=float(os.getenv("GATEWAY_ZEP_READ_TIMEOUT_S", "30")),
+            write_timeout_s=float(os.getenv("GATEWAY_ZEP_WRITE_TIMEOUT_S", "30")),
+            pool_timeout_s=float(os.getenv("GATEWAY_ZEP_POOL_TIMEOUT_S", "5")),
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """
+    AsyncHTTPTransport mit Pool-Metriken:
+    - in_flight / peak_in_flight / Auslastung relativ zu max_connections,
+    - zep.http.pool_wait_ms: Zeit vom Request-Start bis zum Senden der Header
+      (Warten auf eine freie Verbindung inkl. ggf. Verbindungsaufbau),
+    - zep.http.connects: neu aufgebaute TCP-Verbindungen (Keep-Alive-Misses),
+    - zep.http.request_ms: Gesamtdauer bis zu den Response-Headern.
+    Messpunkte über die httpcore-Trace-Extension (keine privaten Pool-Interna).
+    """
+
+    def __init__(self, settings: ZepHttpSettings, **kwargs: Any) -> None:
+        self._settings = settings
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        super().__init__(
+            limits=httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_keepalive,
+                keepalive_expiry=settings.keepalive_expiry_s,
+            ),
+            http2=settings.http2,
+            **kwargs,
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        waited = False
+
+        async def trace(event: str, info: Dict[str, Any]) -> None:
+            nonlocal waited
+            if event == "connection.connect_tcp.started":
+                metrics.inc("zep.http.connects")
+            elif event.endswith("send_request_headers.started") and not waited:
+                waited = True
+                metrics.observe("zep.http.pool_wait_ms", (time.perf_counter() - started) * 1000.0)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await super().handle_async_request(request)
+        except httpx.PoolTimeout:
+            metrics.inc("zep.http.pool_timeouts")
+            raise
+        finally:
+            self.in_flight -= 1
+            metrics.observe("zep.http.request_ms", (time.perf_counter() - started) * 1000.0)
+
+    def stats(self) -> Dict[str, Any]:
+        limit = max(1, self._settings.max_connections)
+        return {
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            # > 1.0 bzw. queued > 0: Requests warten auf eine freie Pool-Verbindung
+            "utilization": round(self.in_flight / limit, 3),
+            "queued": max(0, self.in_flight - self._settings.max_connections),
+            "max_connections": self._settings.max_connections,
+            "max_keepalive": self._settings.max_keepalive,
+            "http2": self._settings.http2,
+        }
+
+
+def build_http_client(settings: ZepHttpSettings | None = None) -> httpx.AsyncClient:
+    """Geteilter httpx.AsyncClient (Pool-Limits, Keep-Alive, HTTP/2 falls verfügbar, Timeouts)."""
+    settings = settings or ZepHttpSettings.from_env()
+    transport = InstrumentedTransport(settings)
+    http_client = httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(
+            connect=settings.connect_timeout_s,
+            read=settings.read_timeout_s,
+            write=settings.write_timeout_s,
+            pool=settings.pool_timeout_s,
+        ),
+        follow_redirects=True,
+    )
+    metrics.register_collector("zep_http_pool", transport.stats)
+    return http_client
+
+
+def build_zep_client(
+    api_key: str,
+    *,
+    base_url: Optional[str] = None,
+    settings: ZepHttpSettings | None = None,
+    http_client: httpx.AsyncClient | None = None,
+) -> tuple[AsyncZep, httpx.AsyncClient]:
+    """
+    Baut AsyncZep auf einem explizit konfigurierten, geteilten httpx.AsyncClient.
+    Rückgabe (zep, http_client); der http_client wird beim Shutdown per aclose() geschlossen.
+    """
+    http_client = http_client or build_http_client(settings)
+    kwargs: Dict[str, Any] = {"api_key": api_key, "httpx_client": http_client}
+    if base_url:
+        kwargs["base_url"] = base_url
+    return AsyncZep(**kwargs), http_client
+
+
+def build_zep_from_env(settings: ZepHttpSettings | None = None) -> tuple[Any, httpx.AsyncClient | None]:
+    """
+    Ein Mitglied (ZEP_API_KEY / ZEP_BASE_URL) → AsyncZep; mehrere (ZEP_API_KEYS / ZEP_BASE_URLS)
+    → ZepClientPool mit Consistent Hashing. Alle Mitglieder teilen sich einen HTTP-Pool.
+    GATEWAY_ZEP_FAKE=1 → FakeZep (offline, In-Memory, ohne HTTP-Client).
+    Ist eine Kassette installiert (GATEWAY_CASSETTE), wird der Client in CassetteZep gehüllt;
+    im Replay-Modus ganz ohne inneren Client.
+    """
+    from .devtools.cassette import CassetteZep, get_cassette
+
+    cassette = get_cassette()
+    if cassette is not None and cassette.mode == "replay":
+        return CassetteZep(None, cassette), None
+    zep, http_client = _build_zep_members(settings)
+    if cassette is not None:
+        return CassetteZep(zep, cassette), http_client
+    return zep, http_client
+
+
+def _build_zep_members(settings: ZepHttpSettings | None) -> tuple[Any, httpx.AsyncClient | None]:
+    from .devtools.fake_zep import FakeZep, fake_zep_enabled
+    from .state import state_path
+    from .zep_pool import PoolMember, ThreadOwnerMap, ZepClientPool, key_fingerprint, parse_pool_env
+
+    if fake_zep_enabled():
+        fake = FakeZep.from_env()
+        metrics.register_collector("fake_zep", fake.stats)
+        return fake, None
+    pairs = parse_pool_env()
+    if not pairs:
+        raise RuntimeError("ZEP_API_KEY fehlt")
+    http_client = build_http_client(settings)
+    if len(pairs) == 1:
+        key, url = pairs[0]
+        return build_zep_client(key, base_url=url, http_client=http_client)
+    members = []
+    for i, (key, url) in enumerate(pairs):
+        client, _ = build_zep_client(key, base_url=url, http_client=http_client)
+        members.append(PoolMember(
+            name=f"zep{i}", client=client, api_key_fp=key_fingerprint(key), base_url=url,
+            fail_threshold=int(os.getenv("GATEWAY_ZEP_POOL_FAIL_THRESHOLD", "3")),
+            cooldown_s=float(os.getenv("GATEWAY_ZEP_POOL_COOLDOWN_S", "30")),
+        ))
+    pool = ZepClientPool(
+        members,
+        owners=ThreadOwnerMap(state_path("zep_thread_owners.sqlite3")),
+        failover=os.getenv("GATEWAY_ZEP_POOL_FAILOVER", "replica"),
+    )
+    return pool, http_client
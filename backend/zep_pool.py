@@ -0,0 +1,379 @@
+# backend/zep_pool.py
+from __future__ import annotations
+
+import asyncio
+import bisect
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .metrics import metrics
+
+__all__ = ["PoolMember", "ThreadOwnerMap", "key_fingerprint", "ZepClientPool", "close_thread_owners", "note_thread_owner",
+           "parse_pool_env"]
+
+logger = logging.getLogger(__name__)
+
+
+def _h(value: str) -> int:
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+def key_fingerprint(secret: str) -> str:
+    return hashlib.sha1(secret.encode("utf-8")).hexdigest()[:8] if secret else "-"
+
+
+@dataclass
+class PoolMember:
+    """Ein Zep-Client im Pool (ein API-Key = ein Projekt; gleicher Key + andere URL = Replika)."""
+    name: str
+    client: Any
+    api_key_fp: str
+    base_url: Optional[str] = None
+    fail_threshold: int = 3
+    cooldown_s: float = 30.0
+    failures: int = 0
+    down_until: float = 0.0
+    calls: int = field(default=0)
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.down_until = 0.0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.fail_threshold:
+            if self.healthy:
+                logger.warning(f"zep pool member '{self.name}' marked unhealthy for {self.cooldown_s:.0f}s")
+            self.down_until = time.monotonic() + self.cooldown_s
+
+
+class ThreadOwnerMap:
+    """
+    thread_id → user_id (persistiert in SQLite/WAL im State-Verzeichnis), damit Thread-Calls
+    auf dem Projekt des besitzenden Users landen – auch nach einem Restart und über Worker hinweg.
+    set()/forget() ändern sofort den Speicher; geschrieben wird gebündelt im Hintergrund-Thread
+    (asyncio.to_thread, ohne laufenden Event-Loop direkt). Unbekannte IDs schlägt get() in der
+    Tabelle nach (Einträge anderer Worker); gelöschte Threads (thread.delete) werden entfernt.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._owners: Dict[str, str] = {}
+        self._pending: Dict[str, Optional[str]] = {}  # None = löschen
+        self._flushing = False
+        self._conn: Optional[sqlite3.Connection] = None
+        if path is None:
+            return
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS owners (thread_id TEXT PRIMARY KEY, user_id TEXT NOT NULL)")
+        self._import_legacy(path.with_suffix(".json"))
+
+    def _import_legacy(self, legacy: Path) -> None:
+        """Früheres JSON-Format einmalig übernehmen."""
+        if not legacy.exists():
+            return
+        try:
+            rows = [(str(t), str(u)) for t, u in dict(json.loads(legacy.read_text(encoding="utf-8"))).items()]
+            with self._db_lock:
+                self._conn.executemany("INSERT OR IGNORE INTO owners (thread_id, user_id) VALUES (?, ?)", rows)
+            legacy.unlink()
+        except Exception as e:
+            logger.warning(f"legacy thread owner map not imported ({legacy}): {e}")
+
+    def get(self, thread_id: str) -> Optional[str]:
+        owner = self._owners.get(thread_id)
+        if owner is not None or self._conn is None or thread_id in self._pending:
+            return owner
+        with self._db_lock:  # ggf. von einem anderen Worker angelegt
+            row = self._conn.execute("SELECT user_id FROM owners WHERE thread_id = ?", (thread_id,)).fetchone()
+        if row is None:
+            return None
+        with self._lock:
+            return self._owners.setdefault(thread_id, str(row[0]))
+
+    def set(self, thread_id: str, user_id: str) -> None:
+        with self._lock:
+            if self._owners.get(thread_id) == user_id:
+                return
+            self._owners[thread_id] = user_id
+            if self._conn is None:
+                return
+            self._pending[thread_id] = user_id
+        self._schedule()
+
+    def forget(self, thread_id: str) -> None:
+        with self._lock:
+            self._owners.pop(thread_id, None)
+            if self._conn is None:
+                return
+            self._pending[thread_id] = None
+        self._schedule()
+
+    def _schedule(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        with self._lock:
+            if self._flushing:
+                return  # laufender Flush nimmt neue Einträge im Anschluss mit
+            self._flushing = True
+        loop.create_task(self._flush_async(), name="zep-thread-owners")
+
+    async def _flush_async(self) -> None:
+        try:
+            await asyncio.to_thread(self.flush)
+        finally:
+            with self._lock:
+                self._flushing = False
+                again = bool(self._pending)
+            if again:
+                self._schedule()
+
+    def flush(self) -> None:
+        with self._lock:
+            batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        try:
+            with self._db_lock:
+                if self._conn is None:  # bereits geschlossen (Shutdown)
+                    return
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.executemany("INSERT OR REPLACE INTO owners (thread_id, user_id) VALUES (?, ?)",
+                                           [(t, u) for t, u in batch.items() if u is not None])
+                    self._conn.executemany("DELETE FROM owners WHERE thread_id = ?",
+                                           [(t,) for t, u in batch.items() if u is None])
+                    self._conn.execute("COMMIT")
+                except BaseException:
+                    self._conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            logger.warning(f"thread owner map not saved: {e}")
+            with self._lock:
+                for t, u in batch.items():
+                    self._pending.setdefault(t, u)  # neuere Änderungen haben Vorrang
+
+    def close(self) -> None:
+        self.flush()
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.close()
+            self._conn = None
+
+    def __len__(self) -> int:
+        return len(self._owners)
+
+
+class _PoolNamespace:
+    """Fassade für client.<ns> (thread / graph / user): jede Methode wird geroutet."""
+
+    def __init__(self, pool: "ZepClientPool", ns: str) -> None:
+        self._pool = pool
+        self._ns = ns
+
+    def __getattr__(self, method: str) -> Callable[..., Any]:
+        async def _call(*args: Any, **kwargs: Any) -> Any:
+            return await self._pool.dispatch(self._ns, method, *args, **kwargs)
+        _call.__name__ = method
+        return _call
+
+
+class ZepClientPool:
+    """
+    AsyncZep-kompatibler Pool über mehrere API-Keys / Base-URLs.
+
+    - Routing per Consistent Hashing (virtuelle Knoten) über den Routing-Schlüssel
+      eines Calls: graph_id → user_id → thread_id (über den Besitzer-User) → source_*;
+      ohne Schlüssel (z. B. graph.list) antwortet das erste Mitglied,
+    - thread.create(user_id, thread_id) merkt sich den Besitzer (ThreadOwnerMap), auch wenn der Thread
+      schon existiert; bereits bekannte Threads meldet der Bootstrap per note_thread_owner,
+      thread.delete entfernt den Eintrag wieder,
+    - Health-Failover: nach fail_threshold transienten Fehlern wird ein Mitglied für
+      cooldown_s übersprungen; Standard nur auf Replikas desselben API-Keys (Daten-
+      lokalität), mit failover="any" auf das nächste gesunde Mitglied im Ring.
+    Call-Sites (ZepMemory, GraphAPI, ZepGraphAdmin) bleiben unverändert.
+    """
+
+    def __init__(
+        self,
+        members: List[PoolMember],
+        *,
+        owners: ThreadOwnerMap | None = None,
+        vnodes: int = 64,
+        failover: str = "replica",
+    ) -> None:
+        if not members:
+            raise ValueError("ZepClientPool needs at least one member")
+        self._members = members
+        self._owners = owners or ThreadOwnerMap()
+        self._failover = failover if failover in ("replica", "any", "none") else "replica"
+        ring = sorted((_h(f"{m.name}#{v}"), i) for i, m in enumerate(members) for v in range(max(1, vnodes)))
+        self._ring_keys = [k for k, _ in ring]
+        self._ring_idx = [i for _, i in ring]
+        self.thread = _PoolNamespace(self, "thread")
+        self.graph = _PoolNamespace(self, "graph")
+        self.user = _PoolNamespace(self, "user")
+        metrics.register_collector("zep_pool", self.stats)
+
+    def __getattr__(self, name: str) -> Any:
+        # Legacy-Namespaces (z. B. zep.memory) → erstes Mitglied
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._members[0].client, name)
+
+    @property
+    def members(self) -> List[PoolMember]:
+        return list(self._members)
+
+    @property
+    def owners(self) -> ThreadOwnerMap:
+        return self._owners
+
+    # ---- Routing ---------------------------------------------------------------
+    def routing_key(self, kwargs: Dict[str, Any]) -> Optional[str]:
+        if kwargs.get("graph_id"):
+            return f"graph:{kwargs['graph_id']}"
+        if kwargs.get("user_id"):
+            return f"user:{kwargs['user_id']}"
+        tid = kwargs.get("thread_id")
+        if tid:
+            owner = self._owners.get(str(tid))
+            return f"user:{owner}" if owner else f"thread:{tid}"
+        if kwargs.get("source_graph_id"):
+            return f"graph:{kwargs['source_graph_id']}"
+        if kwargs.get("source_user_id"):
+            return f"user:{kwargs['source_user_id']}"
+        return None
+
+    def candidates(self, key: Optional[str]) -> List[PoolMember]:
+        """Primäres Mitglied zuerst, danach die erlaubten Failover-Ziele in Ringreihenfolge."""
+        if key is None:
+            order = list(range(len(self._members)))
+        else:
+            start = bisect.bisect(self._ring_keys, _h(key))
+            order = []
+            for j in range(len(self._ring_idx)):
+                i = self._ring_idx[(start + j) % len(self._ring_idx)]
+                if i not in order:
+                    order.append(i)
+                    if len(order) == len(self._members):
+                        break
+        primary = self._members[order[0]]
+        out = [primary]
+        if self._failover == "none":
+            return out
+        for i in order[1:]:
+            m = self._members[i]
+            if self._failover == "any" or m.api_key_fp == primary.api_key_fp:
+                out.append(m)
+        return out
+
+    def member_for(self, key: Optional[str]) -> PoolMember:
+        return self.candidates(key)[0]
+
+    async def dispatch(self, ns: str, method: str, *args: Any, **kwargs: Any) -> Any:
+        from .memory.resilience import is_retryable  # lazy: vermeidet Importzyklus beim Bootstrap
+
+        key = self.routing_key(kwargs)
+        cands = self.candidates(key)
+        healthy = [m for m in cands if m.healthy] or cands[:1]
+        last_exc: BaseException | None = None
+        for n, member in enumerate(healthy):
+            fn = getattr(getattr(member.client, ns), method)
+            member.calls += 1
+            metrics.inc("zep.pool.calls", member=member.name)
+            if n:
+                metrics.inc("zep.pool.failovers", member=member.name)
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable(e):
+                    member.record_success()
+                    if ns == "thread" and method == "delete" and kwargs.get("thread_id") \
+                            and getattr(e, "status_code", None) == 404:
+                        self._owners.forget(str(kwargs["thread_id"]))
+                    if ns == "thread" and method == "create" and kwargs.get("user_id") and kwargs.get("thread_id") \
+                            and getattr(e, "status_code", None) in (400, 409):
+                        # Thread existiert bereits (gepinnt, Warmstart, vor dem Pool angelegt) → Besitzer trotzdem merken
+                        self._owners.set(str(kwargs["thread_id"]), str(kwargs["user_id"]))
+                    raise
+                member.record_failure()
+                last_exc = e
+                continue
+            member.record_success()
+            if ns == "thread" and method == "delete" and kwargs.get("thread_id"):
+                self._owners.forget(str(kwargs["thread_id"]))  # Thread-GC, Reset
+            if ns == "thread" and method == "create" and kwargs.get("user_id"):
+                tid = kwargs.get("thread_id") or getattr(result, "thread_id", None) or getattr(result, "uuid", None)
+                if tid:
+                    self._owners.set(str(tid), str(kwargs["user_id"]))
+            return result
+        assert last_exc is not None
+        raise last_exc
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "failover": self._failover,
+            "thread_owners": len(self._owners),
+            "members": [
+                {"name": m.name, "base_url": m.base_url, "key": m.api_key_fp, "healthy": m.healthy,
+                 "failures": m.failures, "calls": m.calls}
+                for m in self._members
+            ],
+        }
+
+
+def _as_pool(client: Any) -> Optional[ZepClientPool]:
+    pool = getattr(client, "inner", None) if not isinstance(client, ZepClientPool) else client  # ggf. hinter der Kassette
+    return pool if isinstance(pool, ZepClientPool) else None
+
+
+def note_thread_owner(client: Any, thread_id: Optional[str], user_id: Optional[str]) -> None:
+    """Besitzer eines bekannten Threads vermerken, falls client ein ZepClientPool ist."""
+    pool = _as_pool(client)
+    if pool is not None and thread_id and user_id:
+        pool.owners.set(str(thread_id), str(user_id))
+
+
+def close_thread_owners(client: Any) -> None:
+    """Beim Shutdown: offene Besitzer-Einträge schreiben und die Datenbank schließen."""
+    pool = _as_pool(client)
+    if pool is not None:
+        pool.owners.close()
+
+
+def parse_pool_env() -> List[tuple[str, Optional[str]]]:
+    """
+    ZEP_API_KEYS / ZEP_BASE_URLS (kommagetrennt) → [(api_key, base_url)].
+    Gleich viele Einträge → paarweise; sonst jede URL für jeden Key (Replikas).
+    Fallback: ZEP_API_KEY / ZEP_BASE_URL (ein Mitglied).
+    """
+    keys = [k.strip() for k in os.getenv("ZEP_API_KEYS", "").split(",") if k.strip()]
+    urls = [u.strip() for u in os.getenv("ZEP_BASE_URLS", "").split(",") if u.strip()]
+    if not keys and os.getenv("ZEP_API_KEY"):
+        keys = [os.getenv("ZEP_API_KEY", "")]
+    if not urls and os.getenv("ZEP_BASE_URL"):
+        urls = [os.getenv("ZEP_BASE_URL", "")]
+    if not urls:
+        return [(k, None) for k in keys]
+    if len(urls) == len(keys):
+        return list(zip(keys, urls))
+    return [(k, u) for k in keys for u in urls]
@@ -0,0 +1,106 @@
+# bench/_util.py
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """Nearest-rank-Perzentil (p in 0..100); leere Liste → 0.0."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+@dataclass
+class OpResult:
+    """Messreihe einer Operation: Wall-Zeit, injizierte (simulierte) Latenz und Roundtrips pro Aufruf."""
+    name: str
+    wall_ms: List[float] = field(default_factory=list)
+    injected_ms: List[float] = field(default_factory=list)
+    calls: List[int] = field(default_factory=list)
+    calls_by_op: Dict[str, int] = field(default_factory=dict)
+    errors: int = 0
+
+    def add(self, wall_ms: float, injected_ms: float, calls: int, by_op: Optional[Dict[str, int]] = None) -> None:
+        self.wall_ms.append(wall_ms)
+        self.injected_ms.append(injected_ms)
+        self.calls.append(calls)
+        for op, n in (by_op or {}).items():
+            self.calls_by_op[op] = self.calls_by_op.get(op, 0) + n
+
+    @property
+    def overhead_ms(self) -> List[float]:
+        return [max(0.0, w - i) for w, i in zip(self.wall_ms, self.injected_ms)]
+
+    def summary(self) -> Dict[str, Any]:
+        n = len(self.wall_ms) or 1
+        over = self.overhead_ms
+        return {
+            "name": self.name,
+            "n": len(self.wall_ms),
+            "wall_p50_ms": round(percentile(self.wall_ms, 50), 3),
+            "wall_p95_ms": round(percentile(self.wall_ms, 95), 3),
+            "overhead_p50_ms": round(percentile(over, 50), 3),
+            "overhead_p95_ms": round(percentile(over, 95), 3),
+            "overhead_mean_ms": round(statistics.fmean(over), 3) if over else 0.0,
+            "roundtrips_per_call": round(sum(self.calls) / n, 2),
+            "roundtrips_by_op": {k: round(v / n, 2) for k, v in sorted(self.calls_by_op.items())},
+            "errors": self.errors,
+        }
+
+
+class LoopLagMonitor:
+    """Event-Loop-Lag: Verspätung eines periodischen asyncio.sleep(interval) gegenüber dem Soll (ms)."""
+
+    def __init__(self, interval_s: float = 0.01) -> None:
+        self.interval_s = interval_s
+        self.lag_ms: List[float] = []
+        self._task: Optional[asyncio.Task[None]] = None
+
+    async def _run(self) -> None:
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(self.interval_s)
+            self.lag_ms.append(max(0.0, (time.perf_counter() - t0 - self.interval_s) * 1000.0))
+
+    def start(self) -> None:
+        self.lag_ms = []
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> Dict[str, float]:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        return {
+            "p50_ms": round(percentile(self.lag_ms, 50), 3),
+            "p95_ms": round(percentile(self.lag_ms, 95), 3),
+            "p99_ms": round(percentile(self.lag_ms, 99), 3),
+            "max_ms": round(max(self.lag_ms, default=0.0), 3),
+        }
+
+
+def print_table(rows: Sequence[Dict[str, Any]], columns: Sequence[str]) -> None:
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    print("  ".join("-" * widths[c] for c in columns))
+    for r in rows:
+        print("  ".join(str(r.get(c, "")).ljust(widths[c]) for c in columns))
+
+
+def write_json(path: Optional[str], payload: Dict[str, Any]) -> None:
+    if not path:
+        return
+    Path(path).write_text(json.dumps(payload, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+    print(f"\n→ {path}")
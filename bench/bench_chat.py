@@ -0,0 +1,239 @@
+# bench/bench_chat.py
+"""
+End-to-End-Lastbenchmark für POST /chat bei steigender Parallelität.
+
+    # in-process (ASGI, Lifespan läuft im Benchmark-Prozess), Zep + LLM als Stand-ins:
+    python -m bench.bench_chat --levels 1,4,16,32 --requests 64 --zep fake --llm fake --json chat.json
+    # gegen einen laufenden Server:
+    python -m bench.bench_chat --target http://localhost:8080 --levels 1,8,32 --requests 100
+
+Stand-ins (nur in-process, vor dem App-Import per ENV gesetzt):
+  --zep fake|cassette|real   FakeZep (GATEWAY_ZEP_FAKE, --zep-latency-ms) / Kassetten-Replay / echter Zep
+  --llm fake|cassette|real|<url>   lokaler Fake-LLM (im Thread gestartet) / Kassette / echter Provider / OPENAI_BASE_URL
+  (cassette setzt GATEWAY_CASSETTE=replay und ersetzt damit Zep und LLM gemeinsam)
+
+Pro Stufe: Durchsatz, Latenz p50/p95/p99, Fehlerquote, HMA-Stufen (context/demos/som/deliver,
+aus hma.stage_ms) und Event-Loop-Lag (in-process gemessen; über HTTP nicht verfügbar).
+Über HTTP stammen die Stufen-Perzentile aus /status/metrics (Reservoir der letzten Samples).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from ._util import LoopLagMonitor, percentile, print_table, write_json
+
+_STAGES = ("context", "demos", "som", "deliver")
+
+_PROMPTS = (
+    "Hallo, ich heiße Alex und wohne in Berlin.",
+    "Was weißt du über mich?",
+    "Plane bitte die nächsten drei Meilensteine für das Gateway-Projekt.",
+    "Ich bekomme einen Traceback beim docker compose build, kannst du helfen?",
+    "Bitte prüfe kritisch meinen Plan, die Roadmap auf zwei Wochen zu kürzen.",
+    "Ich fühle mich gerade etwas überfordert mit dem Projekt.",
+    "Fasse zusammen, was wir bisher entschieden haben.",
+    "Welche Funktion im Memory-Layer sollte ich zuerst optimieren?",
+)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class _FakeLLMThread:
+    """Fake-LLM (backend/devtools/fake_llm.py) per uvicorn in einem Hintergrund-Thread."""
+
+    def __init__(self) -> None:
+        import uvicorn
+        from backend.devtools.fake_llm import create_app
+
+        self.port = _free_port()
+        self._server = uvicorn.Server(uvicorn.Config(create_app(), host="127.0.0.1", port=self.port,
+                                                     log_level="warning", access_log=False))
+        self._thread = threading.Thread(target=self._server.run, name="fake-llm", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def start(self) -> None:
+        self._thread.start()
+        deadline = time.monotonic() + 10.0
+        while not self._server.started and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5.0)
+
+
+def _configure_env(args: argparse.Namespace) -> Optional[_FakeLLMThread]:
+    # vor dem Import von backend.main: Bootstrap/Singletons lesen ENV beim ersten Zugriff
+    if args.zep == "fake":
+        os.environ["GATEWAY_ZEP_FAKE"] = "1"
+        os.environ["GATEWAY_FAKE_ZEP_LATENCY_MS"] = str(args.zep_latency_ms)
+    if "cassette" in (args.zep, args.llm):
+        os.environ["GATEWAY_CASSETTE"] = "replay"
+    fake_llm = None
+    if args.llm == "fake":
+        fake_llm = _FakeLLMThread()
+        fake_llm.start()
+        os.environ["OPENAI_BASE_URL"] = fake_llm.base_url
+        os.environ.setdefault("OPENAI_API_KEY", "fake")
+    elif args.llm.startswith("http"):
+        os.environ["OPENAI_BASE_URL"] = args.llm
+    return fake_llm
+
+
+def _stage_stats(snapshot: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    lat = snapshot.get("latency") or {}
+    out: Dict[str, Dict[str, float]] = {}
+    for stage in _STAGES:
+        s = lat.get(f"hma.stage_ms{{stage={stage}}}")
+        if s:
+            out[stage] = {"p50_ms": s["p50"], "p95_ms": s["p95"], "p99_ms": s["p99"]}
+    return out
+
+
+async def _run_level(client: Any, concurrency: int, n_requests: int, timeout_s: float) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    counter = iter(range(n_requests))
+
+    async def worker() -> None:
+        for i in counter:
+            t0 = time.perf_counter()
+            try:
+                r = await client.post("/chat", json={"prompt": _PROMPTS[i % len(_PROMPTS)]},
+                                      headers={"x-corr-id": f"bench-c{concurrency}-{i}"}, timeout=timeout_s)
+                if r.status_code >= 400:
+                    errors[f"http_{r.status_code}"] = errors.get(f"http_{r.status_code}", 0) + 1
+                    continue
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                continue
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    n_err = sum(errors.values())
+    return {
+        "concurrency": concurrency,
+        "requests": n_requests,
+        "ok": len(latencies),
+        "errors": n_err,
+        "error_rate": round(n_err / max(1, n_requests), 4),
+        "errors_by_type": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    levels = [int(x) for x in str(args.levels).split(",") if x.strip()]
+    results: List[Dict[str, Any]] = []
+    async with AsyncExitStack() as stack:
+        if args.target:
+            client = await stack.enter_async_context(httpx.AsyncClient(base_url=args.target, timeout=args.timeout_s))
+            registry = None
+        else:
+            from backend.main import app
+            from backend.metrics import metrics as registry
+
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = await stack.enter_async_context(httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=args.timeout_s))
+
+        # Warm-up (Verbindungen, Caches, erste Thread-Writes) – nicht gemessen
+        if args.warmup:
+            await _run_level(client, 1, args.warmup, args.timeout_s)
+
+        for level in levels:
+            if registry is not None:
+                registry.reset()
+            lag = LoopLagMonitor()
+            if registry is not None:
+                lag.start()
+            row = await _run_level(client, level, args.requests, args.timeout_s)
+            if registry is not None:
+                row["loop_lag"] = await lag.stop()
+                snap = registry.snapshot()
+            else:
+                r = await client.get("/status/metrics")
+                snap = r.json() if r.status_code == 200 else {}
+            row["stages"] = _stage_stats(snap)
+            results.append(row)
+            print(f"  c={level:<4} rps={row['throughput_rps']:<8} p50={row['p50_ms']}ms p95={row['p95_ms']}ms "
+                  f"p99={row['p99_ms']}ms err={row['error_rate']:.1%}", flush=True)
+    return {"levels": results}
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip()
+    except Exception:
+        return ""
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--target", default=None, help="Base-URL eines laufenden Servers (sonst in-process)")
+    ap.add_argument("--levels", default="1,2,4,8,16,32", help="Parallelitätsstufen, kommasepariert")
+    ap.add_argument("--requests", type=int, default=64, help="Requests pro Stufe")
+    ap.add_argument("--warmup", type=int, default=4, help="ungemessene Requests vor der ersten Stufe")
+    ap.add_argument("--timeout-s", type=float, default=120.0)
+    ap.add_argument("--zep", default="fake", help="fake|cassette|real (nur in-process)")
+    ap.add_argument("--zep-latency-ms", type=float, default=20.0, help="FakeZep-Latenz (Median)")
+    ap.add_argument("--llm", default="fake", help="fake|cassette|real|<OPENAI_BASE_URL> (nur in-process)")
+    ap.add_argument("--json", default=None, help="Ergebnis zusätzlich als JSON schreiben")
+    args = ap.parse_args(argv)
+
+    fake_llm = None if args.target else _configure_env(args)
+    try:
+        out = asyncio.run(run(args))
+    finally:
+        if fake_llm is not None:
+            fake_llm.stop()
+
+    rows = []
+    for r in out["levels"]:
+        row = {k: r[k] for k in ("concurrency", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "error_rate")}
+        for stage in _STAGES:
+            row[f"{stage}_p95"] = r["stages"].get(stage, {}).get("p95_ms", "")
+        row["loop_lag_p99"] = (r.get("loop_lag") or {}).get("p99_ms", "")
+        rows.append(row)
+    if rows:
+        print()
+        print_table(rows, list(rows[0].keys()))
+    write_json(args.json, {
+        "bench": "bench_chat",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k != "json"},
+        **out,
+    })
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
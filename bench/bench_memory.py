@@ -0,0 +1,203 @@
+# bench/bench_memory.py
+"""
+Memory-Layer-Benchmark gegen FakeZep (offline, deterministisch).
+
+Misst pro Operation die Wall-Zeit, den Anteil simulierter Zep-Latenz und damit den
+Eigen-Overhead (Wall − injizierte Latenz) von ZepMemory / ZepThreadMemory / GraphAPI /
+Bootstrap-Thread-Setup sowie die Zep-Roundtrips pro Aufruf und pro HMA-Turn.
+
+    python -m bench.bench_memory --latency-ms 20 --iterations 200 --turns 50
+    python -m bench.bench_memory --latency-ms 20 --outbox --json bench_memory.json
+
+Rate-Governor und Hedging sind standardmäßig aus (reiner Code-Overhead);
+--governor / --hedge schalten sie wie in Produktion zu.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List
+
+from ._util import OpResult, print_table, write_json
+
+
+def _configure_env(args: argparse.Namespace) -> None:
+    # vor den Backend-Imports: Resilienz-/Governor-Singletons lesen ENV beim ersten Zugriff
+    os.environ.setdefault("GATEWAY_STATE_DIR", tempfile.mkdtemp(prefix="gateway_bench_"))
+    os.environ["GATEWAY_CACHE_DISK"] = "1" if args.cache_disk else "0"
+    os.environ["GATEWAY_ZEP_RATE_GOVERNOR"] = "1" if args.governor else "0"
+    os.environ["GATEWAY_ZEP_HEDGE"] = "1" if args.hedge else "0"
+
+
+async def _measure(fake: Any, name: str, fn: Callable[[int], Awaitable[Any]], n: int) -> OpResult:
+    res = OpResult(name)
+    for i in range(n):
+        calls_before = dict(fake.calls)
+        injected_before = sum(fake.injected_ms.values())
+        t0 = time.perf_counter()
+        try:
+            await fn(i)
+        except Exception:
+            res.errors += 1
+        wall_ms = (time.perf_counter() - t0) * 1000.0
+        by_op = {op: c - calls_before.get(op, 0) for op, c in fake.calls.items() if c - calls_before.get(op, 0)}
+        res.add(wall_ms, sum(fake.injected_ms.values()) - injected_before, sum(by_op.values()), by_op)
+    return res
+
+
+class _FixedLLM:
+    """Deterministische SOM-Antwort mit Route-Marker (kein LLM-Call)."""
+
+    def completion(self, *, system: str, prompt: str) -> str:
+        _ = system, prompt
+        return 'Ich habe das notiert.\n<<<ROUTE>>> {"deliver_to": "user", "args": {}} <<<END>>>'
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    from autogen_core.memory import MemoryContent, MemoryMimeType
+    from backend.agent_core.hma.hma import HMA
+    from backend.agent_core.hma.hma_config import DEFAULT_HMA_CONFIG
+    from backend.devtools.fake_zep import FakeLatency, FakeZep
+    from backend.memory.graph_api import GraphAPIProvider
+    from backend.memory.manager import MemoryManager
+    from backend.memory.memory import ZepMemory, build_outbox_handlers
+    from backend.memory.outbox import Outbox, OutboxReplayer
+    from backend.memory.profile_view import ProfileFactsView
+    from backend.memory.read_cache import ReadCache
+    from backend.state import state_path
+
+    fake = FakeZep(FakeLatency(base_ms=args.latency_ms, jitter=args.jitter, sigma=args.sigma,
+                               error_rate=args.error_rate, seed=args.seed))
+    n = args.iterations
+    results: List[OpResult] = []
+    user = "bench_user"
+
+    # --- Bootstrap: User + Thread je Scope (Call-Folge wie bootstrap._ensure_thread für T1..T6) ---
+    labels = ["t1_root", "t2_user_visible", "t3_meta_proto", "t4_lib_internal", "t5_task_internal", "t6_trn_internal"]
+    mems: Dict[str, Any] = {}
+
+    async def _boot(i: int) -> None:
+        label = labels[i]
+        thread_id = f"thread_{label}_bench"
+        try:
+            await fake.user.add(user_id=user, email=f"{user}@example.local", first_name=label.upper(), last_name="Agent")
+        except Exception:
+            pass  # idempotent wie im Bootstrap
+        await fake.thread.create(thread_id=thread_id, user_id=user)
+        mems[label] = ZepMemory(client=fake, user_id=user, thread_id=thread_id)
+
+    results.append(await _measure(fake, "bootstrap thread setup", _boot, len(labels)))
+    t1, t2, t3 = mems["t1_root"], mems["t2_user_visible"], mems["t3_meta_proto"]
+
+    read_cache = None if args.no_cache else ReadCache.from_env(state_path("read_cache.sqlite3"))
+    provider = GraphAPIProvider(client=fake, graph_id="bench_main", user_id=user, read_cache=read_cache)
+    get_api = provider.get_api
+    await fake.graph.create(graph_id="bench_main", name="Bench")
+    replayer = None
+    if args.outbox:
+        replayer = OutboxReplayer(Outbox(state_path("bench_outbox.sqlite3")), build_outbox_handlers(fake, get_api),
+                                  backoff_base_s=0.01, backoff_cap_s=0.1)
+
+    async def _drain_all(_: int = 0) -> None:
+        assert replayer is not None
+        while replayer.outbox.counts()["pending"]:
+            await replayer.drain()
+            await asyncio.sleep(0.01)  # Einträge im (kurzen) Backoff abwarten
+    for mem in mems.values():
+        mem.set_api(get_api)
+        if read_cache is not None:
+            mem.set_read_cache(read_cache)
+        if replayer is not None:
+            mem.set_outbox(replayer)
+    view = None
+    if not args.no_profile_view:
+        view = ProfileFactsView(get_api, limit=5, refresh_interval_s=3600)
+        get_api().add_write_listener(view.apply_write)
+        for mem in mems.values():
+            mem.set_profile_view(view)
+
+    thread = t1._thread
+    api = get_api()
+
+    # --- Einzeloperationen ------------------------------------------------------------
+    results.append(await _measure(fake, "ZepThreadMemory.add_messages", lambda i: thread.add_messages(
+        [{"role": "user", "content": f"Benchmark-Nachricht {i}: ich wohne in Berlin und mag Kaffee."}]), n))
+    if replayer is not None:
+        await _drain_all()
+    results.append(await _measure(fake, "ZepThreadMemory.list_recent_messages", lambda i: thread.list_recent_messages(limit=10), n))
+    results.append(await _measure(fake, "ZepThreadMemory.get_user_context", lambda i: thread.get_user_context(), n))
+    results.append(await _measure(fake, "ZepThreadMemory.build_context_block", lambda i: thread.build_context_block(), n))
+    results.append(await _measure(fake, "GraphAPI.add_raw_data", lambda i: api.add_raw_data(
+        user_id=user, data_type="text", data=f"Fakt {i}: Projekt Gateway nutzt Zep.", role="user", source="bench"), n))
+    results.append(await _measure(fake, "GraphAPI.search", lambda i: api.search(query=f"Kaffee Berlin {i % 7}", limit=10), n))
+    node = (await api.add_node(name="Gateway", summary="Bench-Knoten"))["data"]["node"]
+    other = (await api.add_node(name="Zep", summary="Memory-Backend"))["data"]["node"]
+    await api.add_edge(head_uuid=node["uuid"], relation="USES", tail_uuid=other["uuid"], fact="Gateway nutzt Zep")
+    results.append(await _measure(fake, "GraphAPI.get_node", lambda i: api.get_node(node["uuid"]), n))
+    results.append(await _measure(fake, "GraphAPI.get_node_edges", lambda i: api.get_node_edges(node["uuid"]), n))
+    results.append(await _measure(fake, "ZepMemory.get_context(graph)", lambda i: t1.get_context(include_recent=True, graph=True), n))
+
+    # --- HMA-Turn (wie UserProxy.handle: T1-Write → Kontext → SOM → Deliver) -----------
+    runtime = SimpleNamespace(t1_memory=t1, t2_memory=t2, t3_memory=t3)
+    hma = HMA(som_system_prompt=DEFAULT_HMA_CONFIG.som_system_prompt, templates=DEFAULT_HMA_CONFIG, demos=[],
+              messaging=None, llm=_FixedLLM(), ctx_provider=MemoryManager(t1, get_api=get_api), runtime=runtime)
+
+    async def _turn(i: int) -> None:
+        text = f"Turn {i}: was weißt du über mich?"
+        await t1.add(MemoryContent(content=text, mime_type=MemoryMimeType.TEXT,
+                                   metadata={"type": "message", "role": "user", "name": "User", "thread": "T1"}))
+        await hma.run(user_text=text, context="", corr_id=f"bench-{i}")
+
+    results.append(await _measure(fake, "HMA turn (no demos)", _turn, args.turns))
+    if replayer is not None:
+        results.append(await _measure(fake, "outbox.drain (deferred turn writes)", _drain_all, 1))
+        replayer.outbox.close()
+    if read_cache is not None:
+        read_cache.close()
+
+    summary = [r.summary() for r in results]
+    return {
+        "config": {k: v for k, v in vars(args).items() if k != "json"},
+        "results": summary,
+        "fake_zep": fake.stats(),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--iterations", type=int, default=100, help="Aufrufe pro Einzeloperation")
+    ap.add_argument("--turns", type=int, default=20, help="HMA-Turns")
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="simulierte Zep-Latenz (Median)")
+    ap.add_argument("--jitter", default="none", choices=("none", "uniform", "lognormal"))
+    ap.add_argument("--sigma", type=float, default=0.4)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Anteil injizierter 503-Fehler")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--outbox", action="store_true", help="Writes über die durable Outbox")
+    ap.add_argument("--no-cache", action="store_true", help="ohne Read-Cache")
+    ap.add_argument("--cache-disk", action="store_true", help="Read-Cache mit SQLite-Stufe")
+    ap.add_argument("--no-profile-view", action="store_true", help="Graph-Kontext per Suche statt ProfileFactsView")
+    ap.add_argument("--governor", action="store_true", help="Rate-Governor aktiv (wie Produktion)")
+    ap.add_argument("--hedge", action="store_true", help="Hedged Reads aktiv (wie Produktion)")
+    ap.add_argument("--json", default=None, help="Ergebnis zusätzlich als JSON schreiben")
+    args = ap.parse_args(argv)
+
+    _configure_env(args)
+    out = asyncio.run(run(args))
+    print_table(out["results"], ["name", "n", "wall_p50_ms", "wall_p95_ms", "overhead_p50_ms",
+                                 "overhead_p95_ms", "roundtrips_per_call", "errors"])
+    print("\nRoundtrips pro Aufruf nach Zep-Operation:")
+    for r in out["results"]:
+        if r["roundtrips_by_op"]:
+            ops = ", ".join(f"{k}={v}" for k, v in r["roundtrips_by_op"].items())
+            print(f"  {r['name']}: {ops}")
+    write_json(args.json, out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,223 @@
+# bench/bench_micro.py
+"""
+Micro-Benchmarks der reinen Python-Arbeit pro Turn (HMA + Memory-Hilfsfunktionen).
+
+    python -m bench.bench_micro                       # alle Fälle
+    python -m bench.bench_micro -k route -k graph     # Filter (Teilstring im Namen)
+    python -m bench.bench_micro --json micro.json     # Ergebnis speichern
+    python -m bench.bench_micro --baseline micro.json --threshold 0.2   # Exit 1 bei Regression
+
+Eingaben sind realistisch groß und aus den Beispielen in deploy/pbuffer abgeleitet
+(Kontextblöcke mit Dutzenden Nachrichten, Demo-Antworten mit Claims, SOM-Texte mit
+Code-Fences und ROUTE-Markern, lange Episoden). Gemessen werden ns/op (Minimum und
+Median über --repeat Läufe, Anzahl per timeit-autorange) und der Speicher-Peak pro Aufruf
+(tracemalloc).
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import itertools
+import json
+import random
+import statistics
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Tuple
+
+from ._util import print_table, write_json
+
+_ROOT = Path(__file__).resolve().parent.parent
+
+_FALLBACK_SAMPLES = (
+    "Du heißt Aaron Lindsay.",
+    "Ich wohne in Berlin und arbeite an GatewayIDE.",
+    "Wir sollten den Memory-Layer zuerst optimieren.",
+    "Lina hat am 3. Februar Geburtstag.",
+    "Okay.",
+)
+_FILLER = (
+    "Der Build im Docker-Container schlägt mit einem Traceback fehl, vermutlich wegen der Compose-Datei.",
+    "Plan: zuerst die Roadmap priorisieren, dann Meilensteine für das Team festlegen.",
+    "Ich fühle mich mit der Menge an offenen Aufgaben etwas überfordert.",
+    "Bitte prüfe kritisch, ob die Strategie für das Release noch stimmt.",
+    "Die Funktion build_context_block ruft list_recent_messages und get_user_context auf.",
+    "Mein Name ist Alex und ich komme aus Hamburg.",
+    "Wir werden die Outbox im Hintergrund zustellen lassen.",
+    "Am 14. Oktober ist die Abnahme beim Kunden in München.",
+)
+
+
+def _samples() -> List[str]:
+    texts = []
+    pdir = _ROOT / "deploy" / "pbuffer"
+    for p in sorted(pdir.glob("*.txt")) if pdir.is_dir() else []:
+        t = p.read_text(encoding="utf-8", errors="replace").strip()
+        if t:
+            texts.append(t)
+    return texts or list(_FALLBACK_SAMPLES)
+
+
+class _Corpus:
+    """Deterministisch (seed) erzeugte Eingaben aus pbuffer-Beispielen plus typischen Turn-Texten."""
+
+    def __init__(self, seed: int = 7) -> None:
+        self.rng = random.Random(seed)
+        self.sentences = _samples() + list(_FILLER)
+
+    def text(self, n_sentences: int) -> str:
+        return " ".join(self.rng.choice(self.sentences) for _ in range(n_sentences))
+
+    def context(self, n_messages: int = 40) -> str:
+        lines = ["# Kontext", "## Letzte Nachrichten"]
+        for i in range(n_messages):
+            role = "user" if i % 2 == 0 else "assistant"
+            lines.append(f"- {role}: {self.text(3)}")
+        lines.append("## Fakten")
+        lines.extend(f"- {self.text(1)}" for _ in range(10))
+        return "\n".join(lines)
+
+    def demo_pairs(self, n: int = 5) -> List[Tuple[str, str]]:
+        names = ["PersonalAgent", "DemoTherapist", "DemoProgrammer", "DemoStrategist", "DemoCritic"]
+        return [(names[i % len(names)], self.text(12)) for i in range(n)]
+
+    def som_text(self) -> str:
+        return (
+            f"Ich {self.text(10)}\n\n```json\n{{\"note\": \"{self.text(2)}\"}}\n```\n"
+            '<<<ROUTE>>> {"deliver_to": "task", "args": {"priority": "high", "tags": ["gateway", "memory"]}} <<<END>>>'
+        )
+
+    def raw_messages(self, n: int = 200) -> List[Dict[str, Any]]:
+        roles = ["user", "assistant", "system", "Assistant ", ""]
+        return [{"role": self.rng.choice(roles), "content": f"  {self.text(2)}  " if i % 9 else "",
+                 "created_at": f"2025-11-{1 + i % 28:02d}T10:00:00Z"} for i in range(n)]
+
+    def zep_edge(self, i: int) -> SimpleNamespace:
+        return SimpleNamespace(uuid=f"e-{i}", name="RELATES_TO", fact=self.text(1), score=0.5 + (i % 50) / 100,
+                               attributes={"source": "bench", "i": i}, created_at="2025-11-14T10:00:00Z",
+                               valid_at=None, invalid_at=None, expired_at=None,
+                               source_node_uuid=f"n-{i}", target_node_uuid=f"n-{i + 1}", rating=None)
+
+    def zep_node(self, i: int) -> SimpleNamespace:
+        return SimpleNamespace(uuid=f"n-{i}", name=f"Entity {i}", summary=self.text(2), score=0.7,
+                               attributes={"kind": "person"}, labels=["Entity", "Person"],
+                               created_at="2025-11-14T10:00:00Z")
+
+    def zep_episode(self, i: int) -> SimpleNamespace:
+        return SimpleNamespace(uuid=f"ep-{i}", content=self.text(4), role="user", source="message",
+                               score=0.6, created_at="2025-11-14T10:00:00Z", thread_id="thread_t1")
+
+
+def _cases(c: _Corpus) -> List[Tuple[str, Callable[[], Any]]]:
+    from backend.agent_core.hma.hma import build_inner_material, parse_deliver_to, select_demos, strip_route_markers
+    from backend.memory.graph_api import _edge_from_zep, _episode_from_zep, _node_from_zep
+    from backend.memory.graph_utils import build_edge_payload
+    from backend.memory.memory_utils import format_message_list, prepare_message_dict, split_long_text
+    from backend.routes.memory_api import extract_fact_and_tags
+
+    demos = [SimpleNamespace(name=n) for n in ("PersonalAgent", "DemoTherapist", "DemoProgrammer", "DemoStrategist", "DemoCritic")]
+    user_text = "Plane bitte die Roadmap und prüfe den Traceback aus dem Docker-Build."
+    context = c.context(40)
+    pairs = c.demo_pairs(5)
+    som = c.som_text()
+    facts = [c.text(1) + " Lina hat am 3. Februar Geburtstag." if i % 3 == 0 else c.text(2) for i in range(64)]
+    raw = c.raw_messages(200)
+    long_text = c.text(2500)
+    edges = [c.zep_edge(i) for i in range(50)]
+    nodes = [c.zep_node(i) for i in range(50)]
+    episodes = [c.zep_episode(i) for i in range(50)]
+    fact_cycle = itertools.cycle(facts)
+
+    return [
+        ("hma.select_demos (40-msg context)", lambda: select_demos(user_text, context, demos)),
+        ("hma.build_inner_material (5 demos)", lambda: build_inner_material(pairs)),
+        ("hma.parse_deliver_to", lambda: parse_deliver_to(som)),
+        ("hma.strip_route_markers", lambda: strip_route_markers(som)),
+        ("memory_api.extract_fact_and_tags", lambda: extract_fact_and_tags(next(fact_cycle))),
+        ("memory_utils.prepare_message_dict", lambda: prepare_message_dict("Assistant", "  Hallo Welt  ", name="SOM")),
+        ("memory_utils.format_message_list (200→50)", lambda: format_message_list(raw, limit=50)),
+        ("memory_utils.split_long_text (~110 KB)", lambda: split_long_text(long_text, max_len=10_000)),
+        ("graph_utils.build_edge_payload", lambda: build_edge_payload(
+            "n-1", "RELATES_TO", "n-2", fact="Gateway nutzt Zep", attributes={"source": "bench"}, rating=0.8,
+            valid_at="2025-11-14T10:00:00Z")),
+        ("graph_api.edge normalize+to_dict (50)", lambda: [_edge_from_zep(e).to_dict() for e in edges]),
+        ("graph_api.node normalize+to_dict (50)", lambda: [_node_from_zep(n).to_dict() for n in nodes]),
+        ("graph_api.episode normalize+to_dict (50)", lambda: [_episode_from_zep(e).to_dict() for e in episodes]),
+    ]
+
+
+def _measure(fn: Callable[[], Any], repeat: int, min_time_s: float) -> Dict[str, Any]:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(number, int(number * min_time_s / 0.2))
+    gc.collect()
+    runs = [t / number * 1e9 for t in timer.repeat(repeat=repeat, number=number)]
+
+    # Speicher-Peak eines einzelnen Aufrufs (tracemalloc bremst stark → separat, nicht in ns/op)
+    tracemalloc.start()
+    try:
+        fn()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "ns_per_op_min": round(min(runs), 1),
+        "ns_per_op_median": round(statistics.median(runs), 1),
+        "loops": number,
+        "alloc_peak_bytes": max(0, peak - base),
+    }
+
+
+def _compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> List[Dict[str, Any]]:
+    base = {r["name"]: r for r in json.loads(Path(baseline_path).read_text(encoding="utf-8")).get("results", [])}
+    regressions = []
+    for r in results:
+        b = base.get(r["name"])
+        if not b:
+            continue
+        ratio = r["ns_per_op_min"] / max(1e-9, b["ns_per_op_min"])
+        r["vs_baseline"] = f"{ratio:.2f}x"
+        if ratio > 1.0 + threshold:
+            regressions.append(r)
+    return regressions
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("-k", action="append", default=[], help="nur Fälle, deren Name den Teilstring enthält")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--min-time-s", type=float, default=0.2, help="Mindestdauer pro Messlauf")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--baseline", default=None, help="früheres --json-Ergebnis zum Vergleich")
+    ap.add_argument("--threshold", type=float, default=0.2, help="erlaubte Verlangsamung ggü. Baseline (0.2 = 20 %%)")
+    ap.add_argument("--json", default=None, help="Ergebnis zusätzlich als JSON schreiben")
+    args = ap.parse_args(argv)
+
+    cases = _cases(_Corpus(args.seed))
+    if args.k:
+        cases = [(n, f) for n, f in cases if any(k in n for k in args.k)]
+    results = []
+    for name, fn in cases:
+        results.append({"name": name, **_measure(fn, args.repeat, args.min_time_s)})
+
+    regressions = _compare(results, args.baseline, args.threshold) if args.baseline else []
+    columns = ["name", "ns_per_op_min", "ns_per_op_median", "loops", "alloc_peak_bytes"]
+    if args.baseline:
+        columns.append("vs_baseline")
+    if results:
+        print_table(results, columns)
+    write_json(args.json, {"config": {k: v for k, v in vars(args).items() if k != "json"}, "results": results})
+    if regressions:
+        print(f"\n{len(regressions)} Regression(en) > {args.threshold:.0%}: " + ", ".join(r["name"] for r in regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
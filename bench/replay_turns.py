@@ -0,0 +1,110 @@
+# bench/replay_turns.py
+"""
+Wiedergabe aufgezeichneter Produktions-Turns (Kassetten aus GATEWAY_CASSETTE=record).
+
+Aufnahme:  GATEWAY_CASSETTE=record  (optional GATEWAY_CASSETTE_DIR) → pro corr_id eine <corr_id>.jsonl.gz
+Übersicht: python -m bench.replay_turns --dir .gateway_state/cassettes --summary
+Replay:    Backend mit GATEWAY_CASSETTE=replay (+ GATEWAY_CASSETTE_LATENCY=original|none|0.5) starten, dann
+           python -m bench.replay_turns --dir .gateway_state/cassettes --base-url http://localhost:8000
+
+Jeder Turn wird mit seinem aufgezeichneten Prompt und x-corr-id an /chat geschickt; das Backend
+beantwortet Zep- und LLM-Calls aus der Kassette. Ausgabe: aufgezeichnete vs. wiedergegebene
+Turn-Dauer (p50/p95), Differenz und ob die Antwort identisch ist.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from ._util import percentile, print_table, write_json
+
+
+def _load(directory: Path) -> List[Dict[str, Any]]:
+    from backend.devtools.cassette import load_cassette
+
+    turns: List[Dict[str, Any]] = []
+    for path in sorted(directory.glob("*.jsonl.gz")):
+        events = load_cassette(path)
+        notes = [e for e in events if e.get("kind") == "note" and e.get("op") == "turn"]
+        calls = [e for e in events if e.get("kind") != "note"]
+        by_op: Dict[str, int] = {}
+        ext_ms: Dict[str, float] = {}
+        for e in calls:
+            key = f"{e['kind']}:{e['op']}"
+            by_op[key] = by_op.get(key, 0) + 1
+            ext_ms[e["kind"]] = ext_ms.get(e["kind"], 0.0) + float(e.get("ms", 0.0))
+        corr = path.name[: -len(".jsonl.gz")]
+        for note in notes:
+            data = note.get("data") or {}
+            turns.append({
+                "corr_id": corr,
+                "prompt": data.get("prompt", ""),
+                "recorded_ms": round(float(data.get("ms", 0.0)), 1),
+                "recorded_result": data.get("result"),
+                "calls": len(calls),
+                "calls_by_op": by_op,
+                "zep_ms": round(ext_ms.get("zep", 0.0), 1),
+                "llm_ms": round(ext_ms.get("llm", 0.0), 1),
+            })
+    return turns
+
+
+async def _replay(turns: List[Dict[str, Any]], base_url: str, timeout_s: float) -> None:
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout_s) as client:
+        for t in turns:
+            t0 = time.perf_counter()
+            try:
+                r = await client.post("/chat", json={"prompt": t["prompt"]}, headers={"x-corr-id": t["corr_id"]})
+                r.raise_for_status()
+                result = r.json()
+                t["replay_error"] = ""
+            except Exception as e:
+                result = None
+                t["replay_error"] = type(e).__name__
+            t["replay_ms"] = round((time.perf_counter() - t0) * 1000.0, 1)
+            t["delta_ms"] = round(t["replay_ms"] - t["recorded_ms"], 1)
+            t["same_result"] = result == t["recorded_result"]
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--dir", default=".gateway_state/cassettes", help="Kassetten-Verzeichnis")
+    ap.add_argument("--base-url", default="http://localhost:8000", help="Backend im Replay-Modus")
+    ap.add_argument("--summary", action="store_true", help="nur Kassetten auswerten, nichts abspielen")
+    ap.add_argument("--limit", type=int, default=0, help="höchstens N Turns")
+    ap.add_argument("--timeout-s", type=float, default=120.0)
+    ap.add_argument("--json", default=None, help="Ergebnis zusätzlich als JSON schreiben")
+    args = ap.parse_args(argv)
+
+    turns = _load(Path(args.dir))
+    if args.limit:
+        turns = turns[: args.limit]
+    if not turns:
+        print(f"keine aufgezeichneten Turns in {args.dir}")
+        return 1
+
+    columns = ["corr_id", "recorded_ms", "zep_ms", "llm_ms", "calls"]
+    if not args.summary:
+        asyncio.run(_replay(turns, args.base_url, args.timeout_s))
+        columns += ["replay_ms", "delta_ms", "same_result", "replay_error"]
+    print_table(turns, columns)
+
+    rec = [t["recorded_ms"] for t in turns]
+    print(f"\nrecorded: p50={percentile(rec, 50):.1f} ms  p95={percentile(rec, 95):.1f} ms  (n={len(turns)})")
+    if not args.summary:
+        rep = [t["replay_ms"] for t in turns if not t["replay_error"]]
+        same = sum(1 for t in turns if t["same_result"])
+        print(f"replay:   p50={percentile(rep, 50):.1f} ms  p95={percentile(rep, 95):.1f} ms  "
+              f"(identische Antworten {same}/{len(turns)})")
+    write_json(args.json, {"config": {k: v for k, v in vars(args).items() if k != "json"}, "turns": turns})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
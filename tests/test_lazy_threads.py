@@ -0,0 +1,111 @@
+import asyncio
+
+from autogen_core.memory import MemoryContent, MemoryMimeType
+from zep_cloud.core.api_error import ApiError
+
+from backend.bootstrap import _LazyThreadMemory, _ensure_thread, _thread_scope
+from backend.devtools.fake_zep import FakeZep
+
+
+def _scope(label: str = "t1_test"):
+    return _thread_scope(label, user_id_env=f"user_{label}", thread_id_env=f"thread_{label}")
+
+
+def _message(text: str) -> MemoryContent:
+    return MemoryContent(content=text, mime_type=MemoryMimeType.TEXT, metadata={"type": "message", "role": "user"})
+
+
+def _fail_first_create(zep: FakeZep, status: int) -> dict:
+    calls = {"n": 0}
+    create = zep.thread.create
+
+    async def flaky(**kwargs):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise ApiError(status_code=status, headers={}, body=None)
+        return await create(**kwargs)
+
+    zep.thread.create = flaky
+    return calls
+
+
+def test_thread_is_created_on_first_write_only_once():
+    async def main():
+        zep = FakeZep()
+        mem = _LazyThreadMemory(zep, _scope(), {})
+
+        assert await mem.list_recent_messages() == []
+        assert await mem.get_context() == ""
+        assert zep.stats()["total_calls"] == 0 and not mem.materialized
+
+        await asyncio.gather(*(mem.add(_message(f"hallo {i}")) for i in range(3)))
+        assert mem.materialized
+        assert zep.calls["user.add"] == 1 and zep.calls["thread.create"] == 1
+        assert len(await mem.list_recent_messages(limit=10)) == 3
+
+    asyncio.run(main())
+
+
+def test_create_error_propagates_and_next_write_retries():
+    async def main():
+        zep = FakeZep()
+        calls = _fail_first_create(zep, 500)
+        mem = _LazyThreadMemory(zep, _scope(), {})
+
+        try:
+            await mem.add(_message("erster Versuch"))
+        except ApiError as e:
+            assert e.status_code == 500
+        else:
+            raise AssertionError("thread.create-Fehler wurde verschluckt")
+        assert not mem.materialized
+        assert zep.store.threads == {}
+
+        await mem.add(_message("zweiter Versuch"))
+        assert mem.materialized and calls["n"] == 2
+        assert [m["content"] for m in await mem.list_recent_messages()] == ["zweiter Versuch"]
+
+    asyncio.run(main())
+
+
+def test_existing_thread_counts_as_created():
+    async def main():
+        zep = FakeZep()
+        scope = _scope()
+        await zep.user.add(user_id=scope.user_id)
+        await zep.thread.create(thread_id=scope.thread_id, user_id=scope.user_id)
+        zep.reset_stats()
+
+        mem = _LazyThreadMemory(zep, scope, {})
+        await mem.materialize()  # 400/409 „existiert bereits“ → Erfolg
+        assert mem.materialized and zep.calls["thread.create"] == 1
+
+    asyncio.run(main())
+
+
+def test_probe_reads_existing_thread_without_write():
+    async def main():
+        zep = FakeZep()
+        scope = _scope("session_probe")
+        assert await _LazyThreadMemory(zep, scope, {}, probe=True).list_recent_messages() == []  # 404 → leer
+
+        await zep.user.add(user_id=scope.user_id)
+        await zep.thread.create(thread_id=scope.thread_id, user_id=scope.user_id)
+        await zep.thread.add_messages(thread_id=scope.thread_id, messages=[{"role": "user", "content": "alt"}])
+        zep.reset_stats()
+
+        mem = _LazyThreadMemory(zep, scope, {}, probe=True)
+        assert [m["content"] for m in await mem.list_recent_messages()] == ["alt"]
+        assert mem.materialized and "thread.create" not in zep.calls
+
+    asyncio.run(main())
+
+
+def test_eager_scope_does_not_block_startup_on_create_error():
+    async def main():
+        zep = FakeZep()
+        _fail_first_create(zep, 503)
+        thread_id, mem = await _ensure_thread(zep, _scope("t2_test"), users={})
+        assert thread_id == "thread_t2_test" and mem.thread_id == thread_id
+
+    asyncio.run(main())
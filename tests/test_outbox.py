@@ -0,0 +1,134 @@
+import asyncio
+
+from zep_cloud.core.api_error import ApiError
+
+from backend.memory.outbox import Outbox, OutboxReplayer
+
+
+def _replayer(outbox: Outbox, handler, **kwargs) -> OutboxReplayer:
+    opts = dict(backoff_base_s=0.01, backoff_cap_s=0.02, idle_poll_s=0.05)
+    opts.update(kwargs)
+    return OutboxReplayer(outbox, {"write": handler}, **opts)
+
+
+async def _until_settled(outbox: Outbox, timeout_s: float = 2.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_s
+    while outbox.counts()["pending"] and loop.time() < deadline:
+        await asyncio.sleep(0.01)
+    assert outbox.counts()["pending"] == 0
+
+
+def test_streams_are_fifo_and_independent(tmp_path):
+    async def main():
+        outbox = Outbox(tmp_path / "outbox.sqlite3")
+        release = asyncio.Event()
+        delivered = []
+
+        async def handler(payload):
+            if payload["stream"] == "slow" and payload["i"] == 0:
+                await release.wait()
+            delivered.append((payload["stream"], payload["i"]))
+
+        for i in range(3):
+            outbox.enqueue("thread:slow", "write", {"stream": "slow", "i": i})
+            outbox.enqueue("thread:fast", "write", {"stream": "fast", "i": i})
+        replayer = _replayer(outbox, handler, concurrency=2)
+        replayer.start()
+
+        for _ in range(100):
+            if len(delivered) == 3:
+                break
+            await asyncio.sleep(0.01)
+        assert delivered == [("fast", 0), ("fast", 1), ("fast", 2)]  # kein Head-of-Line-Blocking
+
+        release.set()
+        await _until_settled(outbox)
+        assert [i for s, i in delivered if s == "slow"] == [0, 1, 2]
+        await replayer.stop()
+        outbox.close()
+
+    asyncio.run(main())
+
+
+def test_transient_errors_retry_without_reordering(tmp_path):
+    async def main():
+        outbox = Outbox(tmp_path / "outbox.sqlite3")
+        attempts = {"n": 0}
+        delivered = []
+
+        async def handler(payload):
+            if payload["i"] == 0 and attempts["n"] < 2:
+                attempts["n"] += 1
+                raise ApiError(status_code=503, headers={}, body=None)
+            delivered.append(payload["i"])
+
+        for i in range(3):
+            outbox.enqueue("thread:t1", "write", {"i": i})
+        replayer = _replayer(outbox, handler)
+        replayer.start()
+        await _until_settled(outbox)
+        await replayer.stop()
+
+        assert attempts["n"] == 2
+        assert delivered == [0, 1, 2]
+        assert outbox.counts()["dead"] == 0
+        outbox.close()
+
+    asyncio.run(main())
+
+
+def test_dead_letter_after_max_attempts_or_permanent_error(tmp_path):
+    async def main():
+        outbox = Outbox(tmp_path / "outbox.sqlite3")
+        delivered = []
+
+        async def handler(payload):
+            if payload["i"] == 0:
+                raise asyncio.TimeoutError()
+            if payload["i"] == 1:
+                raise ApiError(status_code=400, headers={}, body=None)
+            delivered.append(payload["i"])
+
+        for i in range(3):
+            outbox.enqueue("thread:t1", "write", {"i": i})
+        outbox.enqueue("thread:t2", "unknown-op", {"i": 9})
+        replayer = _replayer(outbox, handler, max_attempts=3)
+        replayer.start()
+        await _until_settled(outbox)
+        await replayer.stop()
+
+        dead = {e.payload["i"]: e for e in outbox.dead_letters()}
+        assert sorted(dead) == [0, 1, 9]
+        assert dead[0].attempts == 3  # nach max_attempts Versuchen
+        assert dead[1].attempts == 1  # 400 ist nicht transient → sofort
+        assert delivered == [2]       # der Stream läuft hinter dem Dead-Letter weiter
+
+        assert outbox.requeue_dead("thread:t1") == 2
+        assert outbox.counts() == {"pending": 2, "dead": 1}
+        outbox.close()
+
+    asyncio.run(main())
+
+
+def test_pending_entries_survive_restart(tmp_path):
+    async def main():
+        path = tmp_path / "outbox.sqlite3"
+        outbox = Outbox(path)
+        for i in range(3):
+            outbox.enqueue("thread:t1", "write", {"i": i})
+        outbox.close()
+
+        delivered = []
+
+        async def handler(payload):
+            delivered.append(payload["i"])
+
+        outbox = Outbox(path)
+        replayer = _replayer(outbox, handler)
+        await replayer.drain()
+        assert delivered == [0, 1, 2]
+        assert await replayer.stop(drain_timeout_s=0) == {"pending": 0, "dead": 0}
+        outbox.close()
+
+    asyncio.run(main())
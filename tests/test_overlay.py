@@ -0,0 +1,63 @@
+import time
+
+from backend.memory.overlay import RecentWritesOverlay, target_key
+
+
+def _ep(uuid: str, content: str) -> dict:
+    return {"uuid": uuid, "content": content, "created_at": "2026-01-01T00:00:00Z"}
+
+
+def test_target_key_prefers_graph_id():
+    assert target_key({"graph_id": "g1", "user_id": "u1"}) == "graph:g1"
+    assert target_key({"user_id": "u1"}) == "user:u1"
+    assert target_key({}) == "default"
+
+
+def test_merge_puts_matching_pending_writes_first():
+    ov = RecentWritesOverlay(ttl_s=60)
+    ov.record("k", _ep("e1", "Anna hat am 3. Februar Geburtstag"))
+    ov.record("k", _ep("e2", "Bob mag Kaffee"))
+
+    merged = ov.merge("k", "Geburtstag Anna", [_ep("r1", "alter Fakt")])
+    assert [m["uuid"] for m in merged] == ["e1", "r1"]
+    assert merged[0]["pending"] is True
+
+    # "*" passt auf alles, neueste zuerst, limit greift nach dem Mischen
+    merged = ov.merge("k", "*", [_ep("r1", "alter Fakt")], limit=2)
+    assert [m["uuid"] for m in merged] == ["e2", "e1"]
+
+
+def test_merge_drops_entries_once_zep_returns_them():
+    ov = RecentWritesOverlay(ttl_s=60)
+    ov.record("k", _ep("e1", "Anna hat am 3. Februar Geburtstag"))
+    ov.record("k", _ep("local", "Bob mag Kaffee"))
+
+    # uuid-Treffer bzw. gleicher Inhalt mit anderer uuid → verarbeitet
+    remote = [_ep("e1", "Anna hat am 3. Februar Geburtstag"), _ep("zep-7", "bob mag kaffee")]
+    merged = ov.merge("k", "*", remote)
+    assert [m["uuid"] for m in merged] == ["e1", "zep-7"]
+    assert not any(m.get("pending") for m in merged)
+    assert ov.pending("k") == []
+
+
+def test_pending_writes_expire_after_ttl():
+    ov = RecentWritesOverlay(ttl_s=0.05)
+    ov.record("k", _ep("e1", "Anna hat Geburtstag"))
+    assert [p["uuid"] for p in ov.pending("k")] == ["e1"]
+
+    time.sleep(0.06)
+    assert ov.pending("k") == []
+    assert ov.merge("k", "Anna", [_ep("r1", "x")]) == [_ep("r1", "x")]
+
+
+def test_targets_are_isolated_and_bounded():
+    ov = RecentWritesOverlay(ttl_s=60, max_per_target=2)
+    for i in range(3):
+        ov.record("a", _ep(f"a{i}", f"Eintrag {i}"))
+    ov.record("b", _ep("b0", "anderes Ziel"))
+    ov.record("b", _ep("empty", "  "))  # ohne Inhalt → ignoriert
+
+    assert [p["uuid"] for p in ov.pending("a")] == ["a2", "a1"]
+    assert [p["uuid"] for p in ov.pending("b")] == ["b0"]
+    ov.clear("a")
+    assert ov.pending("a") == [] and len(ov.pending("b")) == 1
@@ -0,0 +1,90 @@
+import asyncio
+
+from backend.devtools.fake_zep import FakeZep
+from backend.memory.graph_api import GraphAPI
+from backend.memory.read_cache import DiskCache, ReadCache
+
+
+def _api(zep: FakeZep, cache: ReadCache, graph_id: str = "g1") -> GraphAPI:
+    return GraphAPI(zep, graph_id=graph_id, read_cache=cache, retrieval="remote")
+
+
+def test_search_is_cached_until_a_write_on_the_same_target():
+    async def main():
+        zep, cache = FakeZep(), ReadCache()
+        api = _api(zep, cache)
+        other = api.with_graph("g2")
+        await api.add_raw_data(user_id=None, data="Anna trinkt Tee")
+
+        first = await api.search(query="Anna", scope="episodes", limit=5)
+        assert await api.search(query="Anna", scope="episodes", limit=5) == first
+        await other.search(query="Anna", scope="episodes", limit=5)
+        assert zep.calls["graph.search"] == 2
+
+        await api.add_raw_data(user_id=None, data="Anna mag Kuchen")
+        fresh = await api.search(query="Anna", scope="episodes", limit=5)
+        assert zep.calls["graph.search"] == 3
+        assert {r["content"] for r in fresh} == {"Anna trinkt Tee", "Anna mag Kuchen"}
+        assert not any(r.get("pending") for r in fresh)
+
+        await other.search(query="Anna", scope="episodes", limit=5)  # anderes Ziel bleibt gecacht
+        assert zep.calls["graph.search"] == 3
+
+    asyncio.run(main())
+
+
+def test_local_write_and_delete_invalidate_searches():
+    async def main():
+        zep, cache = FakeZep(), ReadCache()
+        api = _api(zep, cache)
+        res = await api.add_raw_data(user_id=None, data="Bob fährt Rad")
+        await api.search(query="Bob", scope="episodes", limit=5)
+
+        api.note_local_write(user_id=None, data="Bob fährt Zug")  # Outbox: Zustellung folgt später
+        merged = await api.search(query="Bob", scope="episodes", limit=5)
+        assert zep.calls["graph.search"] == 2
+        assert merged[0]["content"] == "Bob fährt Zug" and merged[0]["pending"] is True
+
+        await api.delete_episode(res["data"]["episode"]["uuid"])
+        after = await api.search(query="Bob", scope="episodes", limit=5)
+        assert zep.calls["graph.search"] == 3
+        assert "Bob fährt Rad" not in {r["content"] for r in after}
+
+    asyncio.run(main())
+
+
+def test_disk_tier_survives_restart_and_honours_invalidation(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = ReadCache(DiskCache(path))
+    cache.set("graph.search", "graph:g1|a", [{"uuid": "e1"}], ttl_s=60)
+    cache.set("graph.search", "graph:g2|a", [{"uuid": "e2"}], ttl_s=60)
+    cache.close()
+
+    cache = ReadCache(DiskCache(path))
+    assert cache.get("graph.search", "graph:g1|a") == [{"uuid": "e1"}]
+    cache.invalidate_prefix("graph.search", "graph:g1|")
+    cache.close()
+
+    cache = ReadCache(DiskCache(path))
+    assert cache.get("graph.search", "graph:g1|a") is None
+    assert cache.get("graph.search", "graph:g2|a") == [{"uuid": "e2"}]
+    cache.close()
+
+
+def test_stale_entries_are_served_and_refreshed_in_background():
+    async def main():
+        cache = ReadCache()
+        loads = []
+
+        async def loader():
+            loads.append(1)
+            return len(loads)
+
+        assert await cache.get_or_load("ns", "k", loader, ttl_s=0, stale_ttl_s=60) == 1
+        assert await cache.get_or_load("ns", "k", loader, ttl_s=0, stale_ttl_s=60) == 1  # stale
+        await asyncio.sleep(0.01)
+        assert len(loads) == 2
+        assert cache.local_value("ns", "k") == 2
+        cache.close()
+
+    asyncio.run(main())
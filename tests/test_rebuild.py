@@ -0,0 +1,86 @@
+import asyncio
+from types import SimpleNamespace
+
+from backend import bootstrap
+from backend.agent_core.hma.hma import HMA
+from backend.agent_core.hma.hma_config import DEFAULT_HMA_CONFIG
+
+
+class _Llm:
+    """LLM-Adapter-Ersatz; mit gate blockiert completion() bis zur Freigabe (laufender Turn)."""
+
+    agent = object()
+
+    def __init__(self, tag: str, gate: asyncio.Event | None = None) -> None:
+        self.tag = tag
+        self.gate = gate
+
+    async def completion(self, **_):
+        if self.gate is not None:
+            await self.gate.wait()
+        return f"Ich antworte aus {self.tag}."
+
+
+def _runtime(llm: _Llm) -> SimpleNamespace:
+    rt = SimpleNamespace(call_tool=None, messaging=None, ctx_provider=None, demo_registry=[], llm_client=llm,
+                         hma_config=DEFAULT_HMA_CONFIG, model_name="alt", generation=1)
+    rt.hma = HMA(som_system_prompt=DEFAULT_HMA_CONFIG.som_system_prompt, templates=DEFAULT_HMA_CONFIG, demos=[],
+                 messaging=None, llm=llm, ctx_provider=None, runtime=rt)
+    return rt
+
+
+def test_swap_is_atomic_and_in_flight_turn_finishes_on_old_instance(monkeypatch):
+    async def main():
+        gate = asyncio.Event()
+        rt = _runtime(_Llm("alt", gate))
+        old_hma = rt.hma
+        monkeypatch.setattr(bootstrap, "build_agents", lambda **kw: ([], _Llm(kw["model_name"])))
+
+        turn = asyncio.create_task(old_hma.run(user_text="hallo"))
+        while old_hma.in_flight == 0:
+            await asyncio.sleep(0)
+
+        result = await bootstrap.rebuild_agents(rt, model_name="neu", reload_config=False)
+        assert result["generation"] == 2 and result["model"] == "neu" and result["draining_turns"] == 1
+        assert rt.hma is not old_hma and rt.llm_client.tag == "neu" and rt.model_name == "neu"
+        assert not turn.done()
+
+        gate.set()
+        assert "aus alt" in str(await turn)  # läuft auf der alten Instanz zu Ende
+        assert old_hma.in_flight == 0
+        assert "aus neu" in str(await rt.hma.run(user_text="hallo"))
+
+    asyncio.run(main())
+
+
+def test_failed_rebuild_keeps_previous_runtime(monkeypatch):
+    async def main():
+        rt = _runtime(_Llm("alt"))
+        old_hma, old_llm = rt.hma, rt.llm_client
+
+        def broken(**_):
+            raise RuntimeError("config kaputt")
+
+        monkeypatch.setattr(bootstrap, "build_agents", broken)
+        try:
+            await bootstrap.rebuild_agents(rt, reload_config=False)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("Rebuild-Fehler wurde verschluckt")
+        assert rt.hma is old_hma and rt.llm_client is old_llm and rt.generation == 1
+
+    asyncio.run(main())
+
+
+def test_concurrent_rebuilds_are_serialised(monkeypatch):
+    async def main():
+        rt = _runtime(_Llm("alt"))
+        monkeypatch.setattr(bootstrap, "build_agents", lambda **kw: ([], _Llm(kw["model_name"])))
+
+        results = await asyncio.gather(*(bootstrap.rebuild_agents(rt, model_name=m, reload_config=False)
+                                         for m in ("a", "b")))
+        assert sorted(r["generation"] for r in results) == [2, 3]
+        assert rt.generation == 3 and rt.llm_client.tag == rt.model_name
+
+    asyncio.run(main())
@@ -0,0 +1,63 @@
+import asyncio
+
+from zep_cloud.core.api_error import ApiError
+
+from backend.memory.resilience import ResiliencePolicy, ZepResilience
+
+
+def _resilience() -> ZepResilience:
+    return ZepResilience(ResiliencePolicy(
+        retries=0, hedge=False, breaker_threshold=1, breaker_reset_s=0.05, backoff_cap_s=0.01))
+
+
+async def _open_breaker(res: ZepResilience) -> None:
+    async def fail():
+        raise asyncio.TimeoutError()
+
+    try:
+        await res.call("thread.get", fail, idempotent=True)
+    except asyncio.TimeoutError:
+        pass
+    assert res.breaker_states() == {"thread": "open"}
+    await asyncio.sleep(0.06)
+
+
+def test_half_open_probe_rate_limited_then_recovers():
+    async def main():
+        res = _resilience()
+        await _open_breaker(res)
+        calls = []
+
+        async def probe():
+            calls.append(1)
+            if len(calls) == 1:
+                raise ApiError(status_code=429, headers={}, body=None)
+            return "ok"
+
+        assert await res.call("thread.get", probe, idempotent=True) == "ok"
+        assert res.breaker_states() == {"thread": "closed"}
+        assert len(calls) == 2
+
+    asyncio.run(main())
+
+
+def test_cancelled_probe_releases_breaker():
+    async def main():
+        res = _resilience()
+        await _open_breaker(res)
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        task = asyncio.create_task(res.call("thread.get", hang, idempotent=True))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        async def ok():
+            return "ok"
+
+        assert await res.call("thread.get", ok, idempotent=True) == "ok"
+        assert res.breaker_states() == {"thread": "closed"}
+
+    asyncio.run(main())
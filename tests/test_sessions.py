@@ -0,0 +1,88 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from autogen_core.memory import MemoryContent, MemoryMimeType
+
+from backend.agent_core.hma.hma_config import DEFAULT_HMA_CONFIG
+from backend.devtools.fake_zep import FakeZep
+from backend.memory.read_cache import ReadCache
+from backend.sessions import SessionPool
+
+
+def _runtime() -> SimpleNamespace:
+    return SimpleNamespace(zep_client=FakeZep(), get_api=lambda: None, read_cache=ReadCache(), messaging=None,
+                           hma_config=DEFAULT_HMA_CONFIG, demo_registry=[], llm_client=SimpleNamespace(),
+                           generation=1)
+
+
+def _keys(pool: SessionPool) -> list:
+    return [s.label for s in pool._sessions.values()]
+
+
+def test_lru_evicts_least_recently_used_idle_session():
+    async def main():
+        pool = SessionPool(_runtime(), max_sessions=2)
+        alice = pool.get("alice")
+        pool.get("bob")
+        assert pool.get("alice") is alice  # alice ist jetzt die jüngste
+        pool.get("carol")
+
+        assert _keys(pool) == ["alice", "carol"]
+        assert pool.stats()["evicted_lru"] == 1 and pool.stats()["hits"] == 1
+
+    asyncio.run(main())
+
+
+def test_leased_sessions_are_never_evicted():
+    async def main():
+        pool = SessionPool(_runtime(), max_sessions=1, idle_ttl_s=0.01)
+        async with pool.lease("alice") as alice:
+            pool.get("bob")  # alice läuft, bob ist gerade angefordert → vorübergehend über dem Limit
+            assert _keys(pool) == ["alice", "bob"]
+            pool.get("carol")
+            assert _keys(pool) == ["alice", "carol"]
+
+            time.sleep(0.02)
+            assert pool.sweep() == 1  # carol ist idle, alice hat einen laufenden Turn
+            assert _keys(pool) == ["alice"] and alice.active == 1
+        assert alice.active == 0
+
+    asyncio.run(main())
+
+
+def test_idle_sessions_are_swept_and_revive_with_same_threads():
+    async def main():
+        rt = _runtime()
+        pool = SessionPool(rt, idle_ttl_s=0.05)
+        alice = pool.get("alice")
+        pool.get("bob")
+        await alice.t1_memory.add(MemoryContent(content="hallo", mime_type=MemoryMimeType.TEXT,
+                                                metadata={"type": "message", "role": "user"}))
+        time.sleep(0.03)
+        pool.get("bob")
+        time.sleep(0.03)
+
+        assert pool.sweep() == 1
+        assert _keys(pool) == ["bob"] and pool.stats()["evicted_idle"] == 1
+
+        revived = pool.get("alice")
+        assert revived is not alice and revived.t1_thread_id == alice.t1_thread_id
+        assert [m["content"] for m in await revived.t1_memory.list_recent_messages()] == ["hallo"]
+        assert rt.zep_client.calls["thread.create"] == 1  # probe statt erneutem create
+
+    asyncio.run(main())
+
+
+def test_session_hma_follows_runtime_generation():
+    async def main():
+        rt = _runtime()
+        pool = SessionPool(rt)
+        session = pool.get("alice")
+        first = session.hma
+        assert pool.hma_for(session) is first
+
+        rt.generation += 1  # rebuild_agents hat getauscht
+        assert pool.get("alice").hma is not first and session.generation == rt.generation
+
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+import asyncio
+
+from backend.memory.tag_index import TagIndex, normalize_month_day, parse_tagged_payload
+
+
+class _SearchApi:
+    """Minimaler GraphAPI-Ersatz: liefert n getaggte Episoden (oder wirft)."""
+
+    def __init__(self, n: int, *, fail: bool = False) -> None:
+        self.n = n
+        self.fail = fail
+        self.calls = []
+
+    async def search(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.fail:
+            raise RuntimeError("zep down")
+        count = min(self.n, kwargs["limit"])
+        return [
+            {"uuid": f"e{i}", "content": str({"text": f"Geburtstag {i}", "tags": ["birthday", "date:02-03"]}),
+             "created_at": f"2026-01-{i % 28 + 1:02d}"}
+            for i in range(count)
+        ]
+
+
+def test_parse_tagged_payload_variants():
+    assert normalize_month_day("2-3") == "02-03"
+    assert normalize_month_day("date:13-01") is None
+    nested = str({"kind": "episode", "content": str({"text": "Anna", "tags": ["birthday", "date:2-3"]})})
+    assert parse_tagged_payload(nested) == ("Anna", ["birthday", "date:2-3"], "02-03")
+    assert parse_tagged_payload("Termin date:05-01") == ("Termin date:05-01", ["date:05-01"], "05-01")
+    assert parse_tagged_payload("kein Tag") is None
+
+
+def test_backfill_marks_complete_below_limit_and_uses_remote_search():
+    async def main():
+        ti, api = TagIndex(), _SearchApi(3)
+        assert await ti.backfill("k", api, limit=50) == 3
+        assert ti.is_backfilled("k")
+        assert api.calls[0]["retrieval"] == "remote"
+        assert len(ti.lookup("k", tags=["birthday"], month_day="2-3")) == 3
+
+        assert await ti.backfill("k", api, limit=50) == 0  # einmal pro Ziel
+        assert len(api.calls) == 1
+
+    asyncio.run(main())
+
+
+def test_backfill_failure_is_retried():
+    async def main():
+        ti, api = TagIndex(), _SearchApi(2, fail=True)
+        assert await ti.backfill("k", api) == 0
+        assert not ti.is_backfilled("k")
+
+        api.fail = False
+        assert await ti.backfill("k", api) == 2
+        assert ti.is_backfilled("k")
+        assert len(api.calls) == 2
+
+    asyncio.run(main())
+
+
+def test_backfill_truncated_at_limit_is_not_authoritative():
+    async def main():
+        ti, api = TagIndex(), _SearchApi(100)
+        assert await ti.backfill("k", api, limit=10) == 10
+        assert not ti.is_backfilled("k")  # volle Seite → vermutlich mehr im Graphen
+        assert len(ti.lookup("k", tags=["birthday"])) == 10
+
+        assert await ti.backfill("k", api, limit=10) == 0  # kein erneuter Voll-Backfill
+        assert len(api.calls) == 1
+
+    asyncio.run(main())
+
+
+def test_write_listener_items_are_indexed_and_replaced():
+    ti = TagIndex()
+    assert ti.index_item("k", {"uuid": "e1", "content": str({"text": "Anna", "tags": ["birthday", "date:02-03"]})})
+    assert not ti.index_item("k", {"uuid": "e2", "content": "ohne Tags"})
+    ti.add("k", "e1", text="Anna", tags=["friend"], month_day="04-05")
+
+    assert ti.lookup("k", tags=["birthday"]) == []
+    assert [r["uuid"] for r in ti.lookup("k", tags=["friend"], month_day="4-5")] == ["e1"]
+    assert ti.lookup("other", tags=["friend"]) == []
+    assert len(ti) == 1
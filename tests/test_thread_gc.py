@@ -0,0 +1,94 @@
+import asyncio
+
+from backend.devtools.fake_zep import FakeZep
+from backend.memory.thread_gc import ThreadCollector
+from backend.state import ThreadRegistry
+
+
+async def _threads(zep: FakeZep, *thread_ids: str) -> None:
+    await zep.user.add(user_id="u1")
+    for tid in thread_ids:
+        await zep.thread.create(thread_id=tid, user_id="u1")
+
+
+def _registry(tmp_path) -> ThreadRegistry:
+    reg = ThreadRegistry(tmp_path / "thread_registry.json", "fp")
+    reg.activate("t1_root", "old", "u1")
+    reg.activate("t1_root", "new", "u1")  # "old" gilt ab jetzt als verwaist
+    return reg
+
+
+def test_protected_ids_are_never_deleted(tmp_path):
+    async def main():
+        zep = FakeZep()
+        await _threads(zep, "old", "new")
+        reg = _registry(tmp_path)
+        protected = {"old"}  # z. B. noch von einer Session oder einem Worker genutzt
+        gc = ThreadCollector(zep, reg, retention_s=0, protect=lambda: [*protected, None])
+
+        report = await gc.collect()
+        assert report["candidates"] == [] and report["deleted"] == 0 and report["protected"] == 1
+        assert set(zep.store.threads) == {"old", "new"} and "old" in reg
+
+        protected.clear()
+        report = await gc.collect()
+        assert [c["thread_id"] for c in report["candidates"]] == ["old"] and report["deleted"] == 1
+        assert set(zep.store.threads) == {"new"}
+        assert "old" not in reg and "new" in reg
+        assert "old" not in ThreadRegistry(tmp_path / "thread_registry.json", "fp")  # persistiert
+
+    asyncio.run(main())
+
+
+def test_retention_and_dry_run_keep_threads(tmp_path):
+    async def main():
+        zep = FakeZep()
+        await _threads(zep, "old", "new")
+        reg = _registry(tmp_path)
+
+        assert (await ThreadCollector(zep, reg, retention_s=3600).collect())["candidates"] == []
+        report = await ThreadCollector(zep, reg, retention_s=0).collect(dry_run=True)
+        assert [c["thread_id"] for c in report["candidates"]] == ["old"] and report["deleted"] == 0
+        assert "thread.delete" not in zep.calls and "old" in reg
+
+    asyncio.run(main())
+
+
+def test_missing_thread_is_forgotten_and_failures_are_kept(tmp_path):
+    async def main():
+        zep = FakeZep()
+        await _threads(zep, "new")  # "old" existiert bei Zep nicht (mehr) → 404
+        reg = _registry(tmp_path)
+        reg.activate("t2_root", "broken", "u1")
+        reg.activate("t2_root", "t2_new", "u1")
+
+        delete = zep.thread.delete
+
+        async def failing_delete(*, thread_id: str, **kwargs):
+            if thread_id == "broken":
+                raise RuntimeError("zep down")
+            return await delete(thread_id=thread_id, **kwargs)
+
+        zep.thread.delete = failing_delete
+        report = await ThreadCollector(zep, reg, retention_s=0).collect()
+        assert report["already_gone"] == 1 and report["deleted"] == 0
+        assert list(report["failed"]) == ["broken"]
+        assert "old" not in reg and "broken" in reg  # nächster Lauf versucht es erneut
+
+    asyncio.run(main())
+
+
+def test_touch_defers_abandoned_threads_until_flushed(tmp_path):
+    async def main():
+        zep = FakeZep()
+        await _threads(zep, "old", "new")
+        reg = _registry(tmp_path)
+        reg.touch("old")  # späte Writes auf den alten Thread verlängern die Retention
+        reg.flush()
+
+        entry = ThreadRegistry(tmp_path / "thread_registry.json", "fp").snapshot()["old"]
+        assert entry["last_used"] >= entry["abandoned_at"]
+        assert reg.abandoned(60) == []
+        assert [tid for tid, _ in reg.abandoned(60, now=entry["last_used"] + 61)] == ["old"]
+
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+import asyncio
+
+from backend.turns import TurnQueueFull, TurnSequencer
+
+
+class _Recorder:
+    """run()-Ersatz: protokolliert Prompts und gleichzeitig laufende Turns."""
+
+    def __init__(self, delay_s: float = 0.02) -> None:
+        self.delay_s = delay_s
+        self.prompts = []
+        self.running = 0
+        self.max_running = 0
+
+    async def run(self, prompt: str):
+        self.prompts.append(prompt)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay_s)
+        finally:
+            self.running -= 1
+        return {"reply": prompt}
+
+
+def test_turns_run_in_order_per_thread_and_parallel_across_threads():
+    async def main():
+        seq = TurnSequencer()
+        a, b = _Recorder(), _Recorder()
+        results = await asyncio.gather(
+            *(seq.submit("thread-a", f"a{i}", a.run) for i in range(4)),
+            *(seq.submit("thread-b", f"b{i}", b.run) for i in range(2)),
+        )
+
+        assert a.prompts == ["a0", "a1", "a2", "a3"] and a.max_running == 1
+        assert b.prompts == ["b0", "b1"] and b.max_running == 1
+        assert [r["reply"] for r in results] == ["a0", "a1", "a2", "a3", "b0", "b1"]
+        assert seq.stats()["lanes"] == 0 and seq.stats()["turns"] == 6
+
+    asyncio.run(main())
+
+
+def test_prompts_within_the_window_are_coalesced():
+    async def main():
+        seq = TurnSequencer(coalesce_window_s=0.05, coalesce_max=2)
+        rec = _Recorder()
+        results = await asyncio.gather(*(seq.submit("k", p, rec.run) for p in ("eins", "zwei", "drei")))
+
+        assert rec.prompts == ["eins\n\nzwei", "drei"]  # coalesce_max begrenzt den Batch
+        assert results[0] == results[1] == {"reply": "eins\n\nzwei", "coalesced": 2}
+        assert results[2] == {"reply": "drei"}
+        assert seq.stats()["coalesced"] == 1
+
+    asyncio.run(main())
+
+
+def test_prompts_queued_behind_a_running_turn_are_coalesced():
+    async def main():
+        seq = TurnSequencer(coalesce_window_s=0.01)
+        rec = _Recorder(delay_s=0.1)
+        first = asyncio.create_task(seq.submit("k", "a", rec.run))
+        later = []
+        for p in ("b", "c"):  # Abstand > Fenster, aber beide vor Ende von "a"
+            await asyncio.sleep(0.03)
+            later.append(asyncio.create_task(seq.submit("k", p, rec.run)))
+        await asyncio.gather(first, *later)
+
+        assert rec.prompts == ["a", "b\n\nc"]
+        assert [t.result().get("coalesced") for t in later] == [2, 2]
+
+    asyncio.run(main())
+
+
+def test_errors_reach_every_coalesced_request_and_lane_recovers():
+    async def main():
+        seq = TurnSequencer(coalesce_window_s=0.02)
+
+        async def boom(prompt):
+            raise ValueError(prompt)
+
+        results = await asyncio.gather(*(seq.submit("k", p, boom) for p in ("x", "y")), return_exceptions=True)
+        assert all(isinstance(r, ValueError) and str(r) == "x\n\ny" for r in results)
+
+        assert await seq.submit("k", "ok", _Recorder().run) == {"reply": "ok"}
+
+    asyncio.run(main())
+
+
+def test_queue_limit_and_cancelled_waiters():
+    async def main():
+        seq = TurnSequencer(max_queue=2)
+        rec = _Recorder(delay_s=0.05)
+        running = asyncio.create_task(seq.submit("k", "läuft", rec.run))
+        await asyncio.sleep(0)
+        waiting = [asyncio.create_task(seq.submit("k", f"w{i}", rec.run)) for i in range(2)]
+        await asyncio.sleep(0)
+
+        try:
+            await seq.submit("k", "zu viel", rec.run)
+        except TurnQueueFull:
+            pass
+        else:
+            raise AssertionError("TurnQueueFull erwartet")
+
+        waiting[0].cancel()  # Client bricht ab, solange der Turn noch wartet → entfällt
+        await asyncio.gather(running, *waiting, return_exceptions=True)
+        assert rec.prompts == ["läuft", "w1"]
+        assert seq.stats()["rejected"] == 1
+
+    asyncio.run(main())